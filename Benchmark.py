@@ -0,0 +1,255 @@
+import Module
+import Web_Final_D3
+import Web_Final_D3_EC
+import Web_Final_D4
+import Web_Final_D4_EC
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Benchmark Suite: D3/D4 Encode and Decode =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# For every scheme, dimension and message length this times
+#   - the single-call entry points (main_function of the Web_Final modules),
+#   - the batch entry points (encode_batch / decode_batch, when numpy is installed),
+#   - the layout build and Module.ternary_xor_sum over one codeword,
+# with error-free and single-error codewords for decoding, then measures the peak traced memory
+# of one more call under tracemalloc. Results are written as JSON to compare across versions.
+
+SCHEMES = {"D3": (Web_Final_D3, Web_Final_D3_EC), "D4": (Web_Final_D4, Web_Final_D4_EC)}
+DIMENSIONS = range(3, 13)
+BATCH_SIZES = (1, 64, 1024)
+MIN_TIME = 0.2                  # seconds of calls per measurement
+MAX_REPEAT = 50
+MAX_LENGTH = 20000              # longer messages are skipped for the single-call path
+MAX_BATCH_LENGTH = 3000         # and for the batch path (dense length x codeword generator matrix)
+LENGTH_POINTS = 4               # message lengths per dimension: shortest, quartiles, longest
+
+#=-=-=-=-=-=-=- Timing =-=-=-=-=-=-=-
+def measure(function, min_time=MIN_TIME, max_repeat=MAX_REPEAT):
+    """
+    Time function() until min_time has passed (at least once, at most max_repeat calls), then
+    trace the peak memory of one extra call.
+
+    Returns:
+        dict: {"repeats", "best_s", "median_s", "peak_bytes"}
+    """
+
+    times = []
+    started = time.perf_counter()
+    while len(times) < max_repeat and (not times or time.perf_counter() - started < min_time):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"repeats": len(times), "best_s": min(times), "median_s": statistics.median(times), "peak_bytes": peak}
+
+def _with_error(codeword, rng):
+    position = rng.randrange(len(codeword))
+    return codeword[:position] + str((int(codeword[position]) + rng.randint(1, 2)) % 3) + codeword[position + 1:]
+
+#=-=-=-=-=-=-=- Cases =-=-=-=-=-=-=-
+def message_lengths(scheme, dimension, points=LENGTH_POINTS):
+    """
+    Message lengths benchmarked at one dimension: the shortest and the longest it is used for, and
+    the points splitting that range into `points` equal parts (the quartiles by default). Lengths
+    outside Module.message_range() are left out; a dimension without one gives no lengths.
+
+    Example:
+        >>> message_lengths("D3", 3), message_lengths("D3", 4)
+        ([3, 4, 6, 8, 10], [11, 17, 23, 29, 36])
+    """
+
+    dimensions, messages, _ = Module.capacity_table(scheme)
+    i = dimensions.index(dimension)
+    supported = Module.message_range(scheme, dimension)
+    if not supported:
+        return []
+    lowest = max(messages[i - 1] + 1 if i else 1, supported[0], 1)
+    highest = supported[1]
+    return sorted({lowest + (highest - lowest) * k // points for k in range(points + 1)})
+
+def bench_single(scheme, dimension, length, rng, min_time):
+    encoder, decoder = SCHEMES[scheme]
+    message = ''.join(rng.choice('012') for _ in range(length))
+    codeword = encoder.main_function(message)[0]
+    corrupted = _with_error(codeword, rng)
+    layout = Module.get_code_layout(scheme, dimension, len(codeword))
+    mapping = {index: int(codeword[pos]) for pos, index in enumerate(layout.indices)}
+
+    def build_layout():
+        # The builder behind the cache, so the layouts the other cases use stay cached
+        Module.get_code_layout.__wrapped__(scheme, dimension, len(codeword))
+
+    cases = [("encode", "single", 0, lambda: encoder.main_function(message)),
+             ("decode", "single", 0, lambda: decoder.main_function(codeword)),
+             ("decode", "single", 1, lambda: decoder.main_function(corrupted)),
+             ("layout", "helper", 0, build_layout),
+             ("xor_sum", "helper", 0, lambda: Module.ternary_xor_sum(mapping))]
+    for op, path, errors, function in cases:
+        yield op, path, 1, errors, len(codeword), measure(function, min_time)
+
+def bench_batch(scheme, dimension, length, batch_sizes, rng, min_time):
+    import numpy as np
+    encoder, decoder = SCHEMES[scheme]
+    generator = np.random.default_rng(rng.randrange(2**32))
+    for batch in batch_sizes:
+        messages = generator.integers(0, 3, (batch, length), dtype=np.uint8)
+        codewords = encoder.encode_batch(messages)
+        corrupted = codewords.copy()
+        rows = np.arange(batch)
+        columns = generator.integers(0, codewords.shape[1], batch)
+        corrupted[rows, columns] = (corrupted[rows, columns] + generator.integers(1, 3, batch)) % 3
+
+        for op, errors, function in (("encode", 0, lambda: encoder.encode_batch(messages)),
+                                     ("decode", 0, lambda: decoder.decode_batch(codewords)),
+                                     ("decode", 1, lambda: decoder.decode_batch(corrupted))):
+            yield op, "batch", batch, errors, codewords.shape[1], measure(function, min_time)
+
+def run(schemes=tuple(SCHEMES), dimensions=DIMENSIONS, batch_sizes=BATCH_SIZES, max_length=MAX_LENGTH,
+        max_batch_length=MAX_BATCH_LENGTH, min_time=MIN_TIME, seed=0, log=None):
+    """
+    Run the suite and return its results.
+
+    Returns:
+        list of dict: One row per measurement, with scheme, op ("encode", "decode", "layout",
+        "xor_sum"), path ("single", "batch", "helper"), dimension, message_length,
+        codeword_length, batch, errors (0 or 1 per codeword), the measure() fields and
+        throughput_trits_s (message trits per second). A case that fails has "error" instead.
+        An error only ends the rows of its own path ("single" or "batch", kept in the row).
+        Lengths above max_length / max_batch_length are not measured on that path.
+    """
+
+    try:
+        import numpy        # noqa: F401  (batch paths only run with numpy)
+        has_numpy = True
+    except ImportError:
+        has_numpy = False
+
+    rng = random.Random(seed)
+    results = []
+    for scheme in schemes:
+        for dimension in dimensions:
+            for length in message_lengths(scheme, dimension):
+                base = {"scheme": scheme, "dimension": dimension, "message_length": length}
+                runs = []
+                if length <= max_length:
+                    runs.append(("single", bench_single(scheme, dimension, length, rng, min_time)))
+                if has_numpy and batch_sizes and length <= max_batch_length:
+                    runs.append(("batch", bench_batch(scheme, dimension, length, batch_sizes, rng, min_time)))
+                for run_path, rows in runs:
+                    try:
+                        for op, path, batch, errors, codeword_length, timing in rows:
+                            row = dict(base, op=op, path=path, batch=batch, errors=errors,
+                                       codeword_length=codeword_length, **timing)
+                            row["throughput_trits_s"] = batch * length / timing["median_s"] if timing["median_s"] else None
+                            results.append(row)
+                            if log:
+                                log(row)
+                    except Exception as error:   # e.g. a D4 length the construction does not support
+                        results.append(dict(base, path=run_path, error=f"{type(error).__name__}: {error}"))
+                        if log:
+                            log(results[-1])
+    return results
+
+def environment():
+    """
+    Interpreter, platform and numpy version, stored with the results.
+    """
+
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {"python": sys.version.split()[0], "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "machine": platform.machine(), "numpy": numpy_version,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+#=-=-=-=-=-=-=- Compare Two Result Files =-=-=-=-=-=-=-
+_KEY = ("scheme", "op", "path", "dimension", "message_length", "batch", "errors")
+
+def compare(old, new):
+    """
+    Median-time ratio old/new for every measurement found in both result files (>1 is faster now).
+
+    Returns:
+        list of tuple: (key dict, old median_s, new median_s, speedup)
+    """
+
+    def index(report):
+        return {tuple(row[k] for k in _KEY): row for row in report["results"] if "error" not in row}
+
+    old_rows, new_rows = index(old), index(new)
+    return [(dict(zip(_KEY, key)), old_rows[key]["median_s"], row["median_s"], old_rows[key]["median_s"] / row["median_s"])
+            for key, row in new_rows.items() if key in old_rows]
+
+#=-=-=-=-=-=-=- Command Line =-=-=-=-=-=-=-
+def _print_row(row):
+    if "error" in row:
+        print(f"{row['scheme']} d={row['dimension']:<2} L={row['message_length']:<7} {row['path']:<6} skipped: {row['error']}",
+              file=sys.stderr)
+        return
+    print(f"{row['scheme']} d={row['dimension']:<2} L={row['message_length']:<7} {row['op']:<7} {row['path']:<6} "
+          f"batch={row['batch']:<5} errors={row['errors']}  median {row['median_s'] * 1e3:10.3f} ms  "
+          f"peak {row['peak_bytes'] / 1024:9.1f} KiB", file=sys.stderr)
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Example:
+        $ python Benchmark.py -o results.json
+        $ python Benchmark.py --schemes D3 --dimensions 3 4 5 --batch-sizes 1 1024 -o quick.json
+        $ python Benchmark.py --compare old.json new.json
+    """
+
+    parser = argparse.ArgumentParser(description="Latency, throughput and peak memory of D3/D4 encode/decode.")
+    parser.add_argument("--schemes", nargs="+", choices=sorted(SCHEMES), default=sorted(SCHEMES))
+    parser.add_argument("--dimensions", nargs="+", type=int, default=list(DIMENSIONS))
+    parser.add_argument("--batch-sizes", nargs="*", type=int, default=list(BATCH_SIZES))
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH, help="longest message for the single-call path")
+    parser.add_argument("--max-batch-length", type=int, default=MAX_BATCH_LENGTH,
+                        help="longest message for the batch path")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds of calls per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="JSON file for the results (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path) as file:
+                reports.append(json.load(file))
+        old, new = reports
+        for key, old_time, new_time, speedup in compare(old, new):
+            label = " ".join(f"{k}={v}" for k, v in key.items())
+            print(f"{label:<80} {old_time * 1e3:10.3f} ms -> {new_time * 1e3:10.3f} ms  x{speedup:.2f}")
+        return 0
+
+    report = {"environment": environment(),
+              "settings": {"min_time": args.min_time, "max_length": args.max_length,
+                           "max_batch_length": args.max_batch_length, "seed": args.seed},
+              "results": run(args.schemes, args.dimensions, args.batch_sizes, args.max_length,
+                             args.max_batch_length, args.min_time, args.seed, log=_print_row)}
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
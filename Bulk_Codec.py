@@ -0,0 +1,304 @@
+import Module
+import Stream_Codec
+import argparse
+import mmap
+import os
+import sys
+import traceback
+import numpy as np
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Bulk File Codec over mmap =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# Files are walked as fixed-size records through numpy views over a memory mapping, a batch of
+# records at a time, so nothing is read into Python strings and files may be far larger than RAM.
+#
+# Record formats (one record per block):
+#   - ASCII: the trits as '0'/'1'/'2', codeword records end with '\n' (as Stream_Codec writes them).
+#     An ASCII message file is either one block per line (as decode_file() writes them, the last
+#     newline optional) or a plain trit stream, trailing whitespace ignored.
+#   - packed: Module.pack_rows() records, Module.packed_size(trits) bytes each.
+
+_NEWLINE = ord('\n')
+_WHITESPACE = frozenset(b' \t\r\n')
+
+#=-=-=-=-=-=-=- Mapping and Records =-=-=-=-=-=-=-
+def _map_file(path, writable=False):
+    # Whole-file mapping, None for an empty file (mmap cannot map 0 bytes)
+    with open(path, "r+b" if writable else "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+def _close(mapping):
+    if mapping is not None:
+        mapping.close()
+
+def _release_views(error):
+    # The frames of a traceback keep their locals, views of the mappings among them, and a mapping
+    # with views left cannot be closed: drop the locals before the mappings are closed
+    traceback.clear_frames(error.__traceback__)
+
+def _create_file(path, size):
+    with open(path, "w+b") as file:
+        file.truncate(size)
+    return _map_file(path, writable=True)
+
+def _view(mapping):
+    return np.frombuffer(mapping, dtype=np.uint8) if mapping is not None else np.empty(0, dtype=np.uint8)
+
+def _text_to_trits(text):
+    trits = text - ord('0')
+    if trits.size and trits.max() > 2:
+        raise ValueError("the file should only hold '0', '1', '2' (and record newlines)")
+    return trits
+
+def codeword_records(data, codeword_length, packed=False):
+    """
+    View a codeword file as a 2-D array of records, one row per codeword (no copy).
+
+    Parameters:
+        data (numpy.ndarray): 1-D uint8 view of the file.
+        codeword_length (int): Trits per codeword.
+        packed (bool): Packed records (True) or ASCII (False, with or without '\\n' after each).
+
+    Returns:
+        tuple: (records, stride), records of shape (count, stride).
+
+    Raises:
+        ValueError: If the file is not a whole number of records.
+    """
+
+    if packed:
+        stride = Module.packed_size(codeword_length)
+    elif len(data) > codeword_length and data[codeword_length] == _NEWLINE:
+        stride = codeword_length + 1
+    else:
+        stride = codeword_length
+    if len(data) % stride:
+        raise ValueError(f"{len(data)} bytes is not a whole number of {stride}-byte records")
+    return data.reshape(-1, stride), stride
+
+#=-=-=-=-=-=-=- Encode a File =-=-=-=-=-=-=-
+def _message_count(data, block_length, packed):
+    # (blocks, bytes, stride) of a message file: packed records, ASCII lines of block_length trits
+    # (stride block_length + 1), or an ASCII stream without its trailing whitespace (stride block_length)
+    if packed:
+        records, stride = codeword_records(data, block_length, packed=True)
+        return len(records), len(data), stride
+    if len(data) > block_length and data[block_length] == _NEWLINE:
+        stride = block_length + 1
+        if len(data) % stride not in (0, block_length):
+            raise ValueError(f"every line of the message file should hold {block_length} trits")
+        return -(-len(data) // stride), len(data), stride
+    length = len(data)
+    while length and data[length - 1] in _WHITESPACE:
+        length -= 1
+    return -(-length // block_length), length, block_length
+
+def _encode_mapped(source_map, destination_map, encoder, block_length, codeword_length, packed, batch_blocks):
+    data = _view(source_map)
+    count, length, in_stride = _message_count(data, block_length, packed)
+    stride = Module.packed_size(codeword_length) if packed else codeword_length + 1
+    output = _view(destination_map).reshape(count, stride)
+
+    for start in range(0, count, batch_blocks):
+        stop = min(start + batch_blocks, count)
+        text = data[start * in_stride:min(stop * in_stride, length)]
+        if packed:
+            batch = Module.unpack_rows(text, block_length)
+        elif in_stride > block_length:
+            lines = np.full((stop - start) * in_stride, _NEWLINE, dtype=np.uint8)
+            lines[:len(text)] = text
+            lines = lines.reshape(-1, in_stride)
+            if (lines[:, block_length] != _NEWLINE).any():
+                raise ValueError(f"every line of the message file should hold {block_length} trits")
+            batch = _text_to_trits(lines[:, :block_length])
+        else:
+            batch = np.zeros((stop - start) * block_length, dtype=np.uint8)
+            batch[:len(text)] = _text_to_trits(text)
+            batch = batch.reshape(-1, block_length)
+
+        codewords = encoder.encode_batch(batch)
+        if packed:
+            output[start:stop] = Module.pack_rows(codewords)
+        else:
+            output[start:stop, :codeword_length] = codewords + ord('0')
+            output[start:stop, codeword_length] = _NEWLINE
+
+def encode_file(source, destination, scheme="D3", block_length=None, dimension=None, packed=False,
+                batch_blocks=Stream_Codec.BATCH_BLOCKS):
+    """
+    Encode a message file into a codeword file, both memory-mapped.
+
+    Parameters:
+        source (str): Message file: ASCII lines of block_length trits, an ASCII trit stream, or
+            packed block_length-trit records.
+        destination (str): Codeword file to create, same format as the source (ASCII one codeword
+            per line, or packed records).
+        scheme, block_length, dimension: As in Stream_Codec.block_plan().
+        packed (bool): Packed (True) or ASCII (False) files.
+        batch_blocks (int): Records encoded per matrix product.
+
+    Returns:
+        int: Number of codewords written. An ASCII source ending inside a block is padded with '0'.
+    """
+
+    dimension, block_length, codeword_length = Stream_Codec.block_plan(scheme, block_length, dimension)
+    source_map = _map_file(source)
+    destination_map = None
+    try:
+        count, _, _ = _message_count(_view(source_map), block_length, packed)
+        stride = Module.packed_size(codeword_length) if packed else codeword_length + 1
+        destination_map = _create_file(destination, count * stride)
+        _encode_mapped(source_map, destination_map, Stream_Codec.ENCODERS[scheme],
+                       block_length, codeword_length, packed, batch_blocks)
+        if destination_map is not None:
+            destination_map.flush()
+    except BaseException as error:
+        _release_views(error)
+        raise
+    finally:
+        _close(source_map)
+        _close(destination_map)
+    return count
+
+#=-=-=-=-=-=-=- Correct a Codeword File in Place, or Decode it into Messages =-=-=-=-=-=-=-
+def _decode_mapped(source_map, destination_map, decoder, block_length, codeword_length, packed,
+                   stats, batch_blocks):
+    # Decode every record of source_map; corrected records are written back when there is no
+    # destination (scrub), messages are written to destination_map otherwise
+    records, _ = codeword_records(_view(source_map), codeword_length, packed)
+    if destination_map is not None:
+        stride = Module.packed_size(block_length) if packed else block_length + 1
+        output = _view(destination_map).reshape(len(records), stride)
+
+    for start in range(0, len(records), batch_blocks):
+        stop = min(start + batch_blocks, len(records))
+        block = records[start:stop]
+        codewords = Module.unpack_rows(block, codeword_length) if packed else _text_to_trits(block[:, :codeword_length])
+        corrected, messages, status, error_positions = decoder.decode_batch(codewords)
+        stats.update(status, error_positions)
+
+        if destination_map is None:
+            rows = np.flatnonzero(status == Module.STATUS_CORRECTED)
+            if packed:
+                block[rows] = Module.pack_rows(corrected[rows])
+            else:
+                block[rows, :codeword_length] = corrected[rows] + ord('0')
+        elif packed:
+            output[start:stop] = Module.pack_rows(messages)
+        else:
+            output[start:stop, :block_length] = messages + ord('0')
+            output[start:stop, block_length] = _NEWLINE
+
+def scrub_file(path, scheme="D3", block_length=None, dimension=None, packed=False, stats=None,
+               batch_blocks=Stream_Codec.BATCH_BLOCKS):
+    """
+    Correct every codeword of a file in place: only the records that needed a correction are written.
+
+    Parameters:
+        path (str): Codeword file, ASCII or packed records.
+        scheme, block_length, dimension: As in Stream_Codec.block_plan().
+        packed (bool): Packed (True) or ASCII (False) records.
+        stats (Stream_Codec.DecodeStats, optional): Counters to update.
+        batch_blocks (int): Records decoded per matrix product.
+
+    Returns:
+        Stream_Codec.DecodeStats: Clean / corrected / uncorrectable counts and position histogram.
+    """
+
+    dimension, block_length, codeword_length = Stream_Codec.block_plan(scheme, block_length, dimension)
+    if stats is None:
+        stats = Stream_Codec.DecodeStats(codeword_length)
+    mapping = _map_file(path, writable=True)
+    try:
+        _decode_mapped(mapping, None, Stream_Codec.DECODERS[scheme], block_length, codeword_length,
+                       packed, stats, batch_blocks)
+        if mapping is not None:
+            mapping.flush()
+    except BaseException as error:
+        _release_views(error)
+        raise
+    finally:
+        _close(mapping)
+    return stats
+
+def decode_file(source, destination, scheme="D3", block_length=None, dimension=None, packed=False,
+                stats=None, batch_blocks=Stream_Codec.BATCH_BLOCKS):
+    """
+    Correct and decode a codeword file into a message file, the source left untouched.
+
+    The messages are written as ASCII, one per line, or as packed block_length-trit records;
+    either can be fed back to encode_file().
+
+    Returns:
+        Stream_Codec.DecodeStats: Counters of the decoded records.
+    """
+
+    dimension, block_length, codeword_length = Stream_Codec.block_plan(scheme, block_length, dimension)
+    if stats is None:
+        stats = Stream_Codec.DecodeStats(codeword_length)
+    source_map = _map_file(source)
+    destination_map = None
+    try:
+        records, _ = codeword_records(_view(source_map), codeword_length, packed)
+        count = len(records)
+        del records
+        stride = Module.packed_size(block_length) if packed else block_length + 1
+        destination_map = _create_file(destination, count * stride)
+        _decode_mapped(source_map, destination_map, Stream_Codec.DECODERS[scheme], block_length,
+                       codeword_length, packed, stats, batch_blocks)
+        if destination_map is not None:
+            destination_map.flush()
+    except BaseException as error:
+        _release_views(error)
+        raise
+    finally:
+        _close(source_map)
+        _close(destination_map)
+    return stats
+
+#=-=-=-=-=-=-=- Command Line =-=-=-=-=-=-=-
+def build_parser():
+    parser = argparse.ArgumentParser(description="Memory-mapped D3/D4 codec for large trit files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    encode = commands.add_parser("encode", help="encode a message file into a codeword file")
+    scrub = commands.add_parser("scrub", help="correct a codeword file in place")
+    decode = commands.add_parser("decode", help="correct and decode a codeword file into a message file")
+    for command in (encode, scrub, decode):
+        command.add_argument("input", help="input file (the file to correct for scrub)")
+        if command is not scrub:
+            command.add_argument("output", help="output file")
+        command.add_argument("-s", "--scheme", choices=sorted(Stream_Codec.ENCODERS), default="D3")
+        size = command.add_mutually_exclusive_group(required=True)
+        size.add_argument("-b", "--block-length", type=int, help="message trits per block")
+        size.add_argument("-d", "--dimension", type=int, help="dimension of the code (largest block it carries)")
+        command.add_argument("-p", "--packed", action="store_true", help="packed 5-trits-per-byte records")
+        command.add_argument("--batch-blocks", type=int, default=Stream_Codec.BATCH_BLOCKS,
+                             help="records per matrix product")
+    return parser
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Example:
+        $ python Bulk_Codec.py encode -s D4 -d 6 --packed payload.bin codewords.bin
+        $ python Bulk_Codec.py scrub -s D4 -d 6 --packed codewords.bin
+    """
+
+    args = build_parser().parse_args(argv)
+    size = (args.scheme, args.block_length, args.dimension, args.packed)
+    if args.command == "encode":
+        count = encode_file(args.input, args.output, *size, batch_blocks=args.batch_blocks)
+        print(f"Encoded {count} blocks", file=sys.stderr)
+    elif args.command == "scrub":
+        stats = scrub_file(args.input, *size, batch_blocks=args.batch_blocks)
+        print(stats, file=sys.stderr)
+    else:
+        stats = decode_file(args.input, args.output, *size, batch_blocks=args.batch_blocks)
+        print(stats, file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
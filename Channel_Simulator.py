@@ -0,0 +1,350 @@
+import Module
+import Stream_Codec
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import math
+import os
+import sys
+import numpy as np
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Monte Carlo Channel Simulator =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# Random messages are encoded with encode_batch(), sent through a ternary symmetric channel (each
+# trit is hit with probability p and then takes one of its two other values, equally likely), and
+# decoded with decode_batch(). Every trial ends in one of:
+#   - delivered right: clean or corrected, and the message is the one sent,
+#   - decoded error: clean or corrected, but the message is wrong (a miscorrection when corrected),
+#   - detected: the decoder reports Module.STATUS_UNCORRECTABLE.
+#
+# The number of hit trits per codeword is drawn first (binomial), so only the codewords that the
+# channel touched are encoded and decoded: an untouched codeword always decodes clean. At low p
+# that is a tiny fraction of the trials. Shards draw from independent SeedSequence children, so
+# their counts add up, on one machine (simulate_parallel) or across machines (--shard, merge).
+
+BATCH_TRIALS = 1 << 16          # trials drawn per batch
+Z_95 = 1.959963984540054        # two-sided 95% normal quantile
+
+#=-=-=-=-=-=-=- Confidence Interval =-=-=-=-=-=-=-
+def wilson_interval(successes, trials, z=Z_95):
+    """
+    Wilson score interval of a binomial proportion, usable down to 0 successes.
+
+    Returns:
+        tuple: (low, high), (0.0, 1.0) when there are no trials.
+
+    Example:
+        >>> wilson_interval(0, 10**9)
+        (0.0, 3.841458805937319e-09)
+    """
+
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    z2 = z * z
+    centre = (rate + z2 / (2 * trials)) / (1 + z2 / trials)
+    half = z * math.sqrt(rate * (1 - rate) / trials + z2 / (4 * trials * trials)) / (1 + z2 / trials)
+    low = max(centre - half, 0.0) if successes else 0.0
+    high = min(centre + half, 1.0) if successes < trials else 1.0
+    return low, high
+
+#=-=-=-=-=-=-=- Counters =-=-=-=-=-=-=-
+class ChannelCounts:
+    """
+    Outcome counters of a simulation; counters of shards add up with +=.
+
+    Attributes:
+        trials (int): Codewords sent.
+        clean, corrected, uncorrectable (int): Decoder status counts.
+        decoded_errors (int): Clean or corrected, with a wrong message.
+        miscorrected (int): Corrected, with a wrong message (part of decoded_errors).
+        hits (numpy.ndarray): int64 (codeword_length + 1,), trials per number of hit trits.
+    """
+
+    __slots__ = ("trials", "clean", "corrected", "uncorrectable", "decoded_errors", "miscorrected", "hits")
+    _FIELDS = __slots__[:-1]
+
+    def __init__(self, codeword_length):
+        for name in self._FIELDS:
+            setattr(self, name, 0)
+        self.hits = np.zeros(codeword_length + 1, dtype=np.int64)
+
+    def __iadd__(self, other):
+        for name in self._FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.hits += other.hits
+        return self
+
+    @property
+    def detected(self):
+        return self.uncorrectable
+
+    def rates(self, z=Z_95):
+        """
+        Per-trial rates with their Wilson intervals.
+
+        Returns:
+            dict: {"decoded_error", "miscorrection", "detection", "corrected"} -> (rate, low, high)
+        """
+
+        counts = {"decoded_error": self.decoded_errors, "miscorrection": self.miscorrected,
+                  "detection": self.detected, "corrected": self.corrected}
+        return {name: (count / self.trials if self.trials else 0.0,) + wilson_interval(count, self.trials, z)
+                for name, count in counts.items()}
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in self._FIELDS}
+        result["hits"] = self.hits.tolist()
+        return result
+
+    @classmethod
+    def from_dict(cls, data):
+        counts = cls(len(data["hits"]) - 1)
+        for name in cls._FIELDS:
+            setattr(counts, name, int(data[name]))
+        counts.hits[:] = data["hits"]
+        return counts
+
+    def __repr__(self):
+        return (f"ChannelCounts(trials={self.trials}, decoded_errors={self.decoded_errors}, "
+                f"miscorrected={self.miscorrected}, detected={self.detected})")
+
+#=-=-=-=-=-=-=- Channel =-=-=-=-=-=-=-
+def ternary_symmetric_channel(codewords, hit_counts, rng):
+    """
+    Hit hit_counts[i] distinct, uniformly chosen trits of row i, each moved by +1 or +2 (mod 3).
+
+    Parameters:
+        codewords (numpy.ndarray): uint8 (count, length).
+        hit_counts (numpy.ndarray): Hit trits per row, 0..length.
+        rng (numpy.random.Generator): Source of randomness.
+
+    Returns:
+        numpy.ndarray: The received words, uint8 (count, length).
+    """
+
+    count, length = codewords.shape
+    order = rng.random((count, length)).argsort(axis=1)         # a random permutation per row
+    hit = np.zeros((count, length), dtype=bool)
+    hit[np.arange(count)[:, None], order] = np.arange(length) < np.asarray(hit_counts)[:, None]
+    shifts = rng.integers(1, 3, (count, length), dtype=np.uint8)
+    return (codewords + shifts * hit) % 3
+
+def simulate_batch(scheme, block_length, codeword_length, p, trials, rng, counts):
+    # Send `trials` codewords, add their outcomes to counts
+    hit_counts = rng.binomial(codeword_length, p, trials)
+    counts.trials += trials
+    counts.hits += np.bincount(hit_counts, minlength=codeword_length + 1)
+    touched = hit_counts[hit_counts > 0]
+    counts.clean += trials - len(touched)
+    if not len(touched):
+        return
+
+    messages = rng.integers(0, 3, (len(touched), block_length), dtype=np.uint8)
+    codewords = Stream_Codec.ENCODERS[scheme].encode_batch(messages)
+    received = ternary_symmetric_channel(codewords, touched, rng)
+    _, decoded, status, _ = Stream_Codec.DECODERS[scheme].decode_batch(received)
+
+    counts_by_status = np.bincount(status, minlength=3)
+    counts.clean += int(counts_by_status[Module.STATUS_CLEAN])
+    counts.corrected += int(counts_by_status[Module.STATUS_CORRECTED])
+    counts.uncorrectable += int(counts_by_status[Module.STATUS_UNCORRECTABLE])
+    wrong = (decoded != messages).any(axis=1) & (status != Module.STATUS_UNCORRECTABLE)
+    counts.decoded_errors += int(wrong.sum())
+    counts.miscorrected += int((wrong & (status == Module.STATUS_CORRECTED)).sum())
+
+#=-=-=-=-=-=-=- One Process =-=-=-=-=-=-=-
+def simulate(scheme, p, trials, block_length=None, dimension=None, seed=None, batch_trials=BATCH_TRIALS):
+    """
+    Monte Carlo run of one code over a ternary symmetric channel, in this process.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        p (float): Probability that a trit is hit.
+        trials (int): Codewords to send.
+        block_length, dimension: As in Stream_Codec.block_plan().
+        seed (int or numpy.random.SeedSequence, optional): Seed of the run.
+        batch_trials (int): Trials per batch.
+
+    Returns:
+        ChannelCounts: Outcome counters.
+
+    Raises:
+        ValueError: If p is not a probability, or as Stream_Codec.block_plan().
+
+    Example:
+        >>> simulate("D4", 1e-3, 10**7, dimension=5, seed=1)
+        ChannelCounts(trials=10000000, decoded_errors=11, miscorrected=11, detected=8380)
+    """
+
+    if not 0.0 <= p <= 1.0:
+        raise ValueError(f"p should be a probability, got {p}")
+    _, block_length, codeword_length = Stream_Codec.block_plan(scheme, block_length, dimension)
+    rng = np.random.default_rng(seed)
+    counts = ChannelCounts(codeword_length)
+    for start in range(0, trials, batch_trials):
+        simulate_batch(scheme, block_length, codeword_length, p, min(batch_trials, trials - start), rng, counts)
+    return counts
+
+#=-=-=-=-=-=-=- Shards over Processes (or Machines) =-=-=-=-=-=-=-
+def shard_trials(trials, shards, index):
+    """Trials of shard `index` when `trials` are split as evenly as possible over `shards`."""
+    return trials // shards + (index < trials % shards)
+
+def shard_seed(seed, shards, index):
+    """SeedSequence of shard `index`: the same on every machine for the same (seed, shards)."""
+    return np.random.SeedSequence(seed).spawn(shards)[index]
+
+def _run_shard(scheme, p, trials, block_length, dimension, seed, batch_trials):
+    return simulate(scheme, p, trials, block_length, dimension, seed, batch_trials).as_dict()
+
+def simulate_parallel(scheme, p, trials, block_length=None, dimension=None, seed=None, workers=None,
+                      shards=None, batch_trials=BATCH_TRIALS):
+    """
+    simulate() split into shards run on a pool of worker processes, counters summed.
+
+    Parameters:
+        seed (int, optional): Root seed, the shards take its SeedSequence children. None draws one.
+        workers (int, optional): Processes, os.cpu_count() by default.
+        shards (int, optional): Pieces of work, 4 per worker by default.
+        (others as simulate())
+
+    Returns:
+        tuple: (ChannelCounts, seed), the root seed to repeat the run.
+
+    Note:
+        - With the "spawn" start method, call it under `if __name__ == "__main__":`.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    shards = shards or 4 * workers
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    _, _, codeword_length = Stream_Codec.block_plan(scheme, block_length, dimension)
+    counts = ChannelCounts(codeword_length)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(_run_shard, scheme, p, shard_trials(trials, shards, index), block_length,
+                               dimension, shard_seed(seed, shards, index), batch_trials)
+                   for index in range(shards)]
+        for future in futures:
+            counts += ChannelCounts.from_dict(future.result())
+    return counts, seed
+
+#=-=-=-=-=-=-=- Command Line =-=-=-=-=-=-=-
+def report(settings, counts):
+    """Settings, counters and rates (with 95% intervals) of a run as one JSON-ready dict."""
+    return {"settings": settings, "counts": counts.as_dict(),
+            "rates": {name: {"rate": rate, "low": low, "high": high}
+                      for name, (rate, low, high) in counts.rates().items()}}
+
+def merge_reports(reports):
+    """
+    Sum the counters of shard reports of one run.
+
+    Parameters:
+        reports (list of dict): report() dicts, e.g. read from the JSON files of `run --shard`.
+
+    Returns:
+        tuple: (settings, ChannelCounts), settings of the merged run (trials summed, shard None).
+
+    Raises:
+        ValueError: If the reports are not all of the same run (every setting but the shard must
+            match) or the same shard comes twice.
+    """
+
+    first = reports[0]["settings"]
+    shards = set()
+    for shard_report in reports:
+        other = shard_report["settings"]
+        differ = sorted(key for key in set(first) | set(other)
+                        if key != "shard" and first.get(key) != other.get(key))
+        if len(shard_report["counts"]["hits"]) != len(reports[0]["counts"]["hits"]):
+            differ.append("codeword length")
+        if differ:
+            raise ValueError(f"reports of different runs, they differ in {', '.join(differ)}")
+        shard = other.get("shard")
+        if shard in shards:
+            raise ValueError(f"shard {shard} of the run is given twice" if shard is not None
+                             else "a full (unsharded) run is given twice")
+        shards.add(shard)
+
+    counts = ChannelCounts.from_dict(reports[0]["counts"])
+    for shard_report in reports[1:]:
+        counts += ChannelCounts.from_dict(shard_report["counts"])
+    return dict(first, trials=counts.trials, shard=None), counts
+
+def _print_rates(counts):
+    print(f"{counts.trials} trials", file=sys.stderr)
+    for name, (rate, low, high) in counts.rates().items():
+        print(f"  {name:<14} {rate:.3e}  [{low:.3e}, {high:.3e}]", file=sys.stderr)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Monte Carlo D3/D4 over a ternary symmetric channel.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="simulate, print a JSON report")
+    run.add_argument("-s", "--scheme", choices=sorted(Stream_Codec.ENCODERS), default="D3")
+    size = run.add_mutually_exclusive_group(required=True)
+    size.add_argument("-b", "--block-length", type=int, help="message trits per codeword")
+    size.add_argument("-d", "--dimension", type=int, help="dimension of the code (largest block it carries)")
+    run.add_argument("-p", "--probability", type=float, required=True, help="trit error probability")
+    run.add_argument("-n", "--trials", type=lambda text: int(float(text)), required=True, help="e.g. 1e9")
+    run.add_argument("--seed", type=int, help="root seed (drawn and reported when missing)")
+    run.add_argument("-w", "--workers", type=int, help="processes (default: all CPUs)")
+    run.add_argument("--shards", type=int, help="pieces of work (default: 4 per worker)")
+    run.add_argument("--shard", type=int, help="only run this shard of --shards (one machine of many), needs --seed")
+    run.add_argument("--batch-trials", type=int, default=BATCH_TRIALS)
+    run.add_argument("-o", "--output", help="JSON file for the report (default: stdout)")
+
+    merge = commands.add_parser("merge", help="sum the counters of shard reports")
+    merge.add_argument("reports", nargs="+")
+    merge.add_argument("-o", "--output", help="JSON file for the report (default: stdout)")
+    return parser
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Example:
+        $ python Channel_Simulator.py run -s D4 -d 5 -p 1e-3 -n 1e9 --seed 7 -o d4.json
+        $ python Channel_Simulator.py run -s D4 -d 5 -p 1e-3 -n 1e9 --seed 7 --shards 16 --shard 3 -o part3.json
+        $ python Channel_Simulator.py merge part*.json -o d4.json
+    """
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        reports = []
+        for path in args.reports:
+            with open(path) as file:
+                reports.append(json.load(file))
+        try:
+            settings, counts = merge_reports(reports)
+        except ValueError as error:
+            parser.error(str(error))
+    else:
+        settings = {"scheme": args.scheme, "block_length": args.block_length, "dimension": args.dimension,
+                    "p": args.probability, "trials": args.trials, "seed": args.seed}
+        if args.shard is not None:
+            if args.seed is None or args.shards is None or not 0 <= args.shard < args.shards:
+                parser.error("--shard needs --seed and --shards, with 0 <= shard < shards")
+            settings.update(shards=args.shards, shard=args.shard)
+            counts = simulate(args.scheme, args.probability, shard_trials(args.trials, args.shards, args.shard),
+                              args.block_length, args.dimension, shard_seed(args.seed, args.shards, args.shard),
+                              args.batch_trials)
+        else:
+            counts, settings["seed"] = simulate_parallel(args.scheme, args.probability, args.trials,
+                                                         args.block_length, args.dimension, args.seed,
+                                                         args.workers, args.shards, args.batch_trials)
+
+    _print_rates(counts)
+    text = json.dumps(report(settings, counts), indent=1)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
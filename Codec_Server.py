@@ -0,0 +1,267 @@
+import Module
+import Stream_Codec
+import argparse
+import asyncio
+import json
+import sys
+import numpy as np
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Local Codec Service: JSON Lines, Micro-Batched =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# One JSON object per line, over TCP or a Unix socket:
+#     {"id": 1, "op": "encode", "scheme": "D3", "data": "1021"}
+#     {"id": 1, "codeword": "1210021"}
+#     {"id": 2, "op": "decode", "scheme": "D3", "data": "1210022"}
+#     {"id": 2, "status": 1, "position": 6, "corrected": "1210021", "message": "1021"}
+#     {"id": 3, "op": "stats"}
+# A failed request gets {"id": ..., "error": "..."}; replies may come out of order, match them by id.
+#
+# Requests of all connections go through one bounded queue. The batcher takes what arrives within
+# a short window and codes each (op, scheme, length) group with one encode_batch() / decode_batch()
+# call, so the layout and matrices are set up once per group instead of once per message.
+# Back-pressure: a full queue blocks the producers, and each connection has a bounded number of
+# requests in flight, after which its socket is no longer read.
+
+WINDOW = 0.002                  # seconds the batcher waits for more requests
+MAX_BATCH = 4096                # requests taken per window
+MAX_QUEUE = 65536               # requests waiting for the batcher, all connections together
+MAX_IN_FLIGHT = 1024            # unanswered requests per connection
+LINE_LIMIT = 1 << 24            # longest request line, in bytes
+_OPS = ("encode", "decode")
+
+#=-=-=-=-=-=-=- Micro-Batcher =-=-=-=-=-=-=-
+class MicroBatcher:
+    """
+    Coalesce concurrent encode/decode requests into batches by (op, scheme, length).
+
+    Parameters:
+        window (float): Seconds to wait for more requests after the first one of a batch.
+        max_batch (int): Most requests taken per window.
+        max_queue (int): Bound of the request queue; submit() waits while it is full.
+
+    Example:
+        >>> batcher = MicroBatcher()
+        >>> batcher.start()
+        >>> await batcher.submit("encode", "D3", "1021")
+        {'codeword': '1210021'}
+        >>> await batcher.close()
+    """
+
+    def __init__(self, window=WINDOW, max_batch=MAX_BATCH, max_queue=MAX_QUEUE):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = asyncio.Queue(max_queue)
+        self._task = None
+        self.requests = 0
+        self.batches = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {"requests": self.requests, "batches": self.batches, "queued": self._queue.qsize(),
+                "layout_cache": Module.get_code_layout.cache_info()._asdict()}
+
+    async def submit(self, op, scheme, data):
+        """
+        Queue one request and wait for its result dict.
+
+        Raises:
+            ValueError: If op, scheme or data are invalid, or the length is not supported by the scheme.
+        """
+
+        if op not in _OPS:
+            raise ValueError(f"Unknown op {op!r}, should be one of {list(_OPS)}")
+        if scheme not in Stream_Codec.ENCODERS:
+            raise ValueError(f"Unknown scheme {scheme!r}, should be one of {sorted(Stream_Codec.ENCODERS)}")
+        if not isinstance(data, str) or not data or data.strip('012'):
+            raise ValueError("data should be a non-empty string of '0', '1', '2'")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((op, scheme, len(data)), data, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(pending) < self.max_batch:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    pending.append(self._queue.get_nowait())
+
+            groups = {}
+            for key, data, future in pending:
+                groups.setdefault(key, []).append((data, future))
+            for key, items in groups.items():
+                await self._run_group(loop, key, items)
+
+    async def _run_group(self, loop, key, items):
+        items = [(data, future) for data, future in items if not future.cancelled()]
+        if not items:
+            return
+        op, scheme, length = key
+        rows = (np.frombuffer(''.join(data for data, _ in items).encode('ascii'), dtype=np.uint8)
+                - ord('0')).reshape(len(items), length)
+        try:
+            results = await loop.run_in_executor(None, _code_group, op, scheme, rows)
+        except Exception as error:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(ValueError(str(error)))
+            return
+        self.requests += len(items)
+        self.batches += 1
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+def _text(row):
+    return (row + ord('0')).tobytes().decode('ascii')
+
+def _code_group(op, scheme, rows):
+    # One batch call for a group of same-length requests, one result dict per row
+    if op == "encode":
+        return [{"codeword": _text(row)} for row in Stream_Codec.ENCODERS[scheme].encode_batch(rows)]
+    corrected, messages, status, positions = Stream_Codec.DECODERS[scheme].decode_batch(rows)
+    return [{"status": int(code), "position": int(position), "corrected": _text(word),
+             "message": _text(message) if code != Module.STATUS_UNCORRECTABLE else None}
+            for word, message, code, position in zip(corrected, messages, status, positions)]
+
+#=-=-=-=-=-=-=- Connections =-=-=-=-=-=-=-
+async def _write(writer, lock, reply):
+    async with lock:
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+
+async def _answer(batcher, request, writer, lock, slots):
+    try:
+        if not isinstance(request, dict):
+            raise ValueError("a request should be a JSON object")
+        if request.get("op") == "stats":
+            reply = batcher.stats()
+        else:
+            reply = await batcher.submit(request.get("op"), request.get("scheme"), request.get("data"))
+    except Exception as error:
+        reply = {"error": str(error)}
+    finally:
+        slots.release()
+    if isinstance(request, dict) and "id" in request:
+        reply = dict(reply, id=request["id"])
+    await _write(writer, lock, reply)
+
+async def handle_connection(batcher, reader, writer, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Serve one client: read request lines, answer each as soon as its batch is done.
+    """
+
+    lock = asyncio.Lock()
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+    try:
+        while True:
+            await slots.acquire()               # back-pressure: stop reading while max_in_flight are open
+            try:
+                line = await reader.readline()
+            except (ValueError, ConnectionError):
+                break                           # over LINE_LIMIT, or the client went away
+            if not line:
+                break
+            if not line.strip():
+                slots.release()
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                slots.release()
+                await _write(writer, lock, {"error": f"invalid JSON: {error}"})
+                continue
+            task = asyncio.ensure_future(_answer(batcher, request, writer, lock, slots))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def serve(host="127.0.0.1", port=8765, path=None, window=WINDOW, max_batch=MAX_BATCH,
+                max_queue=MAX_QUEUE, max_in_flight=MAX_IN_FLIGHT, ready=None):
+    """
+    Run the service until cancelled, on TCP (host, port) or on the Unix socket `path`.
+
+    Parameters:
+        ready (callable, optional): Called with the asyncio server once it listens.
+    """
+
+    batcher = MicroBatcher(window, max_batch, max_queue)
+    batcher.start()
+
+    async def client(reader, writer):
+        await handle_connection(batcher, reader, writer, max_in_flight)
+
+    if path:
+        server = await asyncio.start_unix_server(client, path, limit=LINE_LIMIT)
+    else:
+        server = await asyncio.start_server(client, host, port, limit=LINE_LIMIT)
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.close()
+
+#=-=-=-=-=-=-=- Command Line =-=-=-=-=-=-=-
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Example:
+        $ python Codec_Server.py --port 8765
+        $ python Codec_Server.py --unix /tmp/codec.sock --window-ms 1
+        $ echo '{"id": 1, "op": "encode", "scheme": "D4", "data": "120102"}' | nc -q1 127.0.0.1 8765
+    """
+
+    parser = argparse.ArgumentParser(description="JSON-lines D3/D4 encode/decode service with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--window-ms", type=float, default=WINDOW * 1000, help="batching window")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="requests per window")
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE, help="bound of the request queue")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="unanswered requests per connection")
+    args = parser.parse_args(argv)
+
+    def ready(server):
+        where = args.unix or ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving on {where}", file=sys.stderr)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.window_ms / 1000, args.max_batch,
+                          args.max_queue, args.max_in_flight, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
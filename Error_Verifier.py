@@ -0,0 +1,280 @@
+import Module
+import Stream_Codec
+import Web_Final_D3_EC
+import Web_Final_D4_EC
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import argparse
+import json
+import os
+import sys
+import numpy as np
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Exhaustive Error Pattern Verifier =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# Both codes are linear and both decoders decide from the syndrome alone (syndrome_table() of D3,
+# decision_table() of D4), so what happens to codeword + error depends on the error pattern only:
+# its syndrome is the sum of value * H[position] over its hit trits. Every pattern of a weight is
+# pushed through the decoder's own table, many at once as digit arrays, and checked against the
+# claim of the scheme:
+#   - weight 1: corrected, at the hit position and by the right value,
+#   - weight 2 .. detects: reported Module.STATUS_UNCORRECTABLE.
+# Patterns are split by their first hit position over a pool of processes. Counterexamples are
+# then replayed on a real codeword through main_function(), the one-string decoder.
+
+CLAIMS = {"D3": {"corrects": 1, "detects": 2}, "D4": {"corrects": 1, "detects": 3}}
+MAX_WEIGHT = 3
+EXAMPLES = 10                   # counterexamples kept per weight
+TASKS_PER_WORKER = 4
+
+#=-=-=-=-=-=-=- The Decoder's Tables =-=-=-=-=-=-=-
+def decision_arrays(scheme, dimension, length):
+    """
+    Check matrix and decision of the batched decoder for every syndrome key.
+
+    Returns:
+        tuple: (H, positions, changes, status)
+            - H: uint8 (length, columns), syndrome digits = error @ H (mod 3); for D4 the
+              columns are the P_all digits, then P_1, P_2
+            - positions, changes, status: indexed by the syndrome digits read as a base-3 number,
+              as in decode_batch()
+    """
+
+    if scheme == "D3":
+        H = Web_Final_D3_EC.parity_check_matrix(dimension, length)
+        positions, changes = Web_Final_D3_EC.syndrome_table(dimension, length)
+        positions = np.frombuffer(positions, dtype=np.int32)
+        changes = np.frombuffer(changes, dtype=np.int8).astype(np.uint8)
+        status = np.where(positions >= 0, Module.STATUS_CORRECTED, Module.STATUS_UNCORRECTABLE).astype(np.uint8)
+        status[0] = Module.STATUS_CLEAN
+        return H, positions, changes, status
+    if scheme == "D4":
+        return (Web_Final_D4_EC.check_matrix(dimension, length),) + Web_Final_D4_EC.decision_table(dimension, length)
+    raise ValueError(f"Unknown scheme {scheme!r}, should be one of {sorted(CLAIMS)}")
+
+def _contributions(H):
+    # (length, 2, columns): syndrome digits of a +1 / +2 error at each position
+    return (np.array([1, 2], dtype=np.uint8)[None, :, None] * H[:, None, :]) % 3
+
+#=-=-=-=-=-=-=- Check a Set of Patterns =-=-=-=-=-=-=-
+def _new_tally(weight):
+    return {"weight": weight, "patterns": 0, "corrected": 0, "detected": 0,
+            "miscorrected": 0, "undetected": 0, "counterexamples": []}
+
+def _judge(tally, weight, keys, tables, positions, values, limit):
+    # Add the decisions for the syndrome keys of some patterns of one weight to tally;
+    # positions (count, weight) and values (weight,) or (count, weight) describe the patterns
+    _, table_positions, table_changes, table_status = tables
+    status = table_status[keys]
+    if weight == 1:
+        good = ((status == Module.STATUS_CORRECTED) & (table_positions[keys] == positions[:, 0])
+                & (table_changes[keys] == np.broadcast_to(values, positions.shape)[:, 0]))
+        tally["corrected"] += int(good.sum())
+    else:
+        good = status == Module.STATUS_UNCORRECTABLE
+    tally["patterns"] += len(keys)
+    tally["detected"] += int((status == Module.STATUS_UNCORRECTABLE).sum())
+    tally["miscorrected"] += int(((status == Module.STATUS_CORRECTED) & ~good).sum())
+    tally["undetected"] += int((status == Module.STATUS_CLEAN).sum())
+
+    for row in np.flatnonzero(~good)[:limit - len(tally["counterexamples"])]:
+        tally["counterexamples"].append({
+            "positions": positions[row].tolist(),
+            "values": np.broadcast_to(values, positions.shape)[row].tolist(),
+            "status": int(status[row]), "corrected_position": int(table_positions[keys[row]])})
+
+def check_weight(scheme, dimension, length, weight, firsts=None, limit=EXAMPLES):
+    """
+    Decide every error pattern of one weight (1 to 3) whose first hit position is in `firsts`.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        dimension (int), length (int): The code (length with O and E for D4).
+        weight (int): Number of hit trits.
+        firsts (iterable of int, optional): First (lowest) hit positions, all by default.
+        limit (int): Counterexamples to keep.
+
+    Returns:
+        dict: {"weight", "patterns", "corrected", "detected", "miscorrected", "undetected",
+        "counterexamples"}; a counterexample holds the hit "positions", the "values" added there,
+        the decoder "status" and the position it would correct ("corrected_position", -1 if none).
+    """
+
+    tables = decision_arrays(scheme, dimension, length)
+    contributions = _contributions(tables[0])
+    powers = 3 ** np.arange(contributions.shape[2] - 1, -1, -1, dtype=np.int64)
+    tally = _new_tally(weight)
+    firsts = range(length) if firsts is None else firsts
+
+    if weight == 1:
+        positions = np.asarray(list(firsts), dtype=np.int64)[:, None]
+        for value in (1, 2):
+            keys = contributions[positions[:, 0], value - 1].astype(np.int64) @ powers
+            _judge(tally, 1, keys, tables, positions, np.array([value]), limit)
+        return tally
+    if weight not in (2, 3):
+        raise ValueError(f"weight should be 1, 2 or 3, got {weight}")
+
+    for first in firsts:
+        # Every tail of weight-1 positions after `first`, vectorized
+        if weight == 2:
+            tails = np.arange(first + 1, length)[:, None]
+        else:
+            j, k = np.triu_indices(length - first - 1, 1)
+            tails = np.stack([j, k], axis=1) + first + 1
+        if not len(tails):
+            continue
+        positions = np.hstack([np.full((len(tails), 1), first), tails])
+        for values in product((1, 2), repeat=weight):
+            digits = contributions[first, values[0] - 1][None, :].copy()
+            for column, value in enumerate(values[1:]):
+                digits = digits + contributions[tails[:, column], value - 1]
+            keys = (digits % 3).astype(np.int64) @ powers
+            _judge(tally, weight, keys, tables, positions, np.array(values), limit)
+    return tally
+
+def _merge(tallies, limit):
+    total = _new_tally(tallies[0]["weight"])
+    for tally in tallies:
+        for name in ("patterns", "corrected", "detected", "miscorrected", "undetected"):
+            total[name] += tally[name]
+        total["counterexamples"].extend(tally["counterexamples"])
+    total["counterexamples"] = sorted(total["counterexamples"], key=lambda example: example["positions"])[:limit]
+    return total
+
+#=-=-=-=-=-=-=- Counterexamples on a Real Codeword =-=-=-=-=-=-=-
+def replay(scheme, length, example, seed=0):
+    """
+    Put a counterexample pattern on a random codeword and decode it with main_function().
+
+    Returns:
+        dict: The example with "codeword", "received" and what main_function() reported
+        ("location", "announcement", "message_ok": whether the message came back).
+    """
+
+    rng = np.random.default_rng(seed)
+    decoder = Stream_Codec.DECODERS[scheme]
+    layout = Module.get_code_layout(scheme, decoder.decide_dimension(length), length)
+    if layout.complete:
+        message = rng.integers(0, 3, (1, len(layout.message_positions)), dtype=np.uint8)
+        codeword = Stream_Codec.ENCODERS[scheme].encode_batch(message)[0]
+    else:
+        codeword = np.zeros(length, dtype=np.uint8)        # the zero word is a codeword of any linear code
+    received = codeword.copy()
+    received[example["positions"]] = (received[example["positions"]] + np.asarray(example["values"])) % 3
+
+    text = ''.join(map(str, received))
+    result = decoder.main_function(text)
+    if scheme == "D3":
+        location, announcement, message_text = result[1], result[3], result[4]
+    else:
+        location, announcement, message_text = result[2], result[3], result[1]
+    sent = ''.join(str(codeword[position]) for position in layout.message_positions)
+    return dict(example, codeword=''.join(map(str, codeword)), received=text, location=location,
+                announcement=announcement, message_ok=message_text == sent)
+
+#=-=-=-=-=-=-=- Full Sweep =-=-=-=-=-=-=-
+def _first_groups(length, groups):
+    # Interleaved first positions, so every group gets as many long and short tails
+    return [range(start, length, groups) for start in range(min(groups, length))]
+
+def verify(scheme, dimension, length=None, max_weight=None, workers=None, limit=EXAMPLES, seed=0):
+    """
+    Check every error pattern of weight 1 .. max_weight of one code against the claims of its scheme.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        dimension (int): Dimension of the code.
+        length (int, optional): Codeword length (O and E included for D4), the longest codeword of
+            this dimension by default.
+        max_weight (int, optional): Heaviest pattern (at most 3), the scheme's detection claim by default.
+        workers (int, optional): Processes, os.cpu_count() by default; 1 runs in this process.
+        limit (int): Counterexamples kept (and replayed) per weight.
+        seed (int): Seed of the codewords the counterexamples are replayed on.
+
+    Returns:
+        dict: {"scheme", "dimension", "length", "claims", "holds", "weights": [check_weight() dicts]},
+        each counterexample completed by replay().
+
+    Raises:
+        ValueError: If the scheme is unknown or the length does not belong to the dimension.
+
+    Example:
+        >>> report = verify("D4", 5)
+        >>> report["holds"], [(weight["patterns"], weight["miscorrected"]) for weight in report["weights"]]
+        (False, [(84, 0), (3444, 0), (91840, 8160)])
+    """
+
+    if scheme not in CLAIMS:
+        raise ValueError(f"Unknown scheme {scheme!r}, should be one of {sorted(CLAIMS)}")
+    claims = CLAIMS[scheme]
+    if length is None:
+        dimensions, _, codewords = Module.capacity_table(scheme)
+        if dimension not in dimensions:
+            raise ValueError(f"{scheme} has no dimension {dimension}")
+        length = codewords[dimensions.index(dimension)]
+    if Stream_Codec.DECODERS[scheme].decide_dimension(length) != dimension:
+        raise ValueError(f"a {scheme} codeword of {length} trits has dimension "
+                         f"{Stream_Codec.DECODERS[scheme].decide_dimension(length)}, not {dimension}")
+    max_weight = min(max_weight or claims["detects"], MAX_WEIGHT)
+    workers = workers or os.cpu_count() or 1
+
+    weights = []
+    if workers == 1:
+        for weight in range(1, max_weight + 1):
+            weights.append(check_weight(scheme, dimension, length, weight, limit=limit))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            for weight in range(1, max_weight + 1):
+                groups = 1 if weight == 1 else workers * TASKS_PER_WORKER
+                futures = [pool.submit(check_weight, scheme, dimension, length, weight, firsts, limit)
+                           for firsts in _first_groups(length, groups)]
+                weights.append(_merge([future.result() for future in futures], limit))
+
+    for tally in weights:
+        tally["counterexamples"] = [replay(scheme, length, example, seed) for example in tally["counterexamples"]]
+    holds = all(tally["patterns"] == (tally["corrected"] if tally["weight"] <= claims["corrects"] else tally["detected"])
+                for tally in weights)
+    return {"scheme": scheme, "dimension": dimension, "length": length, "claims": claims,
+            "holds": holds, "weights": weights}
+
+#=-=-=-=-=-=-=- Command Line =-=-=-=-=-=-=-
+def _print_report(report):
+    print(f"{report['scheme']} dimension {report['dimension']}, length {report['length']}: "
+          f"claims {report['claims']} {'hold' if report['holds'] else 'FAIL'}")
+    for tally in report["weights"]:
+        print(f"  weight {tally['weight']}: {tally['patterns']} patterns, {tally['corrected']} corrected, "
+              f"{tally['detected']} detected, {tally['miscorrected']} miscorrected, {tally['undetected']} undetected")
+        for example in tally["counterexamples"]:
+            print(f"    {example['codeword']} -> {example['received']}  hit {example['positions']} "
+                  f"by {example['values']}: {example['announcement']}")
+
+def main(argv=None):
+    """
+    Command line entry point. Exits with 1 when a claim does not hold.
+
+    Example:
+        $ python Error_Verifier.py -s D4 -d 8
+        $ python Error_Verifier.py -s D3 -d 4 -l 30 --examples 3 --json
+    """
+
+    parser = argparse.ArgumentParser(description="Exhaustive single/double/triple error check of a D3/D4 code.")
+    parser.add_argument("-s", "--scheme", choices=sorted(CLAIMS), default="D3")
+    parser.add_argument("-d", "--dimension", type=int, required=True)
+    parser.add_argument("-l", "--length", type=int, help="codeword length (default: longest of the dimension)")
+    parser.add_argument("--max-weight", type=int, choices=range(1, MAX_WEIGHT + 1),
+                        help="heaviest error pattern (default: the detection claim)")
+    parser.add_argument("-w", "--workers", type=int, help="processes (default: all CPUs)")
+    parser.add_argument("--examples", type=int, default=EXAMPLES, help="counterexamples shown per weight")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the codewords counterexamples are shown on")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a summary")
+    args = parser.parse_args(argv)
+
+    report = verify(args.scheme, args.dimension, args.length, args.max_weight, args.workers, args.examples, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=1))
+    else:
+        _print_report(report)
+    return 0 if report["holds"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Cold-Start Import Benchmark =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# Every entry module is imported in a fresh interpreter, so each run is a real cold start
+# (bytecode caches aside). The child also reports whether the import pulled in numpy.
+# Stream_Codec, Bulk_Codec and Parallel_Codec need numpy; in a numpy-free interpreter their
+# rows carry the import error instead of timings.
+
+ENTRY_MODULES = ("Module", "Web_Final_D3", "Web_Final_D3_EC", "Web_Final_D4", "Web_Final_D4_EC",
+                 "Web_Api", "Stream_Codec", "Bulk_Codec", "Parallel_Codec")     # Web_Api: what the pages import
+REPEAT = 7
+
+_CHILD = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, 'numpy' in sys.modules)
+"""
+
+def time_import(module, repeat=REPEAT, python=sys.executable):
+    """
+    Cold-start import time of one module.
+
+    Parameters:
+        module (str): Module name, importable from this directory.
+        repeat (int): Number of fresh interpreters.
+        python (str): Interpreter to run.
+
+    Returns:
+        dict: {"module", "best_ms", "median_ms", "loads_numpy"}, or {"module", "error"} when the
+        import fails (e.g. "ModuleNotFoundError: No module named 'numpy'").
+    """
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    loads_numpy = False
+    for _ in range(repeat):
+        result = subprocess.run([python, "-c", _CHILD.format(module=module)], cwd=here,
+                                capture_output=True, text=True)
+        if result.returncode:
+            lines = result.stderr.strip().splitlines()
+            return {"module": module, "error": lines[-1] if lines else f"exit status {result.returncode}"}
+        elapsed, numpy_loaded = result.stdout.split()
+        times.append(float(elapsed) * 1000)
+        loads_numpy = numpy_loaded == "True"
+    return {"module": module, "best_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3),
+            "loads_numpy": loads_numpy}
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Example:
+        $ python Import_Benchmark.py
+        $ python Import_Benchmark.py Module Web_Final_D3 --repeat 20 --json
+    """
+
+    parser = argparse.ArgumentParser(description="Cold-start import time of each entry module.")
+    parser.add_argument("modules", nargs="*", default=list(ENTRY_MODULES))
+    parser.add_argument("-r", "--repeat", type=int, default=REPEAT, help="fresh interpreters per module")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = [time_import(module, args.repeat) for module in args.modules]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'module':<18}{'best ms':>10}{'median ms':>12}  numpy")
+    for row in results:
+        if "error" in row:
+            print(f"{row['module']:<18}  failed: {row['error']}")
+            continue
+        print(f"{row['module']:<18}{row['best_ms']:>10.2f}{row['median_ms']:>12.2f}  {'yes' if row['loads_numpy'] else 'no'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,18 @@
 
 from itertools import product
-from itertools import combinations
+from itertools import islice
+from functools import lru_cache
+import bisect
+import heapq
 import math
-import numpy as np
+import time
 
 #=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Functions =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 
 #=-=-=-=-=-=-=- Calculate Bound for D4 =-=-=-=-=-=-=-
 def fr(r):
     """
-    Calculate the bound value for D4 code analysis.
+    Calculate the bound value for D4 code analysis: the size of I_1 (and of I_2) at dimension r.
 
     Args:
         r (int): Input parameter representing code length
@@ -17,24 +20,16 @@ def fr(r):
     Returns:
         int: Computed bound value
 
+    Example:
+        >>> fr(3), fr(4)
+        (4, 10)
+
     Note:
-        Follows piecewise calculation rules:
-        - r=3 → n=2
-        - 3<r≤7 → floor(r/2)
-        - r≥8 → ceil(r/2)-1
+        Counts the indices with between n and 2n-1 nonzero digits, n from d4_weight_range(r).
     """
-        
-    n = 0
-    if(r == 3):
-        n = 2
-    if(r>3 and r<=7):
-        n = math.floor(r/2)
-    elif(r>=8):
-        n = math.ceil(r/2)-1
-    result = 0
-    for i in range(n,2*n):
-        result += math.comb(r,i)
-    return result
+
+    lowest, highest = d4_weight_range(r)
+    return _d4_completions(r, lowest, highest)
 
 #=-=-=-=-=-=-=- var I_1&I_2 for D4 =-=-=-=-=-=-=- 
 def var_d4_generate_I_odd_or_even(length,num):
@@ -59,21 +54,146 @@ def var_d4_generate_I_odd_or_even(length,num):
     if num not in {1, 2}:
         raise ValueError("num should be either 1 or 2")
 
-    n = math.ceil(length / 2) - 1
-    if length > 3 and length < 8:
-        n = math.floor(length / 2)
-    if(length ==3):
-        n = 2 
-    I_list = []
+    return list(d4_iter_I(length, num))
+
+#=-=-=-=-=-=-=- I_1&I_2 by Weight: Range, Lazy Order, Rank/Unrank =-=-=-=-=-=-=- 
+def d4_weight_range(dimension):
+    """
+    Range of weights (number of nonzero digits) of the I_1/I_2 indices: k in [n, 2n-1].
+
+    Args:
+        dimension (int): Length of index
+
+    Returns:
+        tuple: (lowest, highest) weight, empty range when lowest > highest
+
+    Example:
+        >>> d4_weight_range(3), d4_weight_range(8)
+        ((2, 3), (3, 5))
+    """
+
+    n = math.ceil(dimension / 2) - 1
+    if dimension > 3 and dimension < 8:
+        n = math.floor(dimension / 2)
+    if(dimension ==3):
+        n = 2
+    return n, 2 * n - 1
+
+def _d4_completions(remaining, lowest, highest):
+    # Ways to place between lowest and highest nonzero digits on `remaining` free positions
+    return sum(math.comb(remaining, k) for k in range(max(lowest, 0), min(highest, remaining) + 1))
+
+def d4_iter_I(dimension, num, start=0):
+    """
+    Lazily yield I_1 (num=1) or I_2 (num=2) in ascending order, without building or sorting the set.
+
+    Depth-first over the digits, '0' before `num`, skipping branches that cannot reach the
+    weight range, so every yielded index costs O(dimension). With `start`, the walk seeks
+    straight to d4_I_unrank(start) and goes on from there.
+
+    Raises:
+        ValueError: If start is out of range.
+
+    Example:
+        >>> list(d4_iter_I(3, 2))
+        ['022', '202', '220', '222']
+        >>> list(d4_iter_I(3, 1, start=2))
+        ['110', '111']
+    """
+
+    lowest, highest = d4_weight_range(dimension)
+    if lowest > highest or start == _d4_completions(dimension, lowest, highest):
+        return
+    digit = str(num)
+    floor = d4_I_unrank(start, dimension, num) if start else None
+    prefix = []
+
+    def walk(weight, remaining, bound):
+        # bound: the prefix still equals the first digits of `floor`, so nothing below it is walked
+        if remaining == 0:
+            yield ''.join(prefix)
+            return
+        at_floor = floor[dimension - remaining] if bound else '0'
+        if at_floor == '0' and weight + remaining - 1 >= lowest:   # '0' here can still reach the weight range
+            prefix.append('0')
+            yield from walk(weight, remaining - 1, bound)
+            prefix.pop()
+        if weight + 1 <= highest:                                   # `num` here stays inside the weight range
+            prefix.append(digit)
+            yield from walk(weight + 1, remaining - 1, bound and at_floor == digit)
+            prefix.pop()
+
+    yield from walk(0, dimension, floor is not None)
+
+def d4_I_contains(index, num):
+    """
+    O(d) membership test for the full I_1 (num=1) or I_2 (num=2): digits in {0, num}, weight in range.
+
+    Example:
+        >>> d4_I_contains('101', 1), d4_I_contains('102', 1), d4_I_contains('200', 2)
+        (True, False, False)
+    """
+
+    digit = str(num)
+    weight = 0
+    for char in index:
+        if char == digit:
+            weight += 1
+        elif char != '0':
+            return False
+    lowest, highest = d4_weight_range(len(index))
+    return lowest <= weight <= highest
+
+def d4_I_unrank(rank, dimension, num):
+    """
+    The index at position `rank` of var_d4_generate_I_odd_or_even(dimension, num), without listing it.
+
+    Raises:
+        ValueError: If rank is out of range.
+
+    Example:
+        >>> d4_I_unrank(2, 3, 1)
+        '110'
+    """
+
+    lowest, highest = d4_weight_range(dimension)
+    if not 0 <= rank < _d4_completions(dimension, lowest, highest):
+        raise ValueError(f"rank {rank} out of range for dimension {dimension}")
+    digits = []
+    weight = 0
+    for remaining in range(dimension - 1, -1, -1):
+        with_zero = _d4_completions(remaining, lowest - weight, highest - weight)
+        if rank < with_zero:
+            digits.append('0')
+        else:
+            rank -= with_zero
+            digits.append(str(num))
+            weight += 1
+    return ''.join(digits)
+
+def d4_I_rank(index):
+    """
+    Position of an I_1/I_2 index in its (sorted) set, inverse of d4_I_unrank().
 
-    for k in range(n, 2 * n):  # k in [n, 2n-1]
-        for ones_positions in combinations(range(length), k):
-            ternary_number = ['0'] * length  # Start with all zeros
-            for pos in ones_positions:
-                ternary_number[pos] = str(num) 
-            I_list.append(''.join(ternary_number))
+    Raises:
+        ValueError: If the index is in neither I_1 nor I_2.
+
+    Example:
+        >>> d4_I_rank('110')
+        2
+    """
 
-    return sorted(I_list)
+    num = 2 if '2' in index else 1
+    if not d4_I_contains(index, num):
+        raise ValueError(f"{index!r} is not in I_1 or I_2")
+    lowest, highest = d4_weight_range(len(index))
+    rank = 0
+    weight = 0
+    for position, char in enumerate(index):
+        if char != '0':
+            rank += _d4_completions(len(index) - 1 - position, lowest - weight, highest - weight)
+            weight += 1
+    return rank
 
 #=-=-=-=-=-=-=- Pick Indices for D3 =-=-=-=-=-=-=- 
 def generate_ternary_set_half(length):
@@ -89,16 +209,93 @@ def generate_ternary_set_half(length):
     Example:
         >>> generate_ternary_set_half(3)
         ['001', '010', '011', '012', '100', '101', '102', '110', '111', '112', '120', '121', '122']
+
+    Note:
+        - Listed through ternary_half_unrank(); callers needing only a prefix should unrank it directly.
     """
         
-    total_set = set()
-    for i in range(0,length):
-        base_ternary_set = {''.join(map(str, digits)) for digits in product(range(3), repeat=i)}
-        modified_ternary_set = {"0"*(length-1-i)+'1' + num for num in base_ternary_set}
-        total_set = total_set | modified_ternary_set
-    
-    # Return the sorted result
-    return sorted(total_set)
+    return [ternary_half_unrank(rank, length) for rank in range(ternary_half_size(length))]
+
+#=-=-=-=-=-=-=- Rank/Unrank in the D3 Half Set (No Materialized List) =-=-=-=-=-=-=-
+def ternary_half_size(dimension):
+    """
+    Number of indices of length `dimension` whose leading nonzero digit is 1: (3^d - 1) / 2.
+
+    Example:
+        >>> ternary_half_size(3)
+        13
+    """
+
+    return (3 ** dimension - 1) // 2
+
+def ternary_half_contains(index):
+    """
+    Check in O(d) whether an index (ternary string or its integer value) has 1 as leading nonzero digit.
+
+    Example:
+        >>> ternary_half_contains('012'), ternary_half_contains('021'), ternary_half_contains(0)
+        (True, False, False)
+    """
+
+    value = int(index, 3) if isinstance(index, str) else index
+    while value >= 3:
+        value //= 3
+    return value == 1
+
+def ternary_half_rank(index):
+    """
+    Position of an index in generate_ternary_set_half() (any length), in closed form.
+
+    The indices whose leading digit sits at place 3^k are exactly the values [3^k, 2*3^k),
+    and all smaller blocks hold (3^k - 1) / 2 indices.
+
+    Parameters:
+        index (str or int): Ternary index (or its integer value) of the half set.
+
+    Returns:
+        int: 0-based rank.
+
+    Raises:
+        ValueError: If the index is not in the half set.
+
+    Example:
+        >>> ternary_half_rank('012')
+        3
+    """
+
+    value = int(index, 3) if isinstance(index, str) else index
+    if not ternary_half_contains(value):
+        raise ValueError(f"{index!r} is not in the D3 half set")
+    place = 1
+    while place * 3 <= value:
+        place *= 3
+    return (place - 1) // 2 + value - place
+
+def ternary_half_unrank(rank, dimension):
+    """
+    The index at position `rank` of generate_ternary_set_half(dimension), in closed form.
+
+    Parameters:
+        rank (int): 0-based position, below ternary_half_size(dimension).
+        dimension (int): Length of the returned index.
+
+    Returns:
+        str: Ternary index of `dimension` digits.
+
+    Raises:
+        ValueError: If rank is out of range.
+
+    Example:
+        >>> ternary_half_unrank(3, 3)
+        '012'
+    """
+
+    if not 0 <= rank < ternary_half_size(dimension):
+        raise ValueError(f"rank {rank} out of range for dimension {dimension}")
+    place = 1
+    while (3 * place - 1) // 2 <= rank:
+        place *= 3
+    return int_to_ternary(place + rank - (place - 1) // 2, dimension)
 
 #=-=-=-=-=-=-=- Ask Input(In whatever length) from User(But a min length)=-=-=-=-=-=-=- 
 def get_ternary_input_var(min_length):
@@ -155,7 +352,7 @@ def sort_ternary(list):
     list_decimal = [int(index, 3) for index in list]
     list_decimal_sorted = sorted(list_decimal)
     max_length_list = math.ceil(math.log(max(list_decimal_sorted)+1,3)) # Notice +1 here so 100=9 will have result 3
-    list_decimal_sorted_ternary = [np.base_repr(index, base=3).zfill(max_length_list) for index in list_decimal_sorted]
+    list_decimal_sorted_ternary = [int_to_ternary(index, max(max_length_list, 1)) for index in list_decimal_sorted]
 
     return list_decimal_sorted_ternary
 
@@ -202,6 +399,359 @@ def d4_build_redundant_list(dimension):
     
     return R
 
+#=-=-=-=-=-=-=- Standard Basis Redundant_List for D3 =-=-=-=-=-=-=- 
+def d3_build_redundant_list(dimension):
+    """
+    Generate standard basis vectors e_i as ternary strings, used as redundant indices of the D3 code.
+
+    Parameters:
+        dimension (int): Length of each string (also the number of strings generated).
+
+    Returns:
+        list of str: List of strings representing e_i vectors, e_0 first.
+
+    Example:
+        >>> d3_build_redundant_list(3)
+        ['001', '010', '100']
+    """
+
+    redundant_list = []
+    for i in range(dimension):
+        redundant_list.append("0"*(dimension-1-i)+"1"+"0"*i)
+
+    return redundant_list
+
+#=-=-=-=-=-=-=- Integer Ternary Core: Tables over Chunks of Trits =-=-=-=-=-=-=-
+CHUNK_TRITS = 4
+CHUNK_SIZE = 3 ** CHUNK_TRITS
+
+def _chunk_digits(value):
+    digits = []
+    for _ in range(CHUNK_TRITS):
+        value, digit = divmod(value, 3)
+        digits.append(digit)
+    return digits
+
+def _chunk_value(digits):
+    return sum(digit * 3 ** i for i, digit in enumerate(digits))
+
+# Digit-wise (a+b) mod 3 of two chunks, doubling of one chunk, and chunk -> zero-padded string.
+_CHUNK_DIGITS = [_chunk_digits(value) for value in range(CHUNK_SIZE)]
+def _build_chunk_xor():
+    # Grown one leading trit at a time, xor(x*s + a, y*s + b) = ((x+y) % 3)*s + xor(a, b), so the
+    # 81x81 table costs a few ms of import time instead of one digit loop per entry
+    size, table = 1, [0]
+    for _ in range(CHUNK_TRITS):
+        table = [((x + y) % 3) * size + table[a * size + b]
+                 for x in range(3) for a in range(size) for y in range(3) for b in range(size)]
+        size *= 3
+    return table
+
+_CHUNK_XOR = _build_chunk_xor()
+_CHUNK_DOUBLE = [_chunk_value([(2 * x) % 3 for x in digits]) for digits in _CHUNK_DIGITS]
+_CHUNK_STR = [''.join(str(digit) for digit in reversed(digits)) for digits in _CHUNK_DIGITS]
+
+# Chunk <-> its two bit-planes (bit i set when digit i equals 1 / 2), for TritWord.from_int/to_int.
+_CHUNK_MASK = (1 << CHUNK_TRITS) - 1
+_CHUNK_ONES = [sum(1 << i for i, digit in enumerate(digits) if digit == 1) for digits in _CHUNK_DIGITS]
+_CHUNK_TWOS = [sum(1 << i for i, digit in enumerate(digits) if digit == 2) for digits in _CHUNK_DIGITS]
+_PLANES_CHUNK = [0] * (1 << 2 * CHUNK_TRITS)
+for _value in range(CHUNK_SIZE):
+    _PLANES_CHUNK[_CHUNK_ONES[_value] << CHUNK_TRITS | _CHUNK_TWOS[_value]] = _value
+del _value
+
+#=-=-=-=-=-=-=- Integer Ternary Core: Conversion =-=-=-=-=-=-=-
+def int_to_ternary(value, width):
+    """
+    Convert a non-negative integer to a ternary string of exactly `width` digits.
+
+    Parameters:
+        value (int): Integer whose base-3 digits are wanted (value < 3**width).
+        width (int): Number of digits of the result.
+
+    Returns:
+        str: Zero-padded ternary string.
+
+    Example:
+        >>> int_to_ternary(11, 4)
+        '0102'
+    """
+
+    if width <= 0:
+        return ''
+    chunks = []
+    while value:
+        value, chunk = divmod(value, CHUNK_SIZE)
+        chunks.append(_CHUNK_STR[chunk])
+    text = ''.join(reversed(chunks))
+    return text[-width:] if len(text) >= width else text.zfill(width)
+
+def ternary_digits(value, width):
+    """
+    Split an integer into a fixed-width vector of ternary digits.
+
+    Parameters:
+        value (int): Integer whose base-3 digits are wanted (value < 3**width).
+        width (int): Number of digits of the result.
+
+    Returns:
+        tuple of int: Digits, most significant first (same order as the string form).
+
+    Example:
+        >>> ternary_digits(11, 4)
+        (0, 1, 0, 2)
+    """
+
+    digits = [0] * width
+    for i in range(width - 1, -1, -1):
+        value, digits[i] = divmod(value, 3)
+    return tuple(digits)
+
+def digits_to_int(digits):
+    """
+    Combine a vector of ternary digits (most significant first) into an integer.
+
+    Example:
+        >>> digits_to_int((0, 1, 0, 2))
+        11
+    """
+
+    value = 0
+    for digit in digits:
+        value = value * 3 + digit
+    return value
+
+#=-=-=-=-=-=-=- Integer Ternary Core: Xor, Multiply, Xor Sum =-=-=-=-=-=-=-
+def int_ternary_xor(a, b):
+    """
+    Digit-wise (a_i + b_i) mod 3 of two indices given as integers.
+
+    Parameters:
+        a (int): First index, as the integer value of its ternary digits.
+        b (int): Second index, as the integer value of its ternary digits.
+
+    Returns:
+        int: Integer value of the digit-wise sum.
+
+    Example:
+        >>> int_ternary_xor(11, 25)   # '102' xor '221'
+        6                             # '020'
+    """
+
+    result = 0
+    place = 1
+    while a or b:
+        a, chunk_a = divmod(a, CHUNK_SIZE)
+        b, chunk_b = divmod(b, CHUNK_SIZE)
+        result += _CHUNK_XOR[chunk_a * CHUNK_SIZE + chunk_b] * place
+        place *= CHUNK_SIZE
+    return result
+
+def int_xor_multiply(coefficient, index):
+    """
+    Multiply an index given as integer by a scalar coefficient (0, 1 or 2), digit-wise mod 3.
+
+    Parameters:
+        coefficient (int): The scalar multiplier (allowed values: 0, 1, or 2).
+        index (int): Integer value of the ternary index.
+
+    Returns:
+        int: Integer value of the product.
+
+    Raises:
+        ValueError: If coefficient is not 0, 1 or 2.
+
+    Example:
+        >>> int_xor_multiply(2, 11)   # 2 * '102'
+        19                            # '201'
+    """
+
+    if coefficient == 0:
+        return 0
+    if coefficient == 1:
+        return index
+    if coefficient != 2:
+        raise ValueError(f"coefficient should be 0, 1 or 2, got {coefficient!r}")
+
+    result = 0
+    place = 1
+    while index:
+        index, chunk = divmod(index, CHUNK_SIZE)
+        result += _CHUNK_DOUBLE[chunk] * place
+        place *= CHUNK_SIZE
+    return result
+
+def int_ternary_xor_sum(index_value_pairs):
+    """
+    Compute the ternary XOR sum (P_all) of (index, coefficient) pairs given as integers.
+
+    Indices with coefficient 1 and 2 are summed separately, so the sum costs one table
+    xor per nonzero trit and a single doubling at the end.
+
+    Parameters:
+        index_value_pairs (iterable of (int, int)): Index integer and its coefficient (0, 1 or 2).
+
+    Returns:
+        int: Integer value of the XOR sum.
+
+    Example:
+        >>> int_ternary_xor_sum([(11, 1), (21, 2)])   # {'102': 1, '210': 2}
+        26                                            # '222'
+    """
+
+    sums = [0, 0, 0]
+    for index, value in index_value_pairs:
+        if value:
+            sums[value] = int_ternary_xor(sums[value], index)
+    return int_ternary_xor(sums[1], int_xor_multiply(2, sums[2]))
+
+#=-=-=-=-=-=-=- Bit-Sliced Trit Word (Two Bit-Planes) =-=-=-=-=-=-=-
+_ONES_PLANE = str.maketrans('012', '010')
+_TWOS_PLANE = str.maketrans('012', '001')
+
+class TritWord:
+    """
+    A ternary index packed into two bit-planes: bit i of `ones` (`twos`) is set when digit i,
+    counted from the right, equals 1 (2).
+
+    Digit-wise addition mod 3 is six bitwise operations over all digits at once, and
+    doubling (= negation in GF(3)) only swaps the two planes.
+
+    Attributes:
+        ones (int): Bit-plane of the digits equal to 1.
+        twos (int): Bit-plane of the digits equal to 2.
+        width (int): Number of digits, used when converting back to a string.
+
+    Example:
+        >>> (TritWord.from_ternary('102') + TritWord.from_ternary('221')).to_ternary()
+        '020'
+        >>> TritWord.from_ternary('102').double().to_ternary()
+        '201'
+    """
+
+    __slots__ = ("ones", "twos", "width")
+
+    def __init__(self, ones=0, twos=0, width=0):
+        self.ones = ones
+        self.twos = twos
+        self.width = width
+
+    @classmethod
+    def from_ternary(cls, text):
+        """Pack a ternary string (digits '0', '1', '2')."""
+        if not text:
+            return cls()
+        return cls(int(text.translate(_ONES_PLANE), 2), int(text.translate(_TWOS_PLANE), 2), len(text))
+
+    @classmethod
+    def from_int(cls, value, width):
+        """Pack the integer value of a `width`-digit ternary index, one table lookup per chunk."""
+        ones = twos = shift = 0
+        while value:
+            value, chunk = divmod(value, CHUNK_SIZE)
+            ones |= _CHUNK_ONES[chunk] << shift
+            twos |= _CHUNK_TWOS[chunk] << shift
+            shift += CHUNK_TRITS
+        return cls(ones, twos, width)
+
+    def to_ternary(self, width=None):
+        """Unpack to a zero-padded ternary string of `width` digits (default: self.width)."""
+        width = self.width if width is None else width
+        # Planes never share a bit, so reading them as decimal digits adds without carry.
+        text = str(int(format(self.ones, 'b')) + 2 * int(format(self.twos, 'b')))
+        return text.zfill(width) if (self.ones or self.twos) else '0' * width
+
+    def to_int(self):
+        """Integer value of the ternary digits, one table lookup per chunk of both planes."""
+        ones, twos = self.ones, self.twos
+        value = 0
+        place = 1
+        while ones or twos:
+            value += _PLANES_CHUNK[(ones & _CHUNK_MASK) << CHUNK_TRITS | (twos & _CHUNK_MASK)] * place
+            ones >>= CHUNK_TRITS
+            twos >>= CHUNK_TRITS
+            place *= CHUNK_SIZE
+        return value
+
+    def __add__(self, other):
+        t = (self.ones | other.twos) ^ (self.twos | other.ones)
+        return TritWord((self.twos | other.twos) ^ t, (self.ones | other.ones) ^ t, max(self.width, other.width))
+
+    def __sub__(self, other):
+        return self + other.double()
+
+    def double(self):
+        """Digit-wise 2*a mod 3, which is also -a."""
+        return TritWord(self.twos, self.ones, self.width)
+
+    __neg__ = double
+
+    def scale(self, coefficient):
+        """Digit-wise coefficient*a mod 3 for coefficient 0, 1 or 2."""
+        if coefficient == 0:
+            return TritWord(0, 0, self.width)
+        if coefficient == 1:
+            return self
+        if coefficient == 2:
+            return self.double()
+        raise ValueError(f"coefficient should be 0, 1 or 2, got {coefficient!r}")
+
+    def __bool__(self):
+        return bool(self.ones or self.twos)
+
+    def __eq__(self, other):
+        if not isinstance(other, TritWord):
+            return NotImplemented
+        return self.ones == other.ones and self.twos == other.twos
+
+    def __hash__(self):
+        return hash((self.ones, self.twos))
+
+    def __repr__(self):
+        return f"TritWord({self.to_ternary()!r})"
+
+def packed_ternary_xor_sum(index_value_pairs, width=0):
+    """
+    Compute the ternary XOR sum (P_all) of (TritWord, coefficient) pairs on the bit-planes.
+
+    Parameters:
+        index_value_pairs (iterable of (TritWord, int)): Packed index and its coefficient (0, 1 or 2).
+        width (int): Width given to the result (default: widest index seen).
+
+    Returns:
+        TritWord: The packed XOR sum.
+
+    Example:
+        >>> packed_ternary_xor_sum([(TritWord.from_ternary('102'), 1), (TritWord.from_ternary('210'), 2)]).to_ternary()
+        '222'
+    """
+
+    ones = [0, 0, 0]
+    twos = [0, 0, 0]
+    for index, value in index_value_pairs:
+        if value:
+            a1, a2 = ones[value], twos[value]
+            t = (a1 | index.twos) ^ (a2 | index.ones)
+            ones[value] = (a2 | index.twos) ^ t
+            twos[value] = (a1 | index.ones) ^ t
+        if index.width > width:
+            width = index.width
+    # sum_1 + 2*sum_2, where doubling swaps the planes of sum_2
+    return TritWord(ones[1], twos[1], width) + TritWord(twos[2], ones[2], width)
+
+def ternary_is_zero(index):
+    """
+    Check whether an index (ternary string or TritWord) is all zeros.
+
+    Example:
+        >>> ternary_is_zero('000'), ternary_is_zero(TritWord.from_ternary('010'))
+        (True, False)
+    """
+
+    if isinstance(index, TritWord):
+        return not index
+    return index == "0" * len(index)
+
 #=-=-=-=-=-=-=- Calculating Xor Sum(P_all) =-=-=-=-=-=-=- 
 def ternary_xor_sum(index_value_mapping):
     """
@@ -217,17 +767,21 @@ def ternary_xor_sum(index_value_mapping):
 
     Example:
         >>> ternary_xor_sum({'102': 1, '210': 2})
-        '021'
+        '222'
+
+    Note:
+        - String wrapper over int_ternary_xor_sum().
+        - With TritWord keys the sum runs on bit-planes and a TritWord is returned.
     """
 
     first_index = next(iter(index_value_mapping))
-    current_xor_sum = '0' * len(first_index)
-
-    for index, value in index_value_mapping.items():
-        current_product = xor_multiply(value,index)
-        current_xor_sum = ternary_xor(current_xor_sum,current_product)
+    if isinstance(first_index, TritWord):
+        return packed_ternary_xor_sum(index_value_mapping.items())
 
-    return current_xor_sum
+    width = len(first_index)
+    width = max(width, max(map(len, index_value_mapping)))
+    xor_sum = int_ternary_xor_sum((int(index, 3), value) for index, value in index_value_mapping.items())
+    return int_to_ternary(xor_sum, width)
 
 #=-=-=-=-=-=-=- Operation: Multiply(Basic on Xor) =-=-=-=-=-=-=-
 def xor_multiply(coefficient, index):
@@ -244,6 +798,9 @@ def xor_multiply(coefficient, index):
     Returns:
         str: The resulting ternary number after multiplication.
 
+    Raises:
+        ValueError: If coefficient is not 0, 1 or 2.
+
     Example:
         >>> xor_multiply(0, '102')
         '000'
@@ -253,20 +810,15 @@ def xor_multiply(coefficient, index):
 
         >>> xor_multiply(2, '102')
         '201'
-    """
 
-    mult_result = '0' * len(index)  # Default result as zero string of same length as index
+    Note:
+        - String wrapper over int_xor_multiply().
+        - A TritWord index is scaled on its bit-planes.
+    """
 
-    if coefficient == 0:
-        return mult_result  # If coefficient is 0, result is all zeros
-    if coefficient == 1:
-        return index  # If coefficient is 1, return the index itself
-    if coefficient == 2:
-        return ternary_xor(index, index)  # If coefficient is 2, perform ternary XOR of index with itself
-    
-    print("Coefficient:"+ coefficient+" Type:"+ type(coefficient))
-    print("Value of coefficient is illegal")
-    return mult_result
+    if isinstance(index, TritWord):
+        return index.scale(coefficient)
+    return int_to_ternary(int_xor_multiply(coefficient, int(index or '0', 3)), len(index))
 
 #=-=-=-=-=-=-=- Operation: Xor(for Ternary) =-=-=-=-=-=-=-
 def ternary_xor(a, b):
@@ -288,19 +840,18 @@ def ternary_xor(a, b):
         '020'
         
         >>> ternary_xor('12', '1020')
-        '1102'
+        '1002'
+
+    Note:
+        - String wrapper over int_ternary_xor().
+        - Two TritWords are added on their bit-planes.
     """
 
+    if isinstance(a, TritWord):
+        return a + b
+
     max_length = max(len(a), len(b))
-    a = a.zfill(max_length)
-    b = b.zfill(max_length)
-    
-    result = []
-    for i in range(max_length):
-        xor_value = (int(a[i]) + int(b[i])) % 3
-        result.append(str(xor_value))
-    
-    return ''.join(result)
+    return int_to_ternary(int_ternary_xor(int(a or '0', 3), int(b or '0', 3)), max_length)
 
 #=-=-=-=-=-=-=- All Ternary Number with in Such Length =-=-=-=-=-=-=-
 def generate_ternary_set(length):
@@ -325,3 +876,963 @@ def generate_ternary_set(length):
     ternary_set = {''.join(map(str, digits)) for digits in product(range(length), repeat=length)}
     return sorted(ternary_set)
 
+#=-=-=-=-=-=-=- Inverse Matrix over GF(3) =-=-=-=-=-=-=-
+def gf3_inverse(matrix):
+    """
+    Invert a square matrix over GF(3) by Gauss-Jordan elimination (pure Python).
+
+    Parameters:
+        matrix (list of list of int): Square matrix with entries 0, 1, 2.
+
+    Returns:
+        list of list of int: The inverse, entries reduced mod 3.
+
+    Raises:
+        ValueError: If the matrix is not square or is singular mod 3.
+
+    Example:
+        >>> gf3_inverse([[1, 1], [0, 1]])
+        [[1, 2], [0, 1]]
+    """
+
+    size = len(matrix)
+    if any(len(row) != size for row in matrix):
+        raise ValueError("matrix should be square")
+    rows = [[value % 3 for value in row] + [int(i == j) for j in range(size)] for i, row in enumerate(matrix)]
+
+    for column in range(size):
+        pivot = next((r for r in range(column, size) if rows[r][column]), None)
+        if pivot is None:
+            raise ValueError("matrix is singular over GF(3)")
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        if rows[column][column] == 2:   # 2 is its own inverse mod 3
+            rows[column] = [(2 * value) % 3 for value in rows[column]]
+        for r in range(size):
+            factor = rows[r][column]
+            if r != column and factor:
+                rows[r] = [(value - factor * pivot_value) % 3 for value, pivot_value in zip(rows[r], rows[column])]
+
+    return [row[size:] for row in rows]
+
+#=-=-=-=-=-=-=- Decoder Status Codes =-=-=-=-=-=-=-
+STATUS_CLEAN = 0          # Perfect code, nothing changed
+STATUS_CORRECTED = 1      # Exactly one trit (or O/E) was corrected
+STATUS_UNCORRECTABLE = 2  # Two or more mistakes detected
+
+#=-=-=-=-=-=-=- Tracing: Stage Timing Spans and Events =-=-=-=-=-=-=-
+# The codec entry points report their stages ("dimension", "index", "syndrome", "correction",
+# "message", ...) as records to the subscribers of TRACE_SUBSCRIBERS:
+#     {"scope": "D4_EC", "stage": "syndrome", "seconds": 1.2e-05, "fields": {"P_all": "200", ...}}
+# "seconds" is None for a point event. With no subscriber, stage_timer() hands out a shared no-op
+# timer and call sites guard the building of event fields with `if Module.TRACE_SUBSCRIBERS:`.
+TRACE_SUBSCRIBERS = []
+
+def add_trace_subscriber(subscriber):
+    """
+    Attach a callable that receives every trace record (a dict, see above). Returns the subscriber.
+    """
+
+    TRACE_SUBSCRIBERS.append(subscriber)
+    return subscriber
+
+def remove_trace_subscriber(subscriber):
+    """
+    Detach a subscriber added by add_trace_subscriber(); unknown subscribers are ignored.
+    """
+
+    if subscriber in TRACE_SUBSCRIBERS:
+        TRACE_SUBSCRIBERS.remove(subscriber)
+
+def _emit_trace(scope, stage, seconds, fields):
+    record = {"scope": scope, "stage": stage, "seconds": seconds, "fields": fields}
+    for subscriber in tuple(TRACE_SUBSCRIBERS):
+        subscriber(record)
+
+def trace_event(scope, stage, **fields):
+    """
+    Send a point event (no duration) to the subscribers.
+
+    Example:
+        >>> if Module.TRACE_SUBSCRIBERS:
+        ...     Module.trace_event("D4_EC", "correction", outcome="Error on O")
+    """
+
+    if TRACE_SUBSCRIBERS:
+        _emit_trace(scope, stage, None, fields)
+
+class StageTimer:
+    """
+    Times consecutive stages of one call: stage() closes the running stage and opens the next,
+    done() closes the last one. Each closed stage is sent to the subscribers with its fields.
+
+    Example:
+        >>> trace = Module.stage_timer("D3")
+        >>> trace.stage("dimension")
+        >>> ...
+        >>> trace.stage("index")
+        >>> ...
+        >>> trace.done()
+    """
+
+    __slots__ = ("scope", "current", "fields", "started")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.current = None
+        self.fields = {}
+        self.started = 0.0
+
+    def stage(self, name, **fields):
+        now = time.perf_counter()
+        if self.current is not None:
+            _emit_trace(self.scope, self.current, now - self.started, self.fields)
+        self.current, self.fields, self.started = name, fields, now
+
+    def note(self, **fields):
+        # Add fields to the running stage
+        self.fields.update(fields)
+
+    def done(self):
+        if self.current is not None:
+            _emit_trace(self.scope, self.current, time.perf_counter() - self.started, self.fields)
+            self.current = None
+
+class _NullStageTimer:
+    __slots__ = ()
+
+    def stage(self, name, **fields):
+        pass
+
+    def note(self, **fields):
+        pass
+
+    def done(self):
+        pass
+
+_NULL_STAGE_TIMER = _NullStageTimer()
+
+def stage_timer(scope):
+    """
+    StageTimer for one call of `scope`, or a shared no-op timer when no subscriber is attached.
+    """
+
+    return StageTimer(scope) if TRACE_SUBSCRIBERS else _NULL_STAGE_TIMER
+
+class TraceRecorder:
+    """
+    Subscriber that keeps the records and sums the time spent per (scope, stage).
+
+    Example:
+        >>> with Module.TraceRecorder() as recorder:
+        ...     Web_Final_D3_EC.main_function("120102")
+        >>> recorder.totals()[("D3_EC", "syndrome")]
+        {'count': 1, 'seconds': 1.1e-05}
+
+    Note:
+        - keep=False only sums, for long runs.
+    """
+
+    def __init__(self, keep=True):
+        self.keep = keep
+        self.records = []
+        self._totals = {}
+
+    def __call__(self, record):
+        if self.keep:
+            self.records.append(record)
+        if record["seconds"] is not None:
+            total = self._totals.setdefault((record["scope"], record["stage"]), {"count": 0, "seconds": 0.0})
+            total["count"] += 1
+            total["seconds"] += record["seconds"]
+
+    def __enter__(self):
+        return add_trace_subscriber(self)
+
+    def __exit__(self, *exc_info):
+        remove_trace_subscriber(self)
+
+    def totals(self):
+        return {key: dict(total) for key, total in self._totals.items()}
+
+    def clear(self):
+        self.records.clear()
+        self._totals.clear()
+
+def print_trace(record, file=None):
+    """
+    Subscriber printing one line per record, e.g. add_trace_subscriber(print_trace) to bring back
+    the old debugging output:
+        D4_EC  syndrome       0.015 ms  P_all=200 P_2=0 P_1=0
+    """
+
+    timing = f"{record['seconds'] * 1e3:9.3f} ms" if record["seconds"] is not None else f"{'event':>12}"
+    fields = " ".join(f"{key}={value}" for key, value in record["fields"].items())
+    print(f"{record['scope']:<6} {record['stage']:<10} {timing}  {fields}".rstrip(), file=file)
+
+#=-=-=-=-=-=-=- Layout of Indices for One Codeword Length =-=-=-=-=-=-=-
+class CodeLayout:
+    """
+    Index tables shared by the encoder and decoder of one (scheme, dimension, length).
+
+    Attributes:
+        scheme (str): "D3" or "D4".
+        dimension (int): Length of every index.
+        length (int): Codeword length (for D4 it counts the O and E trits).
+        indices (tuple of str): Index of each regular position, in codeword order.
+        position (dict): Index -> 0-based position in the codeword.
+        redundant (tuple of str): Redundant indices, in the order the encoder fills them.
+        redundant_positions (tuple of int): Codeword position of each redundant index.
+        message_indices (tuple of str): Indices carrying message trits, in codeword order.
+        message_positions (tuple of int): Codeword position of each message trit.
+        I_1 (tuple of str): D4 only, picked indices made of 0/1 (empty for D3).
+        I_2 (tuple of str): D4 only, picked indices made of 0/2 (empty for D3).
+        I_1_positions, I_2_positions (tuple of int): D4 only, codeword positions of `I_1` and `I_2`, ascending.
+        packed_indices (tuple of TritWord): `indices` as bit-sliced words.
+        packed_position (dict): TritWord -> 0-based position in the codeword.
+        packed_I_1, packed_I_2 (frozenset of TritWord): D4 only, `I_1` and `I_2` as bit-sliced words.
+        complete (bool): False when some redundant index falls outside this length (not a valid codeword length).
+
+    Note:
+        - Instances are shared through get_code_layout(), treat them as read-only.
+    """
+
+    def __init__(self, scheme, dimension, length, indices, redundant, I_1=(), I_2=()):
+        self.scheme = scheme
+        self.dimension = dimension
+        self.length = length
+        self.indices = tuple(indices)
+        self.position = {index: pos for pos, index in enumerate(self.indices)}
+        self.redundant = tuple(redundant)
+
+        self.redundant_positions = tuple(self.position[index] for index in self.redundant if index in self.position)
+        self.complete = len(self.redundant_positions) == len(self.redundant)
+
+        redundant_positions = set(self.redundant_positions)
+        self.message_positions = tuple(pos for pos in range(len(self.indices)) if pos not in redundant_positions)
+        self.message_indices = tuple(self.indices[pos] for pos in self.message_positions)
+        self.I_1 = tuple(I_1)
+        self.I_2 = tuple(I_2)
+        self.I_1_positions = tuple(self.position[index] for index in self.I_1 if index in self.position)
+        self.I_2_positions = tuple(self.position[index] for index in self.I_2 if index in self.position)
+
+        self.packed_indices = tuple(TritWord.from_ternary(index) for index in self.indices)
+        self.packed_position = {index: pos for pos, index in enumerate(self.packed_indices)}
+        self.packed_I_1 = frozenset(TritWord.from_ternary(index) for index in self.I_1)
+        self.packed_I_2 = frozenset(TritWord.from_ternary(index) for index in self.I_2)
+
+    def pick_message(self, code):
+        """
+        Extract the message trits of a codeword by skipping its redundant trits.
+
+        Parameters:
+            code (str): Codeword of this layout (O and E, if any, are ignored).
+
+        Returns:
+            str: The message trits.
+
+        Raises:
+            ValueError: If the layout is not complete.
+        """
+
+        if not self.complete:
+            raise ValueError(f"{self.scheme} codeword length {self.length} does not hold all redundant indices")
+        return ''.join(code[pos] for pos in self.message_positions)
+
+    def parity_group(self, position):
+        """
+        D4 only: 1 if the trit at `position` counts in P_1 (its index is in I_1), 2 if it counts
+        in P_2 (I_2), 0 otherwise (D3, O, E). Binary search over I_1_positions / I_2_positions.
+
+        Example:
+            >>> build_d4_layout(3, 8).parity_group(1)     # '022'
+            2
+        """
+
+        for group, positions in ((1, self.I_1_positions), (2, self.I_2_positions)):
+            i = bisect.bisect_left(positions, position)
+            if i < len(positions) and positions[i] == position:
+                return group
+        return 0
+
+    def __repr__(self):
+        return f"CodeLayout({self.scheme!r}, dimension={self.dimension}, length={self.length})"
+
+def build_d3_layout(dimension, length):
+    """
+    Build the D3 layout: the first `length` indices of generate_ternary_set_half(dimension),
+    unranked one by one so the cost follows `length` rather than 3^dimension.
+
+    Parameters:
+        dimension (int): Length of every index.
+        length (int): Codeword length.
+
+    Returns:
+        CodeLayout: Layout with the standard basis vectors as redundant indices.
+
+    Example:
+        >>> build_d3_layout(3, 7).message_indices
+        ('011', '012', '101', '102')
+    """
+
+    indices = [ternary_half_unrank(rank, dimension) for rank in range(min(length, ternary_half_size(dimension)))]
+    return CodeLayout("D3", dimension, length, indices, d3_build_redundant_list(dimension))
+
+def build_d4_layout(dimension, length):
+    """
+    Build the D4 layout: I_1 first, then I_2 fill the length-2 regular positions, sorted ascending.
+    Both sets are read lazily in order and merged, so setup is O(length * dimension).
+
+    Parameters:
+        dimension (int): Length of every index.
+        length (int): Codeword length, including the O and E trits.
+
+    Returns:
+        CodeLayout: Layout with d4_build_redundant_list(dimension) as redundant indices.
+
+    Example:
+        >>> build_d4_layout(3, 8).indices
+        ('011', '022', '101', '110', '111', '202')
+    """
+
+    regular_length = length - 2
+    I_1 = list(islice(d4_iter_I(dimension, 1), max(regular_length, 0)))
+    I_2 = list(islice(d4_iter_I(dimension, 2), max(regular_length - len(I_1), 0)))
+    indices = list(heapq.merge(I_1, I_2))   # same width, so string order is numeric order
+    return CodeLayout("D4", dimension, length, indices, d4_build_redundant_list(dimension), I_1, I_2)
+
+LAYOUT_CACHE_SIZE = 256
+_LAYOUT_BUILDERS = {"D3": build_d3_layout, "D4": build_d4_layout}
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def get_code_layout(scheme, dimension, length):
+    """
+    Return the shared CodeLayout of (scheme, dimension, length), building it on the first request.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        dimension (int): Length of every index.
+        length (int): Codeword length.
+
+    Returns:
+        CodeLayout: Cached layout, the same object for repeated calls.
+
+    Raises:
+        ValueError: If the scheme is unknown.
+
+    Note:
+        - Bounded LRU cache of LAYOUT_CACHE_SIZE layouts.
+        - Hit/miss stats: get_code_layout.cache_info(), reset with get_code_layout.cache_clear().
+    """
+
+    if scheme not in _LAYOUT_BUILDERS:
+        raise ValueError(f"Unknown scheme {scheme!r}, should be one of {sorted(_LAYOUT_BUILDERS)}")
+    return _LAYOUT_BUILDERS[scheme](dimension, length)
+
+#=-=-=-=-=-=-=- Incremental Update: Patch a Codeword along a Generator Row =-=-=-=-=-=-=-
+def patch_trits(codeword, row, delta):
+    """
+    Add delta * coefficient (mod 3) to the codeword trit at each (position, coefficient) of `row`.
+
+    Parameters:
+        codeword: str of '0'/'1'/'2' (a patched copy is returned), or a mutable sequence of trit
+            values 0/1/2 such as a bytearray, list or numpy array (patched in place and returned).
+        row (iterable of tuple): (position, coefficient) pairs, a sparse generator matrix row.
+        delta (int): Change of the message trit, 0/1/2.
+
+    Returns:
+        The patched codeword.
+
+    Example:
+        >>> patch_trits("1210021", ((0, 1), (4, 2)), 1), list(patch_trits(bytearray([1, 2, 1]), ((1, 1),), 2))
+        ('2210221', [1, 1, 1])
+    """
+
+    if not delta:
+        return codeword
+    if isinstance(codeword, str):
+        trits = list(codeword)
+        for position, coefficient in row:
+            trits[position] = str((int(trits[position]) + delta * coefficient) % 3)
+        return ''.join(trits)
+    for position, coefficient in row:
+        codeword[position] = (int(codeword[position]) + delta * coefficient) % 3
+    return codeword
+
+def message_trit_position(scheme, dimension, length, message_pos):
+    """
+    Layout of a complete codeword of `length` trits and the codeword position of message trit `message_pos`.
+
+    Returns:
+        tuple: (CodeLayout, position)
+
+    Raises:
+        ValueError: If the dimension is not the one of `length`, the length is not a valid codeword
+            length, or message_pos is out of range.
+    """
+
+    if dimension != dimension_for_codeword(scheme, length):
+        raise ValueError(f"a {scheme} codeword of {length} trits has dimension "
+                         f"{dimension_for_codeword(scheme, length)}, not {dimension}")
+    layout = get_code_layout(scheme, dimension, length)
+    if not layout.complete:
+        raise ValueError(f"{scheme} codeword length {length} does not hold all redundant indices")
+    if not 0 <= message_pos < len(layout.message_positions):
+        raise ValueError(f"message_pos {message_pos} out of range for {len(layout.message_positions)} message trits")
+    return layout, layout.message_positions[message_pos]
+
+#=-=-=-=-=-=-=- Online Syndrome: P_all, P_1, P_2 Kept Current per Trit =-=-=-=-=-=-=-
+class _SyndromeAccumulator:
+    """
+    P_all (and P_1, P_2 for D4) of a codeword whose trits arrive one by one or get edited,
+    kept current in O(d) per trit. Shared state of Web_Final_D3_EC.SyndromeAccumulator and
+    Web_Final_D4_EC.SyndromeAccumulator, which add decision() (used by result()).
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        length (int): Codeword length (O and E included for D4); trits not received yet count as 0.
+
+    Note:
+        - O and E are the last two positions of a D4 codeword.
+    """
+
+    __slots__ = ("scheme", "length", "dimension", "layout", "trits", "received", "syndrome", "P_1", "P_2")
+
+    def __init__(self, scheme, length):
+        if scheme not in _MIN_DIMENSION:
+            raise ValueError(f"Unknown scheme {scheme!r}, should be D3 or D4")
+        self.scheme = scheme
+        self.length = length
+        self.dimension = dimension_for_codeword(scheme, length)
+        self.layout = get_code_layout(scheme, self.dimension, length)
+        self.trits = bytearray(length)
+        self.received = 0
+        self.syndrome = TritWord(0, 0, self.dimension)
+        self.P_1 = 0
+        self.P_2 = 0
+
+    @property
+    def P_all(self):
+        return self.syndrome.to_ternary()
+
+    def set(self, position, value):
+        """
+        Set (or correct) the trit at `position` and update the syndrome by the change.
+
+        Raises:
+            ValueError: If position is outside the codeword or value is not a trit.
+        """
+
+        if not 0 <= position < self.length:
+            raise ValueError(f"position {position} outside a codeword of {self.length} trits")
+        value = int(value)
+        if value not in (0, 1, 2):
+            raise ValueError(f"a trit should be 0, 1 or 2, got {value!r}")
+        delta = (value - self.trits[position]) % 3
+        if not delta:
+            return
+        self.trits[position] = value
+
+        if self.scheme == "D4" and position >= self.length - 2:
+            if position == self.length - 2:
+                self.P_1 = (self.P_1 + delta) % 3
+            else:
+                self.P_2 = (self.P_2 + delta) % 3
+            return
+        self.syndrome = self.syndrome + self.layout.packed_indices[position].scale(delta)
+        group = self.layout.parity_group(position)
+        if group == 1:
+            self.P_1 = (self.P_1 + delta) % 3
+        elif group == 2:
+            self.P_2 = (self.P_2 + delta) % 3
+
+    def append(self, value):
+        """
+        Receive the next trit.
+
+        Raises:
+            ValueError: If the codeword is already full.
+        """
+
+        if self.received >= self.length:
+            raise ValueError(f"all {self.length} trits were already received")
+        self.set(self.received, value)
+        self.received += 1
+
+    def extend(self, trits):
+        """Receive the next trits (str of '0'/'1'/'2' or iterable of 0/1/2)."""
+        for trit in trits:
+            self.append(trit)
+
+    def result(self):
+        """
+        Corrected codeword and message of the trits so far, from the subclass's decision().
+
+        Returns:
+            tuple: (corrected codeword str, message str or None when uncorrectable, status, position)
+        """
+
+        status, position, change = self.decision()
+        trits = bytearray(self.trits)
+        if position >= 0:
+            trits[position] = (trits[position] - change) % 3
+        codeword = ''.join(map(str, trits))
+        message = None if status == STATUS_UNCORRECTABLE else self.layout.pick_message(codeword)
+        return codeword, message, status, position
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({self.scheme!r}, length={self.length}, received={self.received}, "
+                f"P_all={self.P_all!r}, P_1={self.P_1}, P_2={self.P_2})")
+
+#=-=-=-=-=-=-=- Result Objects: Encode and Decode =-=-=-=-=-=-=-
+class EncodeResult:
+    """
+    Result of encode() in Web_Final_D3 / Web_Final_D4.
+
+    Attributes:
+        codeword (str): The codeword.
+        message_length (int): Number of message trits.
+        length (int): Codeword length (property).
+        rate (float): message_length / length (property).
+    """
+
+    __slots__ = ("codeword", "message_length")
+
+    def __init__(self, codeword, message_length):
+        self.codeword = codeword
+        self.message_length = message_length
+
+    @property
+    def length(self):
+        return len(self.codeword)
+
+    @property
+    def rate(self):
+        return self.message_length / len(self.codeword)
+
+    def as_tuple(self):
+        """(codeword, length, rate), the tuple main_function() returns."""
+        return self.codeword, self.length, self.rate
+
+    def __repr__(self):
+        return f"EncodeResult({self.codeword!r})"
+
+class DecodeResult:
+    """
+    Result of decode() in Web_Final_D3_EC / Web_Final_D4_EC: the decision as plain values, and
+    everything meant for people (message, location, announcement, ...) as properties computed
+    on access only. The schemes subclass it with their own reporting.
+
+    Attributes:
+        layout (CodeLayout): Layout of the codeword.
+        received (str): The codeword as given.
+        corrected (str): The codeword after correction (as given unless status is STATUS_CORRECTED).
+        status (int): STATUS_CLEAN / STATUS_CORRECTED / STATUS_UNCORRECTABLE.
+        position (int): 0-based corrected position (length-2 for O, length-1 for E), -1 if none.
+        change (int): Value subtracted (mod 3) at that position, 0 if none.
+        syndrome (TritWord): P_all.
+        P_1, P_2 (int): D4 parity checks, 0 for D3.
+    """
+
+    __slots__ = ("layout", "received", "corrected", "status", "position", "change", "syndrome", "P_1", "P_2")
+
+    def __init__(self, layout, received, corrected, status, position, change, syndrome, P_1=0, P_2=0):
+        self.layout = layout
+        self.received = received
+        self.corrected = corrected
+        self.status = status
+        self.position = position
+        self.change = change
+        self.syndrome = syndrome
+        self.P_1 = P_1
+        self.P_2 = P_2
+
+    @property
+    def message(self):
+        """Recovered message, None when uncorrectable."""
+        if self.status == STATUS_UNCORRECTABLE:
+            return None
+        return self.layout.pick_message(self.corrected)
+
+    @property
+    def P_all(self):
+        """P_all as a ternary string."""
+        return self.syndrome.to_ternary()
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(status={self.status}, position={self.position}, "
+                f"corrected={self.corrected!r})")
+
+#=-=-=-=-=-=-=- Capacity Planner: Dimension, Length and Rate per Scheme =-=-=-=-=-=-=-
+CAPACITY_MAX_DIMENSION = 64
+_MIN_DIMENSION = {"D3": 0, "D4": 3}             # D4 starts at 3
+_EXTRA_POSITIONS = {"D3": 0, "D4": 2}           # O and E of D4, on top of the d redundant trits
+
+def _raw_capacity(scheme, dimension):
+    # Most message trits one dimension can carry: (3^d-1)/2 - d for D3, 2*fr(d) - d for D4
+    if scheme == "D3":
+        return (3 ** dimension - 1) // 2 - dimension
+    return 2 * fr(dimension) - dimension
+
+def _redundant_ranks(scheme, dimension):
+    # Rank of every redundant index in the list the layout fills first (the D3 half set, D4 I_1),
+    # None when one of them is not in it (no codeword of this dimension holds all of them)
+    if scheme == "D3":
+        return [ternary_half_rank(index) for index in d3_build_redundant_list(dimension)]
+    redundant = d4_build_redundant_list(dimension)
+    if not all(len(index) == dimension and d4_I_contains(index, 1) for index in redundant):
+        return None
+    return [d4_I_rank(index) for index in redundant]
+
+@lru_cache(maxsize=None)
+def message_range(scheme, dimension):
+    """
+    Shortest and longest message one dimension encodes with a complete layout.
+
+    A layout is complete once its regular indices reach the last redundant index, so the shortest
+    message follows from the largest redundant rank. Between the longest message of a dimension and
+    the shortest of the next there can be lengths no dimension encodes (D4 77 to 80).
+
+    Returns:
+        tuple: (shortest, longest), or None when no length of this dimension holds every redundant index.
+
+    Example:
+        >>> message_range("D3", 3), message_range("D4", 7)
+        ((2, 10), (81, 175))
+    """
+
+    ranks = _redundant_ranks(scheme, dimension)
+    if ranks is None:
+        return None
+    shortest = max(max(ranks, default=-1) + 1 - dimension, 0)
+    longest = _raw_capacity(scheme, dimension)
+    return (shortest, longest) if shortest <= longest else None
+
+@lru_cache(maxsize=None)
+def capacity_table(scheme):
+    """
+    Cumulative capacity table of a scheme, from its first dimension up to CAPACITY_MAX_DIMENSION.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+
+    Returns:
+        tuple: (dimensions, messages, codewords), where messages[i] / codewords[i] are the most
+               message / codeword trits handled by any dimension up to dimensions[i] (dimensions
+               without a message_range() add nothing). Both are non-decreasing, so a dimension is
+               found with one bisection.
+
+    Raises:
+        ValueError: If the scheme is unknown.
+
+    Example:
+        >>> [row[:4] for row in capacity_table("D3")]
+        [(0, 1, 2, 3), (0, 0, 2, 10), (0, 1, 4, 13)]
+    """
+
+    if scheme not in _MIN_DIMENSION:
+        raise ValueError(f"Unknown scheme {scheme!r}, should be one of {sorted(_MIN_DIMENSION)}")
+    dimensions = tuple(range(_MIN_DIMENSION[scheme], CAPACITY_MAX_DIMENSION + 1))
+    messages = []
+    codewords = []
+    best = -1
+    for dimension in dimensions:
+        supported = message_range(scheme, dimension)
+        if supported:
+            best = max(best, supported[1])
+        messages.append(best)
+        codewords.append(best + dimension + _EXTRA_POSITIONS[scheme])
+    return dimensions, tuple(messages), tuple(codewords)
+
+def _bisect_dimension(scheme, length, column):
+    dimensions, messages, codewords = capacity_table(scheme)
+    row = (messages, codewords)[column]
+    i = bisect.bisect_left(row, length)
+    if i == len(row):
+        raise ValueError(f"{scheme} length {length} needs a dimension above {CAPACITY_MAX_DIMENSION}")
+    return dimensions[i]
+
+def dimension_for_message(scheme, message_length):
+    """
+    Dimension the encoder uses: smallest d whose code carries `message_length` message trits.
+
+    Raises:
+        ValueError: If no dimension has a complete layout for this length (see message_range()).
+
+    Example:
+        >>> dimension_for_message("D3", 10), dimension_for_message("D4", 6)
+        (3, 4)
+    """
+
+    dimension = _bisect_dimension(scheme, message_length, 0)
+    supported = message_range(scheme, dimension)
+    if not supported or message_length < supported[0]:
+        raise ValueError(f"no {scheme} dimension encodes a message of {message_length} trits")
+    return dimension
+
+def dimension_for_codeword(scheme, codeword_length):
+    """
+    Dimension the decoder uses: smallest d whose codewords reach `codeword_length` trits.
+
+    Always the dimension the encoder picked for the message inside, since codeword length grows
+    with message length.
+
+    Example:
+        >>> dimension_for_codeword("D3", 13), dimension_for_codeword("D4", 12)
+        (3, 4)
+    """
+
+    return _bisect_dimension(scheme, codeword_length, 1)
+
+def plan_code(scheme, message_length):
+    """
+    Plan the code for a message.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        message_length (int): Number of message trits.
+
+    Returns:
+        tuple: (dimension, codeword_length, rate), rate = message_length / codeword_length.
+
+    Raises:
+        ValueError: If no dimension encodes this message length.
+
+    Example:
+        >>> plan_code("D3", 10)
+        (3, 13, 0.7692307692307693)
+    """
+
+    dimension = dimension_for_message(scheme, message_length)
+    codeword_length = message_length + dimension + _EXTRA_POSITIONS[scheme]
+    return dimension, codeword_length, (message_length / codeword_length if codeword_length else 0.0)
+
+def max_message_length(scheme, codeword_length):
+    """
+    Longest message plan_code() accepts whose codeword fits in `codeword_length` trits.
+
+    Example:
+        >>> max_message_length("D3", 13), max_message_length("D3", 14), max_message_length("D4", 89)
+        (10, 10, 76)
+    """
+
+    dimensions, messages, codewords = capacity_table(scheme)
+    i = bisect.bisect_right(codewords, codeword_length)   # rows whose codewords all fit
+    best = messages[i - 1] if i else 0
+    for dimension in dimensions[i:]:
+        # Shorter messages of the next dimensions may still fit, from their shortest one on
+        supported = message_range(scheme, dimension)
+        room = codeword_length - dimension - _EXTRA_POSITIONS[scheme]
+        if supported and supported[0] > room:
+            break
+        if supported:
+            best = max(best, min(supported[1], room))
+    return max(best, 0)
+
+#=-=-=-=-=-=-=- Batch Helpers: Trit Matrices over GF(3) =-=-=-=-=-=-=-
+def as_trit_matrix(rows):
+    """
+    Return a batch of trit vectors as a 2-D uint8 array, one vector per row.
+
+    Parameters:
+        rows (array-like): 2-D array (or nested lists) of values 0, 1, 2.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (count, trits).
+
+    Raises:
+        ValueError: If the input is not 2-D or holds a value other than 0, 1, 2.
+    """
+
+    import numpy as np
+    matrix = np.asarray(rows)
+    if matrix.ndim != 2:
+        raise ValueError(f"expected a 2-D array of trits, got shape {matrix.shape}")
+    if matrix.size and (matrix.min() < 0 or matrix.max() > 2):
+        raise ValueError("trits should only be 0, 1 or 2")
+    return matrix.astype(np.uint8, copy=False)
+
+def index_digit_matrix(indices, dimension):
+    """
+    Stack the digits of ternary indices into a matrix, one index per row.
+
+    Parameters:
+        indices (sequence of str): Ternary indices of length `dimension`.
+        dimension (int): Number of digits of every index.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (len(indices), dimension), most significant digit first.
+
+    Example:
+        >>> index_digit_matrix(['012', '100'], 3)
+        array([[0, 1, 2],
+               [1, 0, 0]], dtype=uint8)
+    """
+
+    import numpy as np
+    text = ''.join(indices).encode('ascii')
+    return (np.frombuffer(text, dtype=np.uint8) - ord('0')).reshape(len(indices), dimension)
+
+def digits_to_syndrome(digit_rows):
+    """
+    Integer value of each row of ternary digits (most significant first), as int64.
+
+    Example:
+        >>> digits_to_syndrome([[0, 1, 2], [1, 0, 0]])
+        array([5, 9])
+    """
+
+    import numpy as np
+    digit_rows = np.asarray(digit_rows, dtype=np.int64)
+    powers = 3 ** np.arange(digit_rows.shape[1] - 1, -1, -1, dtype=np.int64)
+    return digit_rows @ powers
+
+def gf3_matmul(a, b):
+    """
+    Matrix product over GF(3): (a @ b) mod 3 as uint8.
+
+    The product runs in float64 (BLAS), which is exact while every sum stays below 2**53.
+
+    Example:
+        >>> gf3_matmul([[1, 2]], [[2], [2]])
+        array([[0]], dtype=uint8)
+    """
+
+    import numpy as np
+    product = np.asarray(a, dtype=np.float64) @ np.asarray(b, dtype=np.float64)
+    return np.remainder(product, 3).astype(np.uint8)
+
+#=-=-=-=-=-=-=- Packed Trits: 5 per Byte (3^5 = 243) =-=-=-=-=-=-=-
+TRITS_PER_BYTE = 5
+
+@lru_cache(maxsize=None)
+def _pack_tables():
+    # (weights, unpack table, valid bytes), built on first use so importing Module needs no numpy
+    import numpy as np
+    weights = np.array([81, 27, 9, 3, 1], dtype=np.uint8)                  # first trit most significant
+    unpack = np.array([ternary_digits(min(value, 242), TRITS_PER_BYTE) for value in range(256)],
+                      dtype=np.uint8)                                       # byte -> its 5 trits
+    valid = np.arange(256) < 243                                            # bytes 243..255 hold no trits
+    return weights, unpack, valid
+
+def packed_size(trits):
+    """
+    Bytes taken by `trits` packed trits: ceil(trits / 5).
+
+    Example:
+        >>> packed_size(11)
+        3
+    """
+
+    return -(-trits // TRITS_PER_BYTE)
+
+def _as_trit_vector(trits):
+    # str/bytes of '0'/'1'/'2' or an array-like of 0/1/2 -> 1-D uint8 trits
+    import numpy as np
+    if isinstance(trits, str):
+        try:
+            trits = trits.encode('ascii')
+        except UnicodeEncodeError:
+            raise ValueError("trits should only be 0, 1 or 2") from None
+    if isinstance(trits, (bytes, bytearray, memoryview)):
+        vector = np.frombuffer(trits, dtype=np.uint8) - ord('0')
+    else:
+        vector = np.asarray(trits).reshape(-1)
+    if vector.size and (vector.min() < 0 or vector.max() > 2):
+        raise ValueError("trits should only be 0, 1 or 2")
+    return vector.astype(np.uint8, copy=False)
+
+def pack_rows(rows):
+    """
+    Pack every row of a trit matrix into ceil(width / 5) bytes, the last byte of a row padded with 0.
+
+    Parameters:
+        rows (array-like): 2-D array of values 0, 1, 2, one record per row.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (count, packed_size(width)); memoryview() of it
+        gives the packed records without a copy.
+
+    Example:
+        >>> pack_rows([[1, 0, 2, 1, 0, 2]]).tolist()
+        [[102, 162]]
+    """
+
+    import numpy as np
+    rows = as_trit_matrix(rows)
+    count, width = rows.shape
+    size = packed_size(width)
+    padded = np.zeros((count, size * TRITS_PER_BYTE), dtype=np.uint8)
+    padded[:, :width] = rows
+    weights, _, _ = _pack_tables()
+    return padded.reshape(count, size, TRITS_PER_BYTE) @ weights
+
+def unpack_rows(data, width):
+    """
+    Unpack records written by pack_rows(), reading `data` in place (no copy of the input).
+
+    Parameters:
+        data (bytes-like): Packed records, packed_size(width) bytes each.
+        width (int): Trits per record.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (count, width).
+
+    Raises:
+        ValueError: If the data is not a whole number of records or holds a byte above 242.
+
+    Example:
+        >>> unpack_rows(bytes([102, 162]), 6).tolist()
+        [[1, 0, 2, 1, 0, 2]]
+    """
+
+    import numpy as np
+    packed = np.frombuffer(data, dtype=np.uint8)
+    size = packed_size(width)
+    if size == 0 or len(packed) % size:
+        raise ValueError(f"{len(packed)} bytes is not a whole number of {size}-byte records")
+    _, unpack, valid = _pack_tables()
+    if not valid[packed].all():
+        raise ValueError("packed trits should be bytes 0..242")
+    return unpack[packed.reshape(-1, size)].reshape(-1, size * TRITS_PER_BYTE)[:, :width]
+
+def pack_trits(trits):
+    """
+    Pack a trit sequence, 5 trits per byte, the last byte padded with 0.
+
+    Parameters:
+        trits: str/bytes of '0'/'1'/'2', or an array-like of 0/1/2.
+
+    Returns:
+        bytes: packed_size(len(trits)) bytes.
+
+    Example:
+        >>> pack_trits("102102")
+        b'f\xa2'
+    """
+
+    vector = _as_trit_vector(trits)
+    return pack_rows(vector.reshape(1, -1)).tobytes()
+
+def unpack_trits(data, count=None):
+    """
+    Unpack a packed trit sequence, reading `data` in place.
+
+    Parameters:
+        data (bytes-like): Packed trits.
+        count (int, optional): Number of trits, drops the padding of the last byte.
+
+    Returns:
+        numpy.ndarray: 1-D uint8 trits.
+
+    Example:
+        >>> unpack_trits(b'f\xa2', 6).tolist()
+        [1, 0, 2, 1, 0, 2]
+    """
+
+    import numpy as np
+    packed = np.frombuffer(data, dtype=np.uint8)
+    _, unpack, valid = _pack_tables()
+    if not valid[packed].all():
+        raise ValueError("packed trits should be bytes 0..242")
+    trits = unpack[packed].reshape(-1)
+    return trits if count is None else trits[:count]
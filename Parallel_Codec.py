@@ -0,0 +1,199 @@
+import Module
+import Stream_Codec
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import numpy as np
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Parallel Batch Codec over Shared Memory =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# The rows of a batch are split across a pool of worker processes. Input and output arrays live in
+# multiprocessing.shared_memory blocks, so a task only carries block names and a row range.
+# Workers live as long as the ParallelCodec, so their cached layouts and matrices stay warm.
+
+MIN_PARALLEL_ROWS = 4096        # smaller batches are run in the calling process
+TASKS_PER_WORKER = 4            # row ranges per worker, evens out slow workers
+
+#=-=-=-=-=-=-=- Shared Arrays =-=-=-=-=-=-=-
+def _create_shared(shape, dtype):
+    dtype = np.dtype(dtype)
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    return block, (block.name, tuple(shape), dtype.str)
+
+def _attach_shared(spec):
+    # Attach in a worker; the parent owns the block and unlinks it. Pool workers share the
+    # parent's resource tracker, so on Python < 3.13 (no track=) the second registration is a no-op.
+    try:
+        return shared_memory.SharedMemory(name=spec[0], track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=spec[0])
+
+def _shared_array(block, spec):
+    _, shape, dtype = spec
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _release(blocks):
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+#=-=-=-=-=-=-=- Message and Codeword Lengths =-=-=-=-=-=-=-
+def _check_message_length(scheme, length):
+    # Raise in the parent what encode_batch() would raise in every worker
+    dimension, codeword_length, _ = Module.plan_code(scheme, length)
+    if not Module.get_code_layout(scheme, dimension, codeword_length).complete:
+        raise ValueError(f"Message length {length} is not supported at dimension {dimension}")
+
+def _message_length(scheme, codeword_length):
+    # Message trits carried by codewords of this length, 0 when it is not a valid codeword length
+    dimension = Stream_Codec.DECODERS[scheme].decide_dimension(codeword_length)
+    layout = Module.get_code_layout(scheme, dimension, codeword_length)
+    return len(layout.message_positions) if layout.complete else 0
+
+#=-=-=-=-=-=-=- Worker Side =-=-=-=-=-=-=-
+def _warm(scheme, length):
+    # Pool initializer: build the layout and matrices of (scheme, message length) once per worker
+    if length:
+        Stream_Codec.ENCODERS[scheme].encode_batch(np.zeros((1, length), dtype=np.uint8))
+        codeword_length = Module.plan_code(scheme, length)[1]
+        Stream_Codec.DECODERS[scheme].decode_batch(np.zeros((1, codeword_length), dtype=np.uint8))
+
+def _code_rows(kind, scheme, source, outputs, start, stop):
+    if kind == "encode":
+        outputs[0][start:stop] = Stream_Codec.ENCODERS[scheme].encode_batch(source[start:stop])
+    else:
+        results = Stream_Codec.DECODERS[scheme].decode_batch(source[start:stop])
+        for output, result in zip(outputs, results):
+            output[start:stop] = result
+
+def _run_task(kind, scheme, source_spec, output_specs, start, stop):
+    # Code rows [start, stop) of the shared source into the shared outputs
+    specs = (source_spec,) + tuple(output_specs)
+    blocks = []
+    try:
+        for spec in specs:
+            blocks.append(_attach_shared(spec))
+        arrays = [_shared_array(block, spec) for block, spec in zip(blocks, specs)]
+        _code_rows(kind, scheme, arrays[0], arrays[1:], start, stop)
+        del arrays              # no view may outlive the blocks
+        return stop - start
+    finally:
+        for block in blocks:
+            block.close()
+
+#=-=-=-=-=-=-=- Parallel Codec =-=-=-=-=-=-=-
+class ParallelCodec:
+    """
+    encode_batch() / decode_batch() of one scheme, split across a pool of worker processes.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        workers (int, optional): Number of processes, os.cpu_count() by default.
+        warm_length (int, optional): Message length whose tables every worker builds at start-up.
+
+    Raises:
+        ValueError: If the scheme is unknown or it does not support warm_length.
+
+    Example:
+        >>> with ParallelCodec("D3", workers=4, warm_length=10) as codec:
+        ...     codewords = codec.encode(messages)
+        ...     corrected, messages, status, error_positions = codec.decode(codewords)
+
+    Note:
+        - Results match encode_batch() / decode_batch() of the scheme row for row.
+        - Batches under MIN_PARALLEL_ROWS rows are coded in the calling process.
+        - With the "spawn" start method, create it under `if __name__ == "__main__":`.
+    """
+
+    def __init__(self, scheme="D3", workers=None, warm_length=0):
+        if scheme not in Stream_Codec.ENCODERS:
+            raise ValueError(f"Unknown scheme {scheme!r}, should be one of {sorted(Stream_Codec.ENCODERS)}")
+        if warm_length:
+            _check_message_length(scheme, warm_length)
+        self.scheme = scheme
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_warm, initargs=(scheme, warm_length))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def _ranges(self, count):
+        step = max(-(-count // (self.workers * TASKS_PER_WORKER)), 1)
+        return [(start, min(start + step, count)) for start in range(0, count, step)]
+
+    def _map(self, kind, rows, output_shapes):
+        # Copy rows into shared memory, run every row range on the pool, copy the outputs back
+        blocks = []
+        try:
+            source_block, source_spec = _create_shared(rows.shape, rows.dtype)
+            blocks.append(source_block)
+            _shared_array(source_block, source_spec)[:] = rows
+
+            output_specs = []
+            for shape, dtype in output_shapes:
+                block, spec = _create_shared(shape, dtype)
+                blocks.append(block)
+                output_specs.append(spec)
+
+            futures = [self._pool.submit(_run_task, kind, self.scheme, source_spec, output_specs, start, stop)
+                       for start, stop in self._ranges(len(rows))]
+            for future in futures:
+                future.result()
+
+            return tuple(_shared_array(block, spec).copy() for block, spec in zip(blocks[1:], output_specs))
+        finally:
+            _release(blocks)
+
+    def encode(self, messages):
+        """
+        Encode a batch of messages, same input and output as the scheme's encode_batch().
+        """
+
+        messages = Module.as_trit_matrix(messages)
+        encoder = Stream_Codec.ENCODERS[self.scheme]
+        if len(messages) < MIN_PARALLEL_ROWS or self.workers == 1:
+            return encoder.encode_batch(messages)
+        codeword_length = Module.plan_code(self.scheme, messages.shape[1])[1]
+        return self._map("encode", messages, [((len(messages), codeword_length), np.uint8)])[0]
+
+    def decode(self, codewords):
+        """
+        Decode a batch of codewords, same input and output as the scheme's decode_batch().
+        """
+
+        codewords = Module.as_trit_matrix(codewords)
+        decoder = Stream_Codec.DECODERS[self.scheme]
+        if len(codewords) < MIN_PARALLEL_ROWS or self.workers == 1:
+            return decoder.decode_batch(codewords)
+
+        count, length = codewords.shape
+        message_length = _message_length(self.scheme, length)
+        return self._map("decode", codewords, [((count, length), np.uint8),
+                                               ((count, message_length), np.uint8),
+                                               ((count,), np.uint8),
+                                               ((count,), np.int32)])
+
+#=-=-=-=-=-=-=- One-Shot Helpers =-=-=-=-=-=-=-
+def parallel_encode(messages, scheme="D3", workers=None):
+    """
+    Encode one batch on a temporary pool; keep a ParallelCodec open to code many batches.
+    """
+
+    messages = Module.as_trit_matrix(messages)
+    with ParallelCodec(scheme, workers, messages.shape[1]) as codec:
+        return codec.encode(messages)
+
+def parallel_decode(codewords, scheme="D3", workers=None):
+    """
+    Decode one batch on a temporary pool; keep a ParallelCodec open to code many batches.
+    """
+
+    codewords = Module.as_trit_matrix(codewords)
+    with ParallelCodec(scheme, workers, _message_length(scheme, codewords.shape[1])) as codec:
+        return codec.decode(codewords)
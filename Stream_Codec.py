@@ -0,0 +1,346 @@
+import Module
+import Web_Final_D3
+import Web_Final_D3_EC
+import Web_Final_D4
+import Web_Final_D4_EC
+import argparse
+import sys
+import numpy as np
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Streaming Codec: Fixed-Size Blocks =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# Long payloads are cut into fixed-size blocks that are encoded with one (scheme, dimension),
+# a batch of blocks at a time, so memory stays at about batch_blocks * block_length trits.
+
+READ_CHUNK = 1 << 16            # characters read from a file per call
+BATCH_BLOCKS = 4096             # blocks encoded per matrix product
+ENCODERS = {"D3": Web_Final_D3, "D4": Web_Final_D4}
+DECODERS = {"D3": Web_Final_D3_EC, "D4": Web_Final_D4_EC}
+_TRIT_TEXT = b'012'
+_IGNORED_TEXT = b' \t\r\n'
+
+#=-=-=-=-=-=-=- Block Plan: Scheme, Dimension, Block and Codeword Length =-=-=-=-=-=-=-
+def block_plan(scheme, block_length=None, dimension=None):
+    """
+    Fix the block size of a stream.
+
+    Parameters:
+        scheme (str): "D3" or "D4".
+        block_length (int, optional): Message trits per block.
+        dimension (int, optional): Dimension of the code, used when block_length is not given:
+            the block then takes the most message trits this dimension carries.
+
+    Returns:
+        tuple: (dimension, block_length, codeword_length)
+
+    Raises:
+        ValueError: If the scheme is unknown, neither or both of block_length / dimension are
+            given, or they do not fit a code.
+
+    Example:
+        >>> block_plan("D3", dimension=3)
+        (3, 10, 13)
+        >>> block_plan("D4", block_length=6)
+        (4, 6, 12)
+    """
+
+    if scheme not in ENCODERS:
+        raise ValueError(f"Unknown scheme {scheme!r}, should be one of {sorted(ENCODERS)}")
+    if (block_length is None) == (dimension is None):
+        raise ValueError("give exactly one of block_length and dimension")
+    if block_length is None:
+        dimensions, _, _ = Module.capacity_table(scheme)
+        supported = Module.message_range(scheme, dimension) if dimension in dimensions else None
+        if not supported:
+            raise ValueError(f"{scheme} has no dimension {dimension}")
+        block_length = supported[1]
+    if block_length < 1:
+        raise ValueError("block_length should be at least 1")
+
+    dimension, codeword_length, _ = Module.plan_code(scheme, block_length)
+    return dimension, block_length, codeword_length
+
+#=-=-=-=-=-=-=- Read Trits from an Iterable, File, Path or stdin =-=-=-=-=-=-=-
+def iter_trit_chunks(source, chunk_size=READ_CHUNK):
+    """
+    Yield the trits of a source as 1-D uint8 arrays, whitespace skipped.
+
+    Parameters:
+        source: One of
+            - "-" for stdin, or a path (str) of a text file of '0'/'1'/'2',
+            - a file object (text or binary) with .read(),
+            - an iterable of str/bytes pieces (e.g. lines), or of single ints 0/1/2.
+        chunk_size (int): Characters read per call from a file.
+
+    Raises:
+        ValueError: If the source holds a character other than '0', '1', '2' or whitespace.
+
+    Example:
+        >>> [chunk.tolist() for chunk in iter_trit_chunks(["10 2", "1\\n"])]
+        [[1, 0, 2], [1]]
+    """
+
+    if isinstance(source, str):
+        if source == "-":
+            yield from iter_trit_chunks(getattr(sys.stdin, "buffer", sys.stdin), chunk_size)
+            return
+        with open(source, "rb") as file:
+            yield from iter_trit_chunks(file, chunk_size)
+        return
+
+    if hasattr(source, "read"):
+        pieces = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        pieces = source
+
+    pending_ints = []
+    for piece in pieces:
+        if isinstance(piece, (int, np.integer)):
+            pending_ints.append(int(piece))
+            if len(pending_ints) >= chunk_size:
+                yield Module.as_trit_matrix([pending_ints])[0]
+                pending_ints = []
+            continue
+        if pending_ints:
+            yield Module.as_trit_matrix([pending_ints])[0]
+            pending_ints = []
+        try:
+            text = piece.encode("ascii") if isinstance(piece, str) else bytes(piece)
+        except UnicodeEncodeError:
+            text = None
+        if text is None or text.translate(None, _TRIT_TEXT + _IGNORED_TEXT):
+            raise ValueError("the stream should only hold '0', '1', '2' and whitespace")
+        text = text.translate(None, _IGNORED_TEXT)
+        if text:
+            yield np.frombuffer(text, dtype=np.uint8) - ord('0')
+    if pending_ints:
+        yield Module.as_trit_matrix([pending_ints])[0]
+
+def iter_blocks(chunks, block_length, batch_blocks=BATCH_BLOCKS, pad=True):
+    """
+    Regroup a stream of trit chunks into 2-D batches of whole blocks.
+
+    Parameters:
+        chunks (iterable): 1-D uint8 trit arrays, e.g. from iter_trit_chunks().
+        block_length (int): Trits per block.
+        batch_blocks (int): Most blocks per yielded batch.
+        pad (bool): Pad the last partial block with '0' (True) or raise (False).
+
+    Yields:
+        tuple: (batch, tail), batch a uint8 array of shape (<= batch_blocks, block_length) and
+        tail the number of padding trits in its last row (0 except for the final batch).
+
+    Raises:
+        ValueError: If pad is False and the stream does not end on a block boundary.
+    """
+
+    capacity = batch_blocks * block_length
+    buffer = np.empty(capacity, dtype=np.uint8)
+    filled = 0
+    for chunk in chunks:
+        start = 0
+        while start < len(chunk):
+            take = min(capacity - filled, len(chunk) - start)
+            buffer[filled:filled + take] = chunk[start:start + take]
+            filled += take
+            start += take
+            if filled == capacity:
+                yield buffer.reshape(batch_blocks, block_length).copy(), 0
+                filled = 0
+
+    if filled:
+        tail = -filled % block_length
+        if tail and not pad:
+            raise ValueError(f"stream ends inside a block: {filled % block_length} of {block_length} trits")
+        buffer[filled:filled + tail] = 0
+        filled += tail
+        yield buffer[:filled].reshape(-1, block_length).copy(), tail
+
+def rows_to_strings(rows):
+    """
+    Turn a 2-D trit array into one '0'/'1'/'2' string per row.
+
+    Example:
+        >>> rows_to_strings(np.array([[1, 0, 2], [2, 2, 0]], dtype=np.uint8))
+        ['102', '220']
+    """
+
+    rows = Module.as_trit_matrix(rows)
+    text = (rows + ord('0')).tobytes().decode("ascii")
+    width = rows.shape[1]
+    return [text[i:i + width] for i in range(0, len(text), width)]
+
+#=-=-=-=-=-=-=- Streaming Encoder =-=-=-=-=-=-=-
+def encode_stream(source, scheme="D3", block_length=None, dimension=None, batch_blocks=BATCH_BLOCKS):
+    """
+    Encode an arbitrarily long trit stream block by block, with bounded memory.
+
+    Parameters:
+        source: Anything iter_trit_chunks() reads (iterable, file object, path, "-" for stdin).
+        scheme (str): "D3" or "D4".
+        block_length (int, optional): Message trits per block.
+        dimension (int, optional): Dimension of the code, see block_plan(). One of
+            block_length / dimension is needed.
+        batch_blocks (int): Blocks encoded per matrix product.
+
+    Yields:
+        str: One codeword per block, every codeword of the same length (block_plan()[2]).
+        The last block is padded with '0' up to block_length.
+
+    Example:
+        >>> list(encode_stream(["1021", "102"], "D3", block_length=4))
+        ['1210021', '0210120']
+    """
+
+    dimension, block_length, _ = block_plan(scheme, block_length, dimension)
+    encoder = ENCODERS[scheme]
+    for batch, _ in iter_blocks(iter_trit_chunks(source), block_length, batch_blocks):
+        yield from rows_to_strings(encoder.encode_batch(batch))
+
+#=-=-=-=-=-=-=- Running Correction Statistics =-=-=-=-=-=-=-
+class DecodeStats:
+    """
+    Running counters of a decoded stream.
+
+    Attributes:
+        clean (int): Blocks with a zero syndrome.
+        corrected (int): Blocks with one corrected trit.
+        uncorrectable (int): Blocks whose syndrome matches no single error.
+        histogram (numpy.ndarray): int64 (codeword_length,), corrections per codeword position.
+
+    Example:
+        >>> stats = DecodeStats(7)
+        >>> stats.update(np.array([0, 1, 2]), np.array([-1, 3, -1]))
+        >>> stats.as_dict()["corrected"], stats.histogram.tolist()
+        (1, [0, 0, 0, 1, 0, 0, 0])
+    """
+
+    __slots__ = ("clean", "corrected", "uncorrectable", "histogram")
+
+    def __init__(self, codeword_length):
+        self.clean = 0
+        self.corrected = 0
+        self.uncorrectable = 0
+        self.histogram = np.zeros(codeword_length, dtype=np.int64)
+
+    @property
+    def blocks(self):
+        return self.clean + self.corrected + self.uncorrectable
+
+    def update(self, status, error_positions):
+        """Add one decode_batch() result (its status and error_positions arrays)."""
+        counts = np.bincount(status, minlength=3)
+        self.clean += int(counts[Module.STATUS_CLEAN])
+        self.corrected += int(counts[Module.STATUS_CORRECTED])
+        self.uncorrectable += int(counts[Module.STATUS_UNCORRECTABLE])
+        positions = error_positions[error_positions >= 0]
+        self.histogram += np.bincount(positions, minlength=len(self.histogram))
+
+    def as_dict(self):
+        return {"blocks": self.blocks, "clean": self.clean, "corrected": self.corrected,
+                "uncorrectable": self.uncorrectable, "histogram": self.histogram.tolist()}
+
+    def __repr__(self):
+        return (f"DecodeStats(blocks={self.blocks}, clean={self.clean}, "
+                f"corrected={self.corrected}, uncorrectable={self.uncorrectable})")
+
+#=-=-=-=-=-=-=- Streaming Decoder =-=-=-=-=-=-=-
+def decode_stream(source, scheme="D3", block_length=None, dimension=None, stats=None,
+                  length=None, batch_blocks=BATCH_BLOCKS):
+    """
+    Correct and decode a stream of fixed-length codewords in one pass, with bounded memory.
+
+    Parameters:
+        source: Anything iter_trit_chunks() reads; codewords may be split across lines freely.
+        scheme (str): "D3" or "D4".
+        block_length (int, optional): Message trits per block, as given to encode_stream().
+        dimension (int, optional): Dimension of the code, as given to encode_stream().
+        stats (DecodeStats, optional): Counters to update as blocks go by; pass one in to read them.
+        length (int, optional): Total message trits to yield, drops the encoder's padding.
+        batch_blocks (int): Codewords decoded per matrix product.
+
+    Yields:
+        str: The message of each block (block_length trits, the last one cut to `length`).
+        Blocks counted as uncorrectable still yield their raw message trits.
+
+    Raises:
+        ValueError: If the stream does not end on a codeword boundary.
+
+    Example:
+        >>> stats = DecodeStats(7)
+        >>> list(decode_stream(["1210021", "0210220"], "D3", block_length=4, stats=stats, length=7))
+        ['1021', '102']
+        >>> stats
+        DecodeStats(blocks=2, clean=1, corrected=1, uncorrectable=0)
+    """
+
+    dimension, block_length, codeword_length = block_plan(scheme, block_length, dimension)
+    decoder = DECODERS[scheme]
+    if stats is None:
+        stats = DecodeStats(codeword_length)
+    remaining = length
+
+    for batch, _ in iter_blocks(iter_trit_chunks(source), codeword_length, batch_blocks, pad=False):
+        _, messages, status, error_positions = decoder.decode_batch(batch)
+        stats.update(status, error_positions)
+        for message in rows_to_strings(messages):
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                message = message[:remaining]
+                remaining -= len(message)
+            yield message
+
+#=-=-=-=-=-=-=- Command Line =-=-=-=-=-=-=-
+def _write_lines(lines, output):
+    for line in lines:
+        output.write(line)
+        output.write("\n")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Streaming D3/D4 ternary codec over fixed-size blocks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    encode = commands.add_parser("encode", help="encode a trit stream, one codeword per line")
+    decode = commands.add_parser("decode", help="correct and decode codewords, one message per line")
+    decode.add_argument("--length", type=int, help="total message trits (drops the encoder's padding)")
+    decode.add_argument("--stats", action="store_true", help="print correction statistics to stderr")
+    for command in (encode, decode):
+        command.add_argument("input", nargs="?", default="-", help="file of '0'/'1'/'2' (default: stdin)")
+        command.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+        command.add_argument("-s", "--scheme", choices=sorted(ENCODERS), default="D3")
+        size = command.add_mutually_exclusive_group(required=True)
+        size.add_argument("-b", "--block-length", type=int, help="message trits per block")
+        size.add_argument("-d", "--dimension", type=int, help="dimension of the code (largest block it carries)")
+        command.add_argument("--batch-blocks", type=int, default=BATCH_BLOCKS, help="blocks per matrix product")
+    return parser
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Example:
+        $ python Stream_Codec.py encode -s D3 -d 5 payload.txt -o codewords.txt
+        $ python Stream_Codec.py decode -s D3 -d 5 codewords.txt --stats
+    """
+
+    args = build_parser().parse_args(argv)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        if args.command == "encode":
+            _write_lines(encode_stream(args.input, args.scheme, args.block_length, args.dimension,
+                                       args.batch_blocks), output)
+        else:
+            _, _, codeword_length = block_plan(args.scheme, args.block_length, args.dimension)
+            stats = DecodeStats(codeword_length)
+            _write_lines(decode_stream(args.input, args.scheme, args.block_length, args.dimension, stats,
+                                       args.length, args.batch_blocks), output)
+            if args.stats:
+                print(stats, file=sys.stderr)
+                print("Corrections per position:", stats.histogram.tolist(), file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import Module
+import Web_Final_D3
+import Web_Final_D3_EC
+import Web_Final_D4
+import Web_Final_D4_EC
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=- Stable API for the Web Pages (Pyodide) =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# Imported once when the page starts (pyodide.pyimport("Web_Api")), then called directly from
+# JavaScript: no Python source is compiled and nothing is re-imported per click, and the cached
+# layouts/tables of the codec modules stay warm between calls.
+#
+# Every function returns a dict (or a list of dicts for the *_many batch calls), for JavaScript:
+#     api.d3_encode("1021").toJs({dict_converter: Object.fromEntries})
+
+API_VERSION = 1
+
+#=-=-=-=-=-=-=- Inputs: str, List of Trits or Trit Buffer =-=-=-=-=-=-=-
+def as_trit_text(trits):
+    """
+    Accept a trit input from JavaScript or Python and return it as a '0'/'1'/'2' string.
+
+    Parameters:
+        trits: One of
+            - str of '0'/'1'/'2',
+            - list/tuple of 0/1/2 (a JavaScript array),
+            - bytes-like of raw trit values 0/1/2 or of ASCII '0'/'1'/'2' (a JavaScript Uint8Array).
+
+    Raises:
+        ValueError: If the input holds anything other than trits.
+
+    Example:
+        >>> as_trit_text([1, 0, 2]), as_trit_text(bytes([1, 0, 2])), as_trit_text(b"102")
+        ('102', '102', '102')
+    """
+
+    if hasattr(trits, "to_py"):         # JsProxy of a JavaScript array or typed array
+        trits = trits.to_py()
+    if isinstance(trits, (bytes, bytearray, memoryview)):
+        raw = bytes(trits)
+        text = raw.decode("ascii") if raw and min(raw) >= ord('0') else ''.join(map(str, raw))
+    elif isinstance(trits, str):
+        text = trits
+    else:
+        text = ''.join(str(int(trit)) for trit in trits)
+    if text.strip('012'):
+        raise ValueError("Your input must be ternary!")
+    return text
+
+def _as_list(items):
+    if hasattr(items, "to_py"):
+        items = items.to_py()
+    return list(items)
+
+#=-=-=-=-=-=-=- D3 =-=-=-=-=-=-=-
+def d3_encode(message):
+    """
+    D3 encode. Returns {"codeword", "length", "rate"}.
+    """
+
+    codeword, length, rate = Web_Final_D3.main_function(as_trit_text(message))
+    return {"codeword": codeword, "length": length, "rate": rate}
+
+def d3_decode(codeword):
+    """
+    D3 error correction. Returns {"feature", "location", "corrected", "announcement", "message"}
+    (P_all, the erroneous position, the corrected codeword, the report and the message).
+    """
+
+    feature, location, corrected, announcement, message = Web_Final_D3_EC.main_function(as_trit_text(codeword))
+    return {"feature": feature, "location": location, "corrected": corrected,
+            "announcement": announcement, "message": message}
+
+#=-=-=-=-=-=-=- D4 =-=-=-=-=-=-=-
+def d4_encode(message):
+    """
+    D4 encode. Returns {"codeword", "length", "rate"}.
+    """
+
+    codeword, length, rate = Web_Final_D4.main_function(as_trit_text(message))
+    return {"codeword": codeword, "length": length, "rate": rate}
+
+def d4_decode(codeword):
+    """
+    D4 error correction. Returns {"corrected", "message", "location", "announcement", "P_all",
+    "P_1", "P_2", "P_all_case", "I"}, the fields of Web_Final_D4_EC.main_function().
+    """
+
+    (corrected, message, location, announcement, P_all, P_1, P_2,
+     P_all_case, I) = Web_Final_D4_EC.main_function(as_trit_text(codeword))
+    return {"corrected": corrected, "message": message, "location": location, "announcement": announcement,
+            "P_all": P_all, "P_1": P_1, "P_2": P_2, "P_all_case": P_all_case, "I": list(I)}
+
+#=-=-=-=-=-=-=- Batch Requests =-=-=-=-=-=-=-
+_CALLS = {("D3", "encode"): d3_encode, ("D3", "decode"): d3_decode,
+          ("D4", "encode"): d4_encode, ("D4", "decode"): d4_decode}
+
+def _many(scheme, action, items):
+    if (scheme, action) not in _CALLS:
+        raise ValueError(f"Unknown scheme {scheme!r}, should be D3 or D4")
+    call = _CALLS[scheme, action]
+    results = []
+    for item in _as_list(items):
+        try:
+            results.append(call(item))
+        except Exception as error:      # one bad input does not sink the whole batch
+            results.append({"error": str(error)})
+    return results
+
+def encode_many(scheme, messages):
+    """
+    Encode many messages in one round trip. Returns one dict per message, {"error": ...} for a bad one.
+
+    Example:
+        >>> [result["codeword"] for result in encode_many("D3", ["1021", "1020"])]
+        ['1210021', '0210120']
+    """
+
+    return _many(scheme, "encode", messages)
+
+def decode_many(scheme, codewords):
+    """
+    Correct many codewords in one round trip. Returns one dict per codeword, {"error": ...} for a bad one.
+    """
+
+    return _many(scheme, "decode", codewords)
+
+#=-=-=-=-=-=-=- Warm-Up and Cache Stats =-=-=-=-=-=-=-
+def warm(scheme, message_lengths):
+    """
+    Build the layouts of some message lengths ahead of the first click. Returns the layout cache stats.
+    """
+
+    for length in _as_list(message_lengths):
+        dimension, codeword_length, _ = Module.plan_code(scheme, int(length))
+        Module.get_code_layout(scheme, dimension, codeword_length)
+    return cache_info()
+
+def cache_info():
+    """
+    Hit/miss counters of the shared layout cache, as a dict.
+    """
+
+    info = Module.get_code_layout.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize,
+            "api_version": API_VERSION}
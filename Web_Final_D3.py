@@ -1,5 +1,5 @@
 import Module
-import math
+from functools import lru_cache
 
 
 def combine_compute_original_value(message_index_value_mapping, redundant_index_value_mapping, ternary_set):
@@ -45,63 +45,198 @@ def generate_redundant_list(length):
         list of str: List of binary strings representing e_i vectors.
 
     Example:
-        >>> generate_redundant_list(4)
-        ['1000', '0100', '0010', '0001']
+        >>> generate_redundant_list(3)
+        ['001', '010', '100']
     """
 
-    redundant_list = []
-    for i in range(length):
-        redundant_list.append("0"*(length-1-i)+"1"+"0"*i)
+    return Module.d3_build_redundant_list(length)
 
-    return redundant_list
+#=-=-=-=-=-=-=- Smallest Dimension Holding the Message =-=-=-=-=-=-=-
+def decide_dimension(length):
+    """
+    Smallest D3 dimension d whose code carries `length` message trits, i.e. length <= (3^d-1)/2 - d.
 
-#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-Main_Area=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
-def main_function(input_ternary):
+    Example:
+        >>> decide_dimension(4)
+        3
     """
-    Encode a given ternary message using a D3-style error correction code.
+
+    return Module.dimension_for_message("D3", length)
+
+#=-=-=-=-=-=-=- Generator Matrix over GF(3) =-=-=-=-=-=-=-
+@lru_cache(maxsize=Module.LAYOUT_CACHE_SIZE)
+def generator_matrix(dimension, length):
+    """
+    Build the D3 generator matrix G so that codeword = message @ G (mod 3).
+
+    Row i is the codeword of the i-th unit message: a 1 at the i-th message position, and
+    at the redundant index e_j the digit j of 2*index (the value main_function gives to it).
 
     Parameters:
-        input_ternary (str): The input ternary message (string of digits '0', '1', '2').
+        dimension (int): Dimension of the code.
+        length (int): Message length.
 
     Returns:
-        tuple:
-            - correct_code (str): The full encoded ternary codeword.
-            - code_length (int): Length of the resulting codeword.
-            - efficiency (float): Ratio of input message length to codeword length.
+        numpy.ndarray: Read-only uint8 array of shape (length, length + dimension).
+
+    Note:
+        - The '000' value of combine_compute_original_value() is not a codeword position
+          (the code only holds generate_ternary_set_half() indices), so G has no column for it.
+    """
+
+    import numpy as np
+    layout = Module.get_code_layout("D3", dimension, length + dimension)
+    G = np.zeros((length, layout.length), dtype=np.uint8)
+    G[np.arange(length), layout.message_positions] = 1
+
+    # digits[i, p] = p-th digit (from the left) of the i-th message index
+    digits = Module.index_digit_matrix(layout.message_indices, dimension)
+    for i, position in enumerate(layout.redundant_positions):
+        G[:, position] = (2 * digits[:, dimension - 1 - i]) % 3   # redundant e_i carries 1 at digit d-1-i
+
+    G.setflags(write=False)
+    return G
+
+#=-=-=-=-=-=-=- Batched Encoder =-=-=-=-=-=-=-
+def encode_batch(messages):
+    """
+    Encode many messages of the same length with one GF(3) matrix product.
+
+    Parameters:
+        messages (array-like): 2-D uint8 array of shape (count, length), trits 0/1/2.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (count, length + dimension), row i being
+        the codeword main_function() gives for message i.
+
+    Raises:
+        ValueError: If the messages are not a non-empty 2-D trit array.
 
     Example:
-        >>> main_function("1021")
-        Error Correction Code: 1210021
-        ("1210021", 7, 0.5714285714285714)
+        >>> encode_batch(np.array([[1, 0, 2, 1]], dtype=np.uint8))
+        array([[1, 2, 1, 0, 0, 2, 1]], dtype=uint8)
     """
 
-    #=-=-=-=-=-=-=- Decide Dimension =-=-=-=-=-=-=-
-    length = len(input_ternary)
-    dimension = 0
-    while length > (math.pow(3,dimension)-1)/2-dimension:
-        dimension+=1
+    messages = Module.as_trit_matrix(messages)
+    length = messages.shape[1]
+    if length == 0:
+        raise ValueError("messages should hold at least one trit")
 
-    #=-=-=-=-=-=-=- Pick Index & Cut Suitable Length =-=-=-=-=-=-=-
-    ternary_set = Module.generate_ternary_set_half(dimension)
-    ternary_set = ternary_set[:length + dimension]
+    G = generator_matrix(decide_dimension(length), length)
+    return Module.gf3_matmul(messages, G)
 
+#=-=-=-=-=-=-=- Packed In, Packed Out (5 Trits per Byte) =-=-=-=-=-=-=-
+def encode_packed(data, length):
+    """
+    encode_batch() over packed records: messages of `length` trits in Module.packed_size(length)
+    bytes each (Module.pack_rows() format), read in place.
 
-    #=-=-=-=-=-=-=- Pick Redundant Index =-=-=-=-=-=-=-
-    redundant_list = generate_redundant_list(dimension)
+    Returns:
+        memoryview: The codewords as packed records, Module.packed_size(codeword length) bytes each.
 
-    #=-=-=-=-=-=-=- Place Message Value =-=-=-=-=-=-=-
-    message_indices = [index for index in ternary_set if index not in redundant_list]
+    Example:
+        >>> bytes(encode_packed(Module.pack_trits("1021"), 4))
+        b'\x90\xbd'
+    """
 
-    values = [int(digit) for digit in input_ternary]
-    message_index_value_mapping = {}
+    codewords = encode_batch(Module.unpack_rows(data, length))
+    return memoryview(Module.pack_rows(codewords).reshape(-1))
 
-    for idx, digit in zip(message_indices, values):
-        message_index_value_mapping[idx] = digit
-        if len(message_index_value_mapping) == len(values):
-            break
+#=-=-=-=-=-=-=- Incremental Update When One Message Trit Changes =-=-=-=-=-=-=-
+def generator_row(dimension, length, message_pos):
+    """
+    Sparse row of the generator matrix: the codeword trits that move with message trit `message_pos`.
 
+    The redundant trits are the standard basis indices e_k, so a change of `delta` on a message
+    trit with index I moves P_all by delta*I, and e_k takes back -delta times digit k of I.
+
+    Parameters:
+        dimension (int): Dimension of the code.
+        length (int): Codeword length.
+        message_pos (int): 0-based position of the trit in the message.
+
+    Returns:
+        tuple: ((position, coefficient), ...), the message trit first, then the redundant trits
+        with a nonzero coefficient: at most dimension + 1 pairs.
+
+    Raises:
+        ValueError: If the dimension does not match the length, the length is not a valid codeword
+            length, or message_pos is out of range.
+
+    Example:
+        >>> generator_row(3, 7, 0)          # message trit 0 sits on index '011'
+        ((2, 1), (0, 2), (1, 2))
+    """
+
+    layout, position = Module.message_trit_position("D3", dimension, length, message_pos)
+    index = layout.indices[position]
+    row = [(position, 1)]
+    for redundant, redundant_position in zip(layout.redundant, layout.redundant_positions):
+        digit = int(index[redundant.index('1')])
+        if digit:
+            row.append((redundant_position, (2 * digit) % 3))
+    return tuple(row)
+
+def update_codeword(codeword, message_pos, new_value):
+    """
+    Set one message trit of a stored D3 codeword and fix its redundant trits, in O(d).
+
+    Parameters:
+        codeword: str of '0'/'1'/'2', or a mutable sequence of trit values 0/1/2 (bytearray, list,
+            numpy array), which is patched in place.
+        message_pos (int): 0-based position of the trit in the message.
+        new_value (int): New trit value, 0/1/2.
+
+    Returns:
+        The patched codeword (a new str for a str), equal to main_function() of the edited message.
+
+    Raises:
+        ValueError: If new_value is not a trit, the codeword length is not valid or message_pos is out of range.
+
+    Example:
+        >>> update_codeword("1210021", 0, 2)     # main_function("2021")[0]
+        '0120021'
+    """
+
+    if new_value not in (0, 1, 2):
+        raise ValueError(f"new_value should be 0, 1 or 2, got {new_value!r}")
+    length = len(codeword)
+    row = generator_row(Module.dimension_for_codeword("D3", length), length, message_pos)
+    return Module.patch_trits(codeword, row, (new_value - int(codeword[row[0][0]])) % 3)
+
+#=-=-=-=-=-=-=- Encode into a Result Object =-=-=-=-=-=-=-
+def encode(input_ternary):
+    """
+    Encode a ternary message into a D3 codeword.
+
+    Parameters:
+        input_ternary (str): The input ternary message (string of digits '0', '1', '2').
+
+    Returns:
+        Module.EncodeResult: codeword, with length and rate as properties.
+
+    Example:
+        >>> encode("1021").codeword
+        '1210021'
+    """
+
+    #=-=-=-=-=-=-=- Decide Dimension =-=-=-=-=-=-=-
+    trace = Module.stage_timer("D3")
+    trace.stage("dimension")
+    length = len(input_ternary)
+    dimension = decide_dimension(length)
+
+    #=-=-=-=-=-=-=- Pick Index & Redundant Index (Cached Layout) =-=-=-=-=-=-=-
+    trace.stage("index")
+    layout = Module.get_code_layout("D3", dimension, length + dimension)
+    ternary_set = layout.indices
+    redundant_list = layout.redundant
+
+    #=-=-=-=-=-=-=- Place Message Value =-=-=-=-=-=-=-
+    message_index_value_mapping = dict(zip(layout.message_indices, map(int, input_ternary)))
 
     #=-=-=-=-=-=-=- Calculating Xor Sum(P_all) =-=-=-=-=-=-=-
+    trace.stage("syndrome")
     raw_xor_sum = Module.ternary_xor_sum(message_index_value_mapping)
     inverse_xor = Module.xor_multiply(2,raw_xor_sum)
 
@@ -114,10 +249,35 @@ def main_function(input_ternary):
 
     total_mapping = combine_compute_original_value(message_index_value_mapping, redundant_index_value_mapping,ternary_set)
 
-    #=-=-=-=-=-=-=- Print Final Result =-=-=-=-=-=-=-
+    #=-=-=-=-=-=-=- Final Result =-=-=-=-=-=-=-
+    trace.stage("codeword")
     correct_code = ''.join(str(v) for v in total_mapping.values())
-    print("Error Correction Code:" + correct_code)
-    code_length = len(correct_code)
-    efficiency = length/code_length
-    
-    return correct_code, code_length, efficiency
\ No newline at end of file
+    if Module.TRACE_SUBSCRIBERS:
+        trace.note(codeword=correct_code)
+    trace.done()
+    return Module.EncodeResult(correct_code, length)
+
+#=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-Main_Area=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+def main_function(input_ternary):
+    """
+    Encode a given ternary message using a D3-style error correction code.
+
+    Parameters:
+        input_ternary (str): The input ternary message (string of digits '0', '1', '2').
+
+    Returns:
+        tuple:
+            - correct_code (str): The full encoded ternary codeword.
+            - code_length (int): Length of the resulting codeword.
+            - efficiency (float): Ratio of input message length to codeword length.
+
+    Example:
+        >>> main_function("1021")
+        ("1210021", 7, 0.5714285714285714)
+
+    Note:
+        - The tuple of encode(); call encode() for an EncodeResult.
+        - Stages are traced under scope "D3" (Module.stage_timer), the codeword as a field of "codeword".
+    """
+
+    return encode(input_ternary).as_tuple()
@@ -1,30 +1,30 @@
 import Module
-import math
+from array import array
+from functools import lru_cache
 
 #=-=-=-=-=-=-=- Get the Message from Code =-=-=-=-=-=-=-
-def pick_message(d3_correct_code, dimension, order_mapping):
+def pick_message(d3_correct_code, dimension, order_mapping=None):
     """
     Extract the original ternary message from a D3-encoded codeword by removing redundant trits.
 
     Parameters:
         d3_correct_code (str): The full D3-encoded ternary codeword.
         dimension (int): The dimension used during encoding.
-        order_mapping (dict): A mapping from each ternary index to its position (1-based index).
+        order_mapping (dict, optional): Index -> 1-based position; kept for old callers, the
+            positions come from the shared layout (Module.get_code_layout()).
 
     Returns:
         str: The original message extracted from the codeword.
 
+    Raises:
+        ValueError: If the codeword length does not hold all redundant indices.
+
     Example:
-        >>> pick_message("02110200", 4, {'000':1, '001':2, '010':3, ...})
-        '21102'
+        >>> pick_message("120100", 3)
+        '010'
     """
-        
-    redundant_set = generate_redundant_list(dimension)
-    redundant_trits_loc = {order_mapping[redundant_trit] - 1 for redundant_trit in redundant_set}
-    original_message = ''.join(
-        char for idx, char in enumerate(d3_correct_code) if idx not in redundant_trits_loc
-    )
-    return original_message
+
+    return Module.get_code_layout("D3", dimension, len(d3_correct_code)).pick_message(d3_correct_code)
 
 def generate_redundant_list(length):
     """
@@ -37,15 +37,11 @@ def generate_redundant_list(length):
         list of str: List of binary strings representing e_i vectors.
 
     Example:
-        >>> generate_redundant_list(4)
-        ['1000', '0100', '0010', '0001']
+        >>> generate_redundant_list(3)
+        ['001', '010', '100']
     """
-        
-    redundant_list = []
-    for i in range(length):
-        redundant_list.append("0"*(length-1-i)+"1"+"0"*i)
 
-    return redundant_list
+    return Module.d3_build_redundant_list(length)
 
 #=-=-=-=-=-=-=- 1st, 2nd, 3rd, 4th, ... =-=-=-=-=-=-=-
 def ordinal(n):
@@ -79,44 +75,340 @@ def ordinal(n):
 def check_error_half(ternary_set_half, feature_value, dimension):
     """Determine error location and modification value for ternary code analysis.
     Args:
-        ternary_set_half (set): Valid set of ternary strings
-        feature_value (str): Input ternary string to analyze
+        ternary_set_half (set): Valid set of ternary strings (or of Module.TritWord), part of the half set
+        feature_value (str or Module.TritWord): Input ternary string to analyze, packed when the set is packed
         dimension (int): Required length of ternary strings
-        
+
     Returns:
         tuple: (error_location, change) pair with special codes:
-            - error_location: "3"*dimension (no error), "4"*dimension (unfixable), 
+            - error_location: "3"*dimension (no error), "4"*dimension (unfixable),
               or calculated location
             - change: Modification value (1 or 2)
-            
+
     Example:
-        >>> check_error_half({"111", "222"}, "111", 3)
-        ('111', 2)
-        
+        >>> check_error_half({"111", "122"}, "211", 3)
+        ('122', 2)
+
     Note:
-        - Return codes: 
+        - Return codes:
             3 = No error detected
             4 = Unrecoverable error
             1/2 = Specific modification needed
-        - Uses Module.xor_multiply for error location calculation
-    """ 
-    error_location = "3"*dimension  # Default error location
-    change = 3
-    if feature_value == "0"*dimension:
-        return error_location, change
-    if feature_value not in ternary_set_half:
-        error_location = Module.xor_multiply(2,feature_value)
-        if(error_location not in ternary_set_half):
-            return "4"*dimension, 4
-        change = 2
+        - The candidate comes from locate_error() over the whole half set, then is checked against the set
+        - A packed (TritWord) feature_value gives a TritWord error_location, the special codes stay strings
+    """
+    packed = isinstance(feature_value, Module.TritWord)
+    value = feature_value.to_int() if packed else int(feature_value, 3)
+    if value == 0:
+        return "3"*dimension, 3
+    rank, change = locate_error(value, Module.ternary_half_size(dimension))
+    if rank >= 0:
+        error_location = Module.ternary_half_unrank(rank, dimension)
+        if packed:
+            error_location = Module.TritWord.from_ternary(error_location)
+        if error_location in ternary_set_half:
+            return error_location, change
+    return "4"*dimension, 4
+
+#=-=-=-=-=-=-=- Dimension from Codeword Length =-=-=-=-=-=-=-
+def decide_dimension(length):
+    """
+    Dimension of a D3 codeword of `length` trits: smallest d with length <= (3^d-1)/2.
+
+    Exact integer bisection over the shared capacity table (no float log), so it always agrees
+    with the encoder.
+
+    Example:
+        >>> decide_dimension(7)
+        3
+    """
+
+    return Module.dimension_for_codeword("D3", length)
+
+#=-=-=-=-=-=-=- Locate One Error: P_all -> (Position, Change), Closed Form =-=-=-=-=-=-=-
+def locate_error(syndrome, length):
+    """
+    Position and change of the single error behind a nonzero P_all, without any table.
+
+    P_all is the index of the wrong trit (change 1) or twice it (change 2). Doubling turns the
+    leading digit 2 into 1, so the normalized P_all is checked with Module.ternary_half_contains(),
+    and its Module.ternary_half_rank() is the codeword position (the D3 layout lists the half set
+    in rank order).
 
-        #print("Error Located at: "+ error_location + ", with change + " + str(change) + "from original value")
-        return error_location, change
+    Parameters:
+        syndrome (int): Integer value of P_all.
+        length (int): Codeword length.
+
+    Returns:
+        tuple: (position, change), (-1, 0) when no trit of this codeword explains P_all.
+
+    Example:
+        >>> locate_error(int('102', 3), 7), locate_error(int('201', 3), 7), locate_error(int('111', 3), 7)
+        ((6, 1), (6, 2), (-1, 0))
+    """
 
-    error_location = feature_value
     change = 1
-    #print("Error Located at: "+ error_location + ", with change + " + str(change) + "from original value")
-    return error_location, change
+    if not Module.ternary_half_contains(syndrome):
+        syndrome = Module.int_xor_multiply(2, syndrome)
+        if not Module.ternary_half_contains(syndrome):
+            return -1, 0
+        change = 2
+    position = Module.ternary_half_rank(syndrome)
+    if position >= length:
+        return -1, 0
+    return position, change
+
+#=-=-=-=-=-=-=- Online Syndrome: Decision for the Trits so Far =-=-=-=-=-=-=-
+class SyndromeAccumulator(Module._SyndromeAccumulator):
+    """
+    P_all of a D3 codeword whose trits arrive one by one or get edited, kept current in O(d) per
+    trit, with the decision of locate_error() on the running P_all available at any time.
+
+    Parameters:
+        length (int): Codeword length; trits not received yet count as 0.
+
+    Example:
+        >>> acc = SyndromeAccumulator(6)
+        >>> acc.extend("120102")
+        >>> acc.P_all, acc.decision()
+        ('202', (1, 5, 2))
+        >>> acc.set(5, 0)
+        >>> acc.decision()
+        (0, -1, 0)
+
+    Note:
+        - Same decision as main_function() on the trits so far.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, length):
+        super().__init__("D3", length)
+
+    def decision(self):
+        """
+        The decoder's decision for the trits so far, without a rescan.
+
+        Returns:
+            tuple: (status, position, change): Module.STATUS_* code, 0-based position to correct
+            or -1, and the value to subtract there (mod 3).
+        """
+
+        value = self.syndrome.to_int()
+        if value == 0:
+            return Module.STATUS_CLEAN, -1, 0
+        position, change = locate_error(value, self.length)
+        return (Module.STATUS_CORRECTED if position >= 0 else Module.STATUS_UNCORRECTABLE), position, change
+
+#=-=-=-=-=-=-=- Syndrome Table: P_all -> (Position, Change) =-=-=-=-=-=-=-
+@lru_cache(maxsize=Module.LAYOUT_CACHE_SIZE)
+def syndrome_table(dimension, length):
+    """
+    locate_error() for every possible P_all at once, as dense arrays for decode_batch().
+
+    Parameters:
+        dimension (int): Dimension of the code.
+        length (int): Codeword length.
+
+    Returns:
+        tuple: (positions, changes), two dense arrays of size 3^dimension indexed by the
+               integer value of P_all:
+            - positions[s]: 0-based position of the wrong trit, -1 if none can be located
+            - changes[s]: 1 or 2 added to that trit by the error (0 when no position)
+            - s == 0 is the perfect code; any other s with positions[s] == -1 is uncorrectable
+
+    Example:
+        >>> positions, changes = syndrome_table(3, 7)
+        >>> positions[int('102', 3)], changes[int('102', 3)]
+        (6, 1)
+    """
+
+    layout = Module.get_code_layout("D3", dimension, length)
+    size = 3 ** dimension
+    positions = array('i', [-1]) * size
+    changes = array('b', [0]) * size
+    for position, index in enumerate(layout.indices):
+        value = int(index, 3)
+        positions[value], changes[value] = position, 1
+        # P_all = 2*index when the trit got +2; its leading digit is 2, so it never collides with an index
+        doubled = Module.int_xor_multiply(2, value)
+        positions[doubled], changes[doubled] = position, 2
+    return positions, changes
+
+#=-=-=-=-=-=-=- Digit Matrix of the Indices (Parity Check) =-=-=-=-=-=-=-
+@lru_cache(maxsize=Module.LAYOUT_CACHE_SIZE)
+def parity_check_matrix(dimension, length):
+    """
+    Digits of every codeword index, so that P_all digits = codeword @ H (mod 3).
+
+    Returns:
+        numpy.ndarray: Read-only uint8 array of shape (length, dimension).
+    """
+
+    H = Module.index_digit_matrix(Module.get_code_layout("D3", dimension, length).indices, dimension).copy()
+    H.setflags(write=False)
+    return H
+
+#=-=-=-=-=-=-=- Batched Decoder =-=-=-=-=-=-=-
+def decode_batch(codewords):
+    """
+    Decode many D3 codewords of the same length: one matrix product for all P_all,
+    then one syndrome table lookup per codeword.
+
+    Parameters:
+        codewords (array-like): 2-D uint8 array of shape (count, length), trits 0/1/2.
+
+    Returns:
+        tuple:
+            - corrected (numpy.ndarray): uint8 (count, length), codewords after correction
+            - messages (numpy.ndarray): uint8 (count, message length), recovered messages
+              (meaningless where status is Module.STATUS_UNCORRECTABLE)
+            - status (numpy.ndarray): uint8 (count,), Module.STATUS_CLEAN / STATUS_CORRECTED / STATUS_UNCORRECTABLE
+            - error_positions (numpy.ndarray): int32 (count,), 0-based corrected position or -1
+
+    Raises:
+        ValueError: If the codewords are not a non-empty 2-D trit array, or their length does not
+            hold all redundant indices (no codeword of that length exists).
+    """
+
+    import numpy as np
+    codewords = Module.as_trit_matrix(codewords)
+    length = codewords.shape[1]
+    if length == 0:
+        raise ValueError("codewords should hold at least one trit")
+    dimension = decide_dimension(length)
+    layout = Module.get_code_layout("D3", dimension, length)
+    if not layout.complete:
+        raise ValueError(f"D3 codeword length {length} does not hold all redundant indices")
+
+    #=-=-=-=-=-=-=- All P_all at Once =-=-=-=-=-=-=-
+    syndromes = Module.digits_to_syndrome(Module.gf3_matmul(codewords, parity_check_matrix(dimension, length)))
+
+    #=-=-=-=-=-=-=- Table Lookup =-=-=-=-=-=-=-
+    positions, changes = syndrome_table(dimension, length)
+    error_positions = np.frombuffer(positions, dtype=np.int32)[syndromes]
+    error_changes = np.frombuffer(changes, dtype=np.int8)[syndromes]
+    status = np.full(len(codewords), Module.STATUS_UNCORRECTABLE, dtype=np.uint8)
+    status[syndromes == 0] = Module.STATUS_CLEAN
+    status[error_positions >= 0] = Module.STATUS_CORRECTED
+
+    #=-=-=-=-=-=-=- Trace Back the Wrong Trits =-=-=-=-=-=-=-
+    corrected = codewords.copy()
+    rows = np.flatnonzero(error_positions >= 0)
+    columns = error_positions[rows]
+    corrected[rows, columns] = (corrected[rows, columns] + 3 - error_changes[rows]) % 3
+
+    messages = corrected[:, layout.message_positions]
+    return corrected, messages, status, error_positions
+
+#=-=-=-=-=-=-=- Packed In, Packed Out (5 Trits per Byte) =-=-=-=-=-=-=-
+def decode_packed(data, length):
+    """
+    decode_batch() over packed records: codewords of `length` trits in Module.packed_size(length)
+    bytes each (Module.pack_rows() format), read in place.
+
+    Returns:
+        tuple:
+            - corrected (memoryview): Corrected codewords, packed the same way
+            - messages (memoryview): Recovered messages, packed records of their own length
+            - status (numpy.ndarray): As in decode_batch()
+            - error_positions (numpy.ndarray): As in decode_batch()
+    """
+
+    corrected, messages, status, error_positions = decode_batch(Module.unpack_rows(data, length))
+    return (memoryview(Module.pack_rows(corrected).reshape(-1)),
+            memoryview(Module.pack_rows(messages).reshape(-1)), status, error_positions)
+
+#=-=-=-=-=-=-=- Decode into a Result Object =-=-=-=-=-=-=-
+class D3DecodeResult(Module.DecodeResult):
+    """
+    Module.DecodeResult of a D3 codeword, with the report of main_function() computed on access.
+    """
+
+    __slots__ = ()
+
+    @property
+    def location(self):
+        """Index of the wrong trit, "3"*d when clean, "4"*d when uncorrectable."""
+        dimension = self.layout.dimension
+        if self.status == Module.STATUS_CLEAN:
+            return "3" * dimension
+        if self.status == Module.STATUS_UNCORRECTABLE:
+            return "4" * dimension
+        return self.layout.indices[self.position]
+
+    @property
+    def announcement(self):
+        if self.status == Module.STATUS_UNCORRECTABLE:
+            return "There are two or more mistakes"
+        if self.status == Module.STATUS_CLEAN:
+            return "Congratulation! It is a perfect code"
+        return f"The error is located at the {ordinal(self.position + 1)} position, with a change of +{self.change} from original value."
+
+    def as_tuple(self):
+        """The 5-tuple of main_function()."""
+        message = "N/A" if self.status == Module.STATUS_UNCORRECTABLE else self.message
+        return self.P_all, self.location, self.corrected, self.announcement, message
+
+def decode(error_code):
+    """
+    Detect and correct one error in a D3 codeword, with nothing formatted up front.
+
+    Parameters:
+        error_code (str): Ternary codeword, possibly with errors.
+
+    Returns:
+        D3DecodeResult: status, position, change and corrected codeword; message, P_all,
+        location and announcement are computed when read.
+
+    Raises:
+        ValueError: If the codeword is empty.
+
+    Example:
+        >>> result = decode("120102")
+        >>> result.status, result.position, result.corrected, result.message
+        (1, 5, '120100', '010')
+
+    Note:
+        - Stages are traced under scope "D3_EC" (Module.stage_timer)
+    """
+
+    #=-=-=-=-=-=-=- Get Dimension =-=-=-=-=-=-=-
+    trace = Module.stage_timer("D3_EC")
+    trace.stage("dimension")
+    length = len(error_code)
+    if length == 0:
+        raise ValueError("D3 codewords should hold at least one trit")
+    dimension = decide_dimension(length)
+
+    #=-=-=-=-=-=-=- Pick One Index from Each Pair (Cached Layout) =-=-=-=-=-=-=-
+    trace.stage("index")
+    layout = Module.get_code_layout("D3", dimension, length)
+
+    #=-=-=-=-=-=-=- Calculate P_all (Bit-Sliced) =-=-=-=-=-=-=-
+    trace.stage("syndrome")
+    packed_feature = Module.packed_ternary_xor_sum(zip(layout.packed_indices, map(int, error_code)), dimension)
+    if Module.TRACE_SUBSCRIBERS:
+        trace.note(P_all=packed_feature.to_ternary())
+
+    #=-=-=-=-=-=-=- Get Error Location and Change (Rank in the Half Set) =-=-=-=-=-=-=-
+    trace.stage("correction")
+    syndrome = packed_feature.to_int()
+    if syndrome == 0:
+        status, position, change = Module.STATUS_CLEAN, -1, 0
+    else:
+        position, change = locate_error(syndrome, length)
+        status = Module.STATUS_CORRECTED if position >= 0 else Module.STATUS_UNCORRECTABLE
+    if Module.TRACE_SUBSCRIBERS:
+        trace.note(position=position)
+
+    #=-=-=-=-=-=-=- If Exact One Error Exist, Trace Back Its Value =-=-=-=-=-=-=-
+    trace.stage("message")
+    corrected = error_code
+    if position >= 0:
+        corrected = error_code[:position] + str((int(error_code[position]) - change) % 3) + error_code[position+1:]
+    trace.done()
+    return D3DecodeResult(layout, error_code, corrected, status, position, change, packed_feature)
 
 #=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-Error Correction Part=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 def main_function(error_code):
@@ -149,52 +441,10 @@ def main_function(error_code):
             "3"*dimension: No errors detected
             "4"*dimension: Multiple errors found
         - Requires helper functions from Module:
-            generate_ternary_set_half(), ternary_xor_sum()
+            get_code_layout(), packed_ternary_xor_sum()
+        - The error location comes from locate_error()
         - Uses ordinal() for position formatting
+        - The tuple of decode(); bulk callers should use decode() and read only what they need.
     """
 
-    #=-=-=-=-=-=-=- Get Dimension =-=-=-=-=-=-=-
-    length = len(error_code)
-    dimension = math.ceil(math.log(2*length+1) / math.log(3))
-
-    #=-=-=-=-=-=-=- Pick One Index from Each Pair =-=-=-=-=-=-=-
-    ternary_set_half = Module.generate_ternary_set_half(dimension)
-    ternary_set_half = ternary_set_half[:len(error_code)]
-
-    #=-=-=-=-=-=-=- Bind Value with Index =-=-=-=-=-=-=-
-    values = [int(digit) for digit in error_code]
-    ternary_set_mapping = {}
-    for idx, digit in zip(ternary_set_half, values):
-        ternary_set_mapping[idx] = digit
-
-    order_mapping = {}
-    for idx, order in zip(ternary_set_half, range(length)):
-        order_mapping[idx] = order+1
-
-    #=-=-=-=-=-=-=- Calculate P_all =-=-=-=-=-=-=-
-    feature_value = Module.ternary_xor_sum(ternary_set_mapping)
-
-    #=-=-=-=-=-=-=- Get Error Location and Change =-=-=-=-=-=-=-
-    error_location, change = check_error_half(ternary_set_half, feature_value,dimension)
-
-    #=-=-=-=-=-=-=- If Exact One Error Exist, Trace Back Its Value =-=-=-=-=-=-=-
-    if(error_location!="3"*dimension and error_location!="4"*dimension):
-        ternary_set_mapping[error_location] = (ternary_set_mapping[error_location] - change)%3
-
-    #=-=-=-=-=-=-=- Composed String for Correct Code =-=-=-=-=-=-=-
-    after_correct_code = ''.join(str(v) for v in ternary_set_mapping.values())
-
-
-    announcement = ""
-    if(error_location=="4"*dimension):
-        announcement = "There are two or more mistakes"
-
-        return feature_value, error_location, after_correct_code, announcement, "N/A"
-    else:
-        if(error_location=="3"*dimension):
-            announcement = "Congratulation! It is a perfect code"
-        if(error_location!="3"*dimension):
-            announcement = f"The error is located at the {ordinal(order_mapping[error_location])} position, with a change of +{change} from original value."
-        orignal_message = pick_message(after_correct_code, dimension, order_mapping)
-        
-        return feature_value, error_location, after_correct_code, announcement, orignal_message
+    return decode(error_code).as_tuple()
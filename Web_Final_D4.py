@@ -1,8 +1,28 @@
 
 import Module
-import math
+from functools import lru_cache
 
 
+#=-=-=-=-=-=-=- Compiled Solver for Redundant Trits =-=-=-=-=-=-=-
+@lru_cache(maxsize=Module.LAYOUT_CACHE_SIZE)
+def redundant_solver(redundant_list):
+    """ Compile the redundant indices into the GF(3) inverse of their digit matrix.
+    Args:
+        redundant_list (tuple): Indices of all redundant trits (d indices of d digits)
+
+    Returns:
+        tuple: d x d inverse matrix, row j = redundant values giving a target with a single 1 at digit j.
+
+    Raises:
+        ValueError: If the redundant indices are not linearly independent.
+
+    Example:
+        >>> redundant_solver(("011", "111", "110"))
+        ((2, 1, 0), (1, 2, 1), (0, 1, 2))
+    """
+    digit_matrix = [[int(digit) for digit in index] for index in redundant_list]
+    return tuple(tuple(row) for row in Module.gf3_inverse(digit_matrix))
+
 def set_redundant(target_value, redundant_list):
     """ Given indices of redundant_list, set values for them that their Xor sum equals to the given target_value.
     Args:
@@ -13,53 +33,248 @@ def set_redundant(target_value, redundant_list):
         dict: Redundant trits with their values that P_all = 0.
         
     Example:
-        >>> set_redundant("120", ["011", "010", "110"])
-        {'011': 0, '010': 1, '110': 1}
+        >>> set_redundant("120", ["011", "111", "110"])
+        {'011': 1, '111': 2, '110': 2}
 
-    Special Cases:
-        - 3D case: Uses specific linear combinations of first 3 digits
-        - Even dimensions <7: Implements symmetric difference equations
-        - General case: Follows center-out pattern calculations
-        
     Note:
         - All values computed modulo 3
-        - Calculation rules vary by dimension parity and size
-    """
-    dimension = len(redundant_list)
-    value = "0"*dimension
-    Redundant_Mapping = {key: int(value) for key, value in zip(redundant_list, value)}
-
-    if(dimension==3):
-        Redundant_Mapping = {key: int(value) for key, value in zip(redundant_list, value)}
-        Redundant_Mapping[redundant_list[0]] = (2*int(target_value[0])+ int(target_value[1]))%3
-        Redundant_Mapping[redundant_list[1]] = (int(target_value[0])+ 2*int(target_value[1])+ int(target_value[2]))%3
-        Redundant_Mapping[redundant_list[2]] = (int(target_value[1])+ 2*int(target_value[2]))%3
-        return Redundant_Mapping
-    
-    if(dimension<7 and dimension%2==0):
-        Redundant_Mapping[redundant_list[0]]+=int(target_value[dimension//2])
-        for i in range(0,(dimension-1)//2):
-            Redundant_Mapping[redundant_list[2*i+1]]+=(int(target_value[dimension-1-i])-int(target_value[dimension//2]))
-            Redundant_Mapping[redundant_list[2*i+2]]-=(int(target_value[dimension-1-i])-int(target_value[dimension//2]))
-
-        for j in range(0, dimension//2):
-            Redundant_Mapping[redundant_list[2*j]]-=int(target_value[dimension//2-1-j])
-            Redundant_Mapping[redundant_list[2*j+1]]+=int(target_value[dimension//2-1-j])
+        - Solves redundant_values @ digits(redundant_list) = target_value with the inverse
+          compiled once per redundant list by redundant_solver()
+    """
+    inverse = redundant_solver(tuple(redundant_list))
+    target = [int(digit) for digit in target_value]
+    return {
+        index: sum(digit * row[k] for digit, row in zip(target, inverse)) % 3
+        for k, index in enumerate(redundant_list)
+    }
+
+#=-=-=-=-=-=-=- Smallest Dimension Holding the Message =-=-=-=-=-=-=-
+def decide_dimension(length):
+    """
+    Smallest D4 dimension d (starting at 3) whose code carries `length` message trits,
+    i.e. length <= 2*fr(d) - d.
+
+    Example:
+        >>> decide_dimension(6)
+        4
+    """
+
+    return Module.dimension_for_message("D4", length)
+
+#=-=-=-=-=-=-=- Generator Matrix over GF(3), with O and E =-=-=-=-=-=-=-
+@lru_cache(maxsize=Module.LAYOUT_CACHE_SIZE)
+def generator_matrix(dimension, length):
+    """
+    Build the D4 generator matrix G so that codeword = message @ G (mod 3), O and E included.
+
+    Columns follow the codeword: regular positions, then O, then E.
+        - message positions: identity
+        - redundant positions: 2*digits(message index) @ redundant_solver(R)
+        - E: minus the sum of the I_2 positions
+        - O: minus the sum of all regular positions and E
+
+    Parameters:
+        dimension (int): Dimension of the code.
+        length (int): Message length.
+
+    Returns:
+        numpy.ndarray: Read-only uint8 array of shape (length, length + dimension + 2).
+
+    Raises:
+        ValueError: If the message length is not supported at this dimension.
+    """
+
+    import numpy as np
+    layout = Module.get_code_layout("D4", dimension, length + dimension + 2)
+    if not layout.complete:
+        raise ValueError(f"Message length {length} is not supported at dimension {dimension}")
+
+    G = np.zeros((length, layout.length), dtype=np.uint8)
+    G[np.arange(length), layout.message_positions] = 1
+
+    digits = Module.index_digit_matrix(layout.message_indices, dimension)
+    G[:, layout.redundant_positions] = Module.gf3_matmul((2 * digits) % 3, redundant_solver(layout.redundant))
+
+    regular = G[:, :-2].astype(np.int64)
+    I_2_positions = [layout.position[index] for index in layout.I_2]
+    E = (-regular[:, I_2_positions].sum(axis=1)) % 3
+    G[:, -1] = E
+    G[:, -2] = (-(regular.sum(axis=1) + E)) % 3
+
+    G.setflags(write=False)
+    return G
+
+#=-=-=-=-=-=-=- Batched Encoder =-=-=-=-=-=-=-
+def encode_batch(messages):
+    """
+    Encode many messages of the same length into D4 codewords with one GF(3) matrix product.
+
+    Parameters:
+        messages (array-like): 2-D uint8 array of shape (count, length), trits 0/1/2.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (count, length + dimension + 2), row i being
+        the codeword main_function() gives for message i (O and E as the last two trits).
+
+    Raises:
+        ValueError: If the messages are not a non-empty 2-D trit array, or the length is not supported.
+
+    Example:
+        >>> encode_batch(np.array([[1, 2, 0, 1, 0, 2]], dtype=np.uint8))
+        array([[2, 1, 1, 1, 2, 0, 1, 0, 2, 1, 1, 0]], dtype=uint8)
+    """
+
+    messages = Module.as_trit_matrix(messages)
+    length = messages.shape[1]
+    if length == 0:
+        raise ValueError("messages should hold at least one trit")
+
+    G = generator_matrix(decide_dimension(length), length)
+    return Module.gf3_matmul(messages, G)
+
+#=-=-=-=-=-=-=- Packed In, Packed Out (5 Trits per Byte) =-=-=-=-=-=-=-
+def encode_packed(data, length):
+    """
+    encode_batch() over packed records: messages of `length` trits in Module.packed_size(length)
+    bytes each (Module.pack_rows() format), read in place.
+
+    Returns:
+        memoryview: The codewords as packed records, Module.packed_size(codeword length) bytes each.
+
+    Example:
+        >>> bytes(encode_packed(Module.pack_trits("102101"), 6))
+        b'\xc9\xc2Q'
+    """
+
+    codewords = encode_batch(Module.unpack_rows(data, length))
+    return memoryview(Module.pack_rows(codewords).reshape(-1))
+
+#=-=-=-=-=-=-=- Incremental Update When One Message Trit Changes =-=-=-=-=-=-=-
+def generator_row(dimension, length, message_pos):
+    """
+    Sparse row of the generator matrix: the codeword trits that move with message trit `message_pos`.
+
+    Same row as generator_matrix(), without building it: the redundant trits take
+    2*digits(I) @ redundant_solver(R), then E and O follow the I_2 and regular sums.
+
+    Parameters:
+        dimension (int): Dimension of the code.
+        length (int): Codeword length, O and E included.
+        message_pos (int): 0-based position of the trit in the message.
+
+    Returns:
+        tuple: ((position, coefficient), ...), the message trit first, then the redundant trits,
+        O and E where the coefficient is not 0: at most dimension + 3 pairs.
+
+    Raises:
+        ValueError: If the dimension does not match the length, the length is not a valid codeword
+            length, or message_pos is out of range.
+
+    Example:
+        >>> generator_row(4, 12, 0)
+        ((1, 1), (0, 1), (3, 1), (2, 1), (10, 2))
+    """
+
+    layout, position = Module.message_trit_position("D4", dimension, length, message_pos)
+    index = layout.indices[position]
+    inverse = redundant_solver(layout.redundant)
+    doubled = [(j, (2 * int(digit)) % 3) for j, digit in enumerate(index) if digit != '0']
+
+    regular = [(position, 1)]
+    for k, redundant_position in enumerate(layout.redundant_positions):
+        coefficient = sum(digit * inverse[j][k] for j, digit in doubled) % 3
+        if coefficient:
+            regular.append((redundant_position, coefficient))
+
+    E = -sum(coefficient for pos, coefficient in regular if layout.parity_group(pos) == 2) % 3
+    O = -(sum(coefficient for _, coefficient in regular) + E) % 3
+    return tuple(regular) + tuple((pos, coefficient) for pos, coefficient in ((length-2, O), (length-1, E)) if coefficient)
+
+def update_codeword(codeword, message_pos, new_value):
+    """
+    Set one message trit of a stored D4 codeword and fix its redundant trits, O and E, in O(d).
+
+    Parameters:
+        codeword: str of '0'/'1'/'2', or a mutable sequence of trit values 0/1/2 (bytearray, list,
+            numpy array), which is patched in place.
+        message_pos (int): 0-based position of the trit in the message.
+        new_value (int): New trit value, 0/1/2.
+
+    Returns:
+        The patched codeword (a new str for a str), equal to main_function() of the edited message.
+
+    Raises:
+        ValueError: If new_value is not a trit, the codeword length is not valid or message_pos is out of range.
+
+    Example:
+        >>> update_codeword("211120102110", 0, 0)    # main_function("020102")[0]
+        '100020102120'
+    """
+
+    if new_value not in (0, 1, 2):
+        raise ValueError(f"new_value should be 0, 1 or 2, got {new_value!r}")
+    length = len(codeword)
+    row = generator_row(Module.dimension_for_codeword("D4", length), length, message_pos)
+    return Module.patch_trits(codeword, row, (new_value - int(codeword[row[0][0]])) % 3)
+
+#=-=-=-=-=-=-=- Encode into a Result Object =-=-=-=-=-=-=-
+def encode(input_ternary):
+    """
+    Encode a ternary message into a D4 codeword, O and E included.
+
+    Parameters:
+        input_ternary (str): Input ternary message
+
+    Returns:
+        Module.EncodeResult: codeword, with length and rate as properties.
+
+    Example:
+        >>> encode("120102").codeword
+        '211120102110'
+    """
         
-        Redundant_Mapping = {key: value % 3 for key, value in Redundant_Mapping.items()}
-    else:
-        Redundant_Mapping[redundant_list[0]]+=int(target_value[math.ceil(dimension/2)-1])
+    #=-=-=-=-=-=-=- Determine the Dimension =-=-=-=-=-=-=-
+    trace = Module.stage_timer("D4")
+    trace.stage("dimension")
+    length = len(input_ternary)
+    dimension = decide_dimension(length)
+
+    #=-=-=-=-=-=-=- Generate I_1&I_2, Redundant Index (Cached Layout) =-=-=-=-=-=-=-
+    trace.stage("index")
+    layout = Module.get_code_layout("D4", dimension, length + dimension + 2)
+    I_2 = layout.I_2
+    S = layout.redundant # Which is the redundant Cell for now.
+    if not layout.complete:
+        raise ValueError(f"Message length {length} is not supported at dimension {dimension}")
+
+    #=-=-=-=-=-=-=- Mapping Value with Index (Rest be Message Index) =-=-=-=-=-=-=-
+    ternary_mapping = {key: int(value) for key, value in zip(layout.message_indices, input_ternary)}
 
-        for i in range(0,(dimension)//2):
-            Redundant_Mapping[redundant_list[2*i]]+=(int(target_value[dimension-1-i])-int(target_value[math.ceil(dimension/2)-1]))
-            Redundant_Mapping[redundant_list[2*i+1]]-=(int(target_value[dimension-1-i])-int(target_value[math.ceil(dimension/2)-1]))
+    #=-=-=-=-=-=-=- Calculate P_all =-=-=-=-=-=-=-
+    trace.stage("syndrome")
+    raw_xor_sum = Module.ternary_xor_sum(ternary_mapping)
 
-        for j in range(0, (dimension-1)//2):
-            Redundant_Mapping[redundant_list[2*j+1]]-=int(target_value[math.ceil(dimension/2)-1-(j+1)])
-            Redundant_Mapping[redundant_list[2*j+2]]+=int(target_value[math.ceil(dimension/2)-1-(j+1)])
-        Redundant_Mapping = {key: value % 3 for key, value in Redundant_Mapping.items()}
+    #=-=-=-=-=-=-=- Set P_all = 0 =-=-=-=-=-=-=-
+    redundant_xor_target = Module.xor_multiply(2,raw_xor_sum)
+    redundant_mapping = set_redundant(redundant_xor_target,S)
+    total_mapping = redundant_mapping | ternary_mapping
 
-    return Redundant_Mapping
+    #=-=-=-=-=-=-=- Set P_1, P_2 = 0 =-=-=-=-=-=-=-
+    even_sum = 0
+    for index in I_2:
+        even_sum+=total_mapping[index]
+    E = (3-even_sum)%3
+    total_mapping["E"] = E
+    O = (3-sum(total_mapping.values()))%3
+    total_mapping["O"] = O
+
+    #=-=-=-=-=-=-=- Final Result =-=-=-=-=-=-=-
+    trace.stage("codeword")
+    final_code = ''.join(str(total_mapping[index]) for index in layout.indices)
+    final_code +=str(O)
+    final_code +=str(E)
+    trace.done()
+    return Module.EncodeResult(final_code, length)
 
 #=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-Main_Area=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 def main_function(input_ternary):
@@ -96,67 +311,10 @@ def main_function(input_ternary):
         - Optimized redundancy placement via d4_build_redundant_list
         
     Note:
+        - The tuple of encode(); call encode() for an EncodeResult.
         - Requires helper functions from Module.py:
-            var_d4_generate_I_odd_or_even(), d4_build_redundant_list(), 
-            sort_ternary(), ternary_xor_sum()
+            get_code_layout(), ternary_xor_sum()
+        - Stages are traced under scope "D4" (Module.stage_timer)
     """
-        
-    #=-=-=-=-=-=-=- Determine the Dimension =-=-=-=-=-=-=-
-    length = len(input_ternary)
-    dimension = 3 # Here we start with 3 need to announce it
-
-    max_length_curr_dimension = 2*Module.fr(dimension)-dimension
-    while length > max_length_curr_dimension:
-        dimension+=1
-        max_length_curr_dimension = 2*Module.fr(dimension)-dimension
-
-    #=-=-=-=-=-=-=- Generate I_1&I_2 =-=-=-=-=-=-=-
-    I_1 = Module.var_d4_generate_I_odd_or_even(dimension,1)
-    I_2 = Module.var_d4_generate_I_odd_or_even(dimension,2)
-    second_cut_amount = length-(Module.fr(dimension)-dimension) # amount left after 1st set
-
-
-    I_2 = I_2[:second_cut_amount] # Still need to double check this length
-
-
-    #=-=-=-=-=-=-=- Pick Redundant Index from I_1=-=-=-=-=-=-=-
-    S = Module.d4_build_redundant_list(dimension) # Which is the redundant Cell for now.
-
-    #=-=-=-=-=-=-=- Let Rest be Message Index =-=-=-=-=-=-=-
-    Message_digits = [x for x in I_1 if x not in S] + I_2
-    Message_digits_sorted_ternary = Module.sort_ternary(Message_digits)
-
-
-    #=-=-=-=-=-=-=- Mapping Value with Index =-=-=-=-=-=-=-
-    ternary_mapping = {key: int(value) for key, value in zip(Message_digits_sorted_ternary, input_ternary)}
-
-    #=-=-=-=-=-=-=- Calculate P_all =-=-=-=-=-=-=-
-    raw_xor_sum = Module.ternary_xor_sum(ternary_mapping)
-
-    #=-=-=-=-=-=-=- Set P_all = 0 =-=-=-=-=-=-=-
-    redundant_xor_target = Module.xor_multiply(2,raw_xor_sum)
-    redundant_mapping = set_redundant(redundant_xor_target,S)
-    total_mapping = redundant_mapping | ternary_mapping
-
-    #=-=-=-=-=-=-=- Set P_1, P_2 = 0 =-=-=-=-=-=-=-
-    even_sum = 0
-    for index in I_2:
-        even_sum+=total_mapping[index]
-    E = (3-even_sum)%3
-    total_mapping["E"] = E
-    O = (3-sum(total_mapping.values()))%3
-    total_mapping["O"] = O
-
-    #=-=-=-=-=-=-=- Print Final Result =-=-=-=-=-=-=-
-    all_regular_digits = I_1 + I_2
-    all_regular_digits_sorted_ternary = Module.sort_ternary(all_regular_digits)
-
-    final_code = ""
-    for index in all_regular_digits_sorted_ternary:
-        final_code += str(total_mapping[index])
-    final_code +=str(O)
-    final_code +=str(E)
-    code_length = len(final_code)
-    efficiency = length/code_length
 
-    return final_code, code_length, efficiency
+    return encode(input_ternary).as_tuple()
@@ -1,30 +1,31 @@
 
 import Module
+from functools import lru_cache
 
 #=-=-=-=-=-=-=- Pick Message from Correct Code =-=-=-=-=-=-=-
-def pick_message(correct_error_correction,redundant_set, order_mapping):
+def pick_message(correct_error_correction, redundant_set, order_mapping=None):
     """
     Extract the original ternary message from a D4-encoded codeword by removing redundant trits.
 
     Parameters:
         correct_error_correction (str): Corrected perfect D4 code
-        redundant_set (list of str): Indices of redundant trits
-        order_mapping (dict): A mapping from each ternary index to its position (1-based index).
+        redundant_set (list of str): Indices of redundant trits (one per dimension)
+        order_mapping (dict, optional): Index -> 1-based position; kept for old callers, the
+            positions come from the shared layout (Module.get_code_layout()).
 
     Returns:
         str: The original message extracted from the codeword.
 
+    Raises:
+        ValueError: If the codeword length does not hold all redundant indices.
+
     Example:
-        >>> pick_message("02110200", 4, {'000':1, '001':2, '010':3, ...})
-        '21102'
-        (Just to display the format)
+        >>> pick_message("201022110", Module.d4_build_redundant_list(3))
+        '0121'
     """
-    regular_text = correct_error_correction[:-2]
-    redundant_trits_loc = {order_mapping[redundant_trit] - 1 for redundant_trit in redundant_set}
-    original_message = ''.join(
-        char for idx, char in enumerate(regular_text) if idx not in redundant_trits_loc
-    )
-    return original_message
+
+    layout = Module.get_code_layout("D4", len(redundant_set), len(correct_error_correction))
+    return layout.pick_message(correct_error_correction)
 
 #=-=-=-=-=-=-=- 1st, 2nd, 3rd, 4th, ... =-=-=-=-=-=-=-
 def ordinal(n):
@@ -58,15 +59,20 @@ def ordinal(n):
 
 
 #=-=-=-=-=-=-=- Error Correction, According to P_all, P_1, P_2 =-=-=-=-=-=-=-
+def _trace_case(outcome):
+    # Which case of error_correction() decided, as a "correction" event for the trace subscribers
+    if Module.TRACE_SUBSCRIBERS:
+        Module.trace_event("D4_EC", "correction", outcome=outcome)
+
 def error_correction(dimension, error_syndrome, odd_sum, even_sum, I_1, I_2):
     """Perform D4 error localization and validation using parity checks.
     Args:
         dimension (int): Lenth of Index
-        error_syndrome (str): Calculated parity value (P_all)
+        error_syndrome (str or Module.TritWord): Calculated parity value (P_all)
         odd_sum (int): O parity check result, P_1
         even_sum (int): E parity check result, P_2
-        I_1 (list): Primary valid indices set
-        I_2 (list): Secondary valid indices set
+        I_1 (list or set): Primary valid indices set
+        I_2 (list or set): Secondary valid indices set
         
     Returns:
         str: Error location code with special conventions:
@@ -90,40 +96,44 @@ def error_correction(dimension, error_syndrome, odd_sum, even_sum, I_1, I_2):
         - Requires Module.xor_multiply for error validation
         - Special codes use base-3 digit conventions
         - I₁/I₂ define valid error positions
+        - With a packed (TritWord) syndrome and sets of TritWord, the single error location is a TritWord
+        - The deciding case is traced as a "correction" event (no more printing)
     """
         
-    all_regular_digits = I_1 + I_2
     error_loc = "3"*dimension
+    syndrome_is_zero = Module.ternary_is_zero(error_syndrome)
 
     # Case 0: Double mistakes on same region
-    if odd_sum == 0 and even_sum == 0 and error_syndrome != "0"* dimension:
-        print("There are 2 or more mistakes!!!")
+    if odd_sum == 0 and even_sum == 0 and not syndrome_is_zero:
+        _trace_case("There are 2 or more mistakes")
         return error_loc
     
     # Case 1: No mistakes
-    if error_syndrome == "0" * dimension and odd_sum == 0 and even_sum == 0:
-        print("There are no mistakes!")
+    if syndrome_is_zero and odd_sum == 0 and even_sum == 0:
+        _trace_case("There are no mistakes")
         return "4" * dimension
 
     # Case 1b: Unique mistake on O or E
-    if error_syndrome == "0" * dimension and odd_sum != 0 and even_sum == 0:
-        print("Error on O")
+    if syndrome_is_zero and odd_sum != 0 and even_sum == 0:
+        _trace_case("Error on O")
         return "O"
 
-    if error_syndrome == "0" * dimension and even_sum != 0 and odd_sum ==0:
-        print("Error on E")
+    if syndrome_is_zero and even_sum != 0 and odd_sum ==0:
+        _trace_case("Error on E")
         return "E"
 
     # Case 2: Two or more errors detected
     if odd_sum != 0 and even_sum != 0:
-        print("There are two or more errors.")
+        _trace_case("P_1 and P_2 both nonzero")
         return error_loc
 
     # Case 3: Either odd_sum or even_sum is non-zero
     if odd_sum != 0 or even_sum != 0:
-        if error_syndrome not in all_regular_digits and Module.xor_multiply(2,error_syndrome) not in all_regular_digits:
+        doubled_syndrome = Module.xor_multiply(2,error_syndrome)
+        if (error_syndrome not in I_1 and error_syndrome not in I_2
+                and doubled_syndrome not in I_1 and doubled_syndrome not in I_2):
         # So, Fix a mistake here when variable length that value no longer in all digits!!!!!!
-            print("There are two or more errors.")
+            _trace_case("P_all is no index")
             return error_loc
 
         error_count = 0
@@ -134,7 +144,7 @@ def error_correction(dimension, error_syndrome, odd_sum, even_sum, I_1, I_2):
             if error_count in I_1:
                 return error_count
             else:
-                print("There are two or more errors.")
+                _trace_case("Error not in I_1")
                 return error_loc
 
         # Sub-case: even_sum is non-zero
@@ -143,13 +153,352 @@ def error_correction(dimension, error_syndrome, odd_sum, even_sum, I_1, I_2):
             if error_count in I_2:
                 return error_count
             else:
-                print("There are two or more errors.")
+                _trace_case("Error not in I_2")
                 return error_loc
 
     return error_loc
 
 
 
+#=-=-=-=-=-=-=- Dimension from Codeword Length =-=-=-=-=-=-=-
+def decide_dimension(length):
+    """
+    Dimension of a D4 codeword of `length` trits (O and E included): smallest d >= 3
+    with length <= 2*fr(d) + 2.
+
+    Example:
+        >>> decide_dimension(12)
+        4
+    """
+
+    return Module.dimension_for_codeword("D4", length)
+
+#=-=-=-=-=-=-=- Online Syndrome: Decision for the Trits so Far =-=-=-=-=-=-=-
+class SyndromeAccumulator(Module._SyndromeAccumulator):
+    """
+    P_all, P_1 and P_2 of a D4 codeword whose trits arrive one by one or get edited, kept current
+    in O(d) per trit, with the decision of error_correction() available at any time.
+
+    Parameters:
+        length (int): Codeword length, O and E included; trits not received yet count as 0.
+
+    Note:
+        - Same decision as main_function() on the trits so far.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, length):
+        super().__init__("D4", length)
+
+    def decision(self):
+        """
+        The decoder's decision for the trits so far, without a rescan.
+
+        Returns:
+            tuple: (status, position, change): Module.STATUS_* code, 0-based position to correct
+            (length-2 for O, length-1 for E) or -1, and the value to subtract there (mod 3).
+        """
+
+        layout = self.layout
+        location = error_correction(self.dimension, self.syndrome, self.P_1, self.P_2, layout.packed_I_1, layout.packed_I_2)
+        if location == "O":
+            return Module.STATUS_CORRECTED, self.length - 2, self.P_1
+        if location == "E":
+            return Module.STATUS_CORRECTED, self.length - 1, self.P_2
+        if isinstance(location, Module.TritWord):
+            return Module.STATUS_CORRECTED, layout.packed_position[location], (self.P_1 + self.P_2) % 3
+        return (Module.STATUS_UNCORRECTABLE if location == "3" * self.dimension else Module.STATUS_CLEAN), -1, 0
+
+#=-=-=-=-=-=-=- Check Matrix: Codeword -> (P_all Digits, P_1, P_2) =-=-=-=-=-=-=-
+@lru_cache(maxsize=Module.LAYOUT_CACHE_SIZE)
+def check_matrix(dimension, length):
+    """
+    Matrix H such that codeword @ H (mod 3) = [digits of P_all..., P_1, P_2].
+
+    Rows follow the codeword (regular positions, O, E); the first `dimension` columns are the
+    index digits, column `dimension` marks I_1 and O, the last column marks I_2 and E.
+
+    Returns:
+        numpy.ndarray: Read-only uint8 array of shape (length, dimension + 2).
+    """
+
+    import numpy as np
+    layout = Module.get_code_layout("D4", dimension, length)
+    H = np.zeros((length, dimension + 2), dtype=np.uint8)
+    H[:length-2, :dimension] = Module.index_digit_matrix(layout.indices, dimension)
+    H[[layout.position[index] for index in layout.I_1] + [length-2], dimension] = 1
+    H[[layout.position[index] for index in layout.I_2] + [length-1], dimension+1] = 1
+    H.setflags(write=False)
+    return H
+
+#=-=-=-=-=-=-=- Decision Table: (P_all, P_1, P_2) -> Correction =-=-=-=-=-=-=-
+@lru_cache(maxsize=Module.LAYOUT_CACHE_SIZE)
+def decision_table(dimension, length):
+    """
+    Precompute the case analysis of error_correction() for every (P_all, P_1, P_2).
+
+    Parameters:
+        dimension (int): Dimension of the code.
+        length (int): Codeword length, O and E included.
+
+    Returns:
+        tuple: (positions, changes, status), read-only arrays of size 3^dimension * 9 indexed by
+               P_all * 9 + P_1 * 3 + P_2 (P_all as the integer value of its digits):
+            - positions: 0-based position to correct (length-2 for O, length-1 for E), -1 if none
+            - changes: value to subtract (mod 3) at that position
+            - status: Module.STATUS_CLEAN / STATUS_CORRECTED / STATUS_UNCORRECTABLE
+
+    Example:
+        >>> positions, changes, status = decision_table(3, 8)
+        >>> key = int('101', 3) * 9 + 1 * 3 + 0          # P_all = '101', P_1 = 1, P_2 = 0
+        >>> positions[key], changes[key], status[key]
+        (2, 1, 1)
+    """
+
+    import numpy as np
+    layout = Module.get_code_layout("D4", dimension, length)
+    size = 3 ** dimension
+
+    #=-=-=-=-=-=-=- Where Each Possible P_all Points To =-=-=-=-=-=-=-
+    syndromes = np.arange(size, dtype=np.int64)
+    all_digits = Module.index_digit_matrix([Module.int_to_ternary(value, dimension) for value in range(size)], dimension)
+    doubled = Module.digits_to_syndrome((2 * all_digits) % 3)      # 2*P_all digit-wise
+    index_position = np.full(size, -1, dtype=np.int32)
+    index_position[[int(index, 3) for index in layout.indices]] = np.arange(len(layout.indices), dtype=np.int32)
+    in_I_1 = np.zeros(size, dtype=bool)
+    in_I_1[[int(index, 3) for index in layout.I_1]] = True
+    in_I_2 = np.zeros(size, dtype=bool)
+    in_I_2[[int(index, 3) for index in layout.I_2]] = True
+    is_zero = syndromes == 0
+    located = (index_position >= 0) | (index_position[doubled] >= 0)
+
+    positions = np.full((size, 3, 3), -1, dtype=np.int32)
+    changes = np.zeros((size, 3, 3), dtype=np.uint8)
+    status = np.full((size, 3, 3), Module.STATUS_UNCORRECTABLE, dtype=np.uint8)
+
+    # Case 1: No mistakes
+    status[is_zero, 0, 0] = Module.STATUS_CLEAN
+
+    # Case 1b: Unique mistake on O or E
+    for parity in (1, 2):
+        status[is_zero, parity, 0] = status[is_zero, 0, parity] = Module.STATUS_CORRECTED
+        positions[is_zero, parity, 0], changes[is_zero, parity, 0] = length-2, parity
+        positions[is_zero, 0, parity], changes[is_zero, 0, parity] = length-1, parity
+
+    # Case 3: Exactly one of P_1, P_2 is non-zero, error located at P_all * P_x inside I_1 / I_2
+    for parity in (1, 2):
+        location = syndromes if parity == 1 else doubled        # k*a=b iff a=k*b
+        for member, key in ((in_I_1, (parity, 0)), (in_I_2, (0, parity))):
+            fixable = ~is_zero & located & member[location]
+            rows = np.flatnonzero(fixable)
+            positions[(rows,) + key] = index_position[location[rows]]
+            changes[(rows,) + key] = parity
+            status[(rows,) + key] = Module.STATUS_CORRECTED
+
+    # Case 0 / Case 2 (two or more mistakes) keep the default: uncorrectable
+    for table in (positions, changes, status):
+        table.shape = (size * 9,)
+        table.setflags(write=False)
+    return positions, changes, status
+
+#=-=-=-=-=-=-=- Batched Decoder =-=-=-=-=-=-=-
+def decode_batch(codewords):
+    """
+    Decode many D4 codewords of the same length: P_all, P_1 and P_2 of all rows come from
+    one matrix product, the case analysis from decision_table().
+
+    Parameters:
+        codewords (array-like): 2-D uint8 array of shape (count, length), O and E as the last two trits.
+
+    Returns:
+        tuple:
+            - corrected (numpy.ndarray): uint8 (count, length), codewords after correction
+            - messages (numpy.ndarray): uint8 (count, message length), recovered messages
+              (meaningless where status is Module.STATUS_UNCORRECTABLE)
+            - status (numpy.ndarray): uint8 (count,), Module.STATUS_CLEAN / STATUS_CORRECTED / STATUS_UNCORRECTABLE
+            - error_positions (numpy.ndarray): int32 (count,), 0-based corrected position
+              (length-2 for O, length-1 for E) or -1
+
+    Raises:
+        ValueError: If the codewords are not a 2-D trit array of at least 3 trits per row, or their
+            length does not hold all redundant indices (no codeword of that length exists).
+    """
+
+    import numpy as np
+    codewords = Module.as_trit_matrix(codewords)
+    length = codewords.shape[1]
+    if length < 3:
+        raise ValueError("D4 codewords should hold at least 3 trits")
+    dimension = decide_dimension(length)
+    layout = Module.get_code_layout("D4", dimension, length)
+    if not layout.complete:
+        raise ValueError(f"D4 codeword length {length} does not hold all redundant indices")
+
+    #=-=-=-=-=-=-=- P_all, P_1, P_2 at Once =-=-=-=-=-=-=-
+    checks = Module.gf3_matmul(codewords, check_matrix(dimension, length))
+    syndromes = Module.digits_to_syndrome(checks[:, :dimension])
+    keys = syndromes * 9 + checks[:, dimension].astype(np.int64) * 3 + checks[:, dimension+1]
+
+    #=-=-=-=-=-=-=- Decision Table =-=-=-=-=-=-=-
+    positions, changes, status = decision_table(dimension, length)
+    error_positions = positions[keys]
+    error_changes = changes[keys]
+    status = status[keys]
+
+    #=-=-=-=-=-=-=- Trace Back the Wrong Trits =-=-=-=-=-=-=-
+    corrected = codewords.copy()
+    rows = np.flatnonzero(error_positions >= 0)
+    columns = error_positions[rows]
+    corrected[rows, columns] = (corrected[rows, columns] + 3 - error_changes[rows]) % 3
+
+    messages = corrected[:, layout.message_positions]
+    return corrected, messages, status, error_positions
+
+#=-=-=-=-=-=-=- Packed In, Packed Out (5 Trits per Byte) =-=-=-=-=-=-=-
+def decode_packed(data, length):
+    """
+    decode_batch() over packed records: codewords of `length` trits in Module.packed_size(length)
+    bytes each (Module.pack_rows() format), read in place.
+
+    Returns:
+        tuple:
+            - corrected (memoryview): Corrected codewords, packed the same way
+            - messages (memoryview): Recovered messages, packed records of their own length
+            - status (numpy.ndarray): As in decode_batch()
+            - error_positions (numpy.ndarray): As in decode_batch()
+    """
+
+    corrected, messages, status, error_positions = decode_batch(Module.unpack_rows(data, length))
+    return (memoryview(Module.pack_rows(corrected).reshape(-1)),
+            memoryview(Module.pack_rows(messages).reshape(-1)), status, error_positions)
+
+#=-=-=-=-=-=-=- Decode into a Result Object =-=-=-=-=-=-=-
+class D4DecodeResult(Module.DecodeResult):
+    """
+    Module.DecodeResult of a D4 codeword, with the report of main_function() computed on access.
+    """
+
+    __slots__ = ()
+
+    @property
+    def location(self):
+        """Index of the wrong trit, "O" / "E", "4"*d when clean, "3"*d when uncorrectable."""
+        dimension = self.layout.dimension
+        if self.status == Module.STATUS_CLEAN:
+            return "4" * dimension
+        if self.status == Module.STATUS_UNCORRECTABLE:
+            return "3" * dimension
+        if self.position == self.layout.length - 2:
+            return "O"
+        if self.position == self.layout.length - 1:
+            return "E"
+        return self.layout.indices[self.position]
+
+    @property
+    def P_all_case(self):
+        """0: P_all is zero, 1: P_all (or 2*P_all) is an index, 2: otherwise."""
+        if not self.syndrome:
+            return 0
+        packed_position = self.layout.packed_position
+        return 1 if self.syndrome in packed_position or self.syndrome.double() in packed_position else 2
+
+    @property
+    def indices(self):
+        """Sorted regular digits I of the codeword, as a list."""
+        return list(self.layout.indices)
+
+    @property
+    def announcement(self):
+        if self.status == Module.STATUS_UNCORRECTABLE:
+            return "Sorry, notice that there are two or more mistakes."
+        if self.status == Module.STATUS_CLEAN:
+            return "Congratulation! It is a perfect code with 0 error."
+        location = self.location
+        if location in ("O", "E"):
+            change = int(self.received[self.position]) - int(self.corrected[self.position])
+            return f"The error is located at the {location} position, with a change of +{change}  from original value.(O as second last digit, E as last digit)"
+        return f"The error is located at the {ordinal(self.position + 1)} position, with a change of +{self.P_1 + self.P_2}  from original value."
+
+    def as_tuple(self):
+        """The 9-tuple of main_function()."""
+        message = "-1" if self.status == Module.STATUS_UNCORRECTABLE else self.message
+        return (self.corrected, message, self.location, self.announcement, self.P_all, self.P_1, self.P_2,
+                self.P_all_case, self.indices)
+
+def decode(input_ternary):
+    """
+    Detect and correct one error in a D4 codeword, with nothing formatted up front.
+
+    Parameters:
+        input_ternary (str): Codeword with O and E as its last two trits, possibly with errors.
+
+    Returns:
+        D4DecodeResult: status, position, change, corrected codeword, P_1 and P_2; message,
+        P_all, location, announcement, P_all_case and indices are computed when read.
+
+    Raises:
+        ValueError: If the codeword holds fewer than 3 trits, or its length does not hold all
+            redundant indices (no codeword of that length exists).
+
+    Example:
+        >>> result = decode("12010212")
+        >>> result.status, result.message
+        (2, None)
+
+    Note:
+        - Stages are traced under scope "D4_EC" (Module.stage_timer), P_all/P_1/P_2 as fields of "syndrome".
+    """
+
+    #=-=-=-=-=-=-=- Calculate Dimension(Number of Regular Redundant) =-=-=-=-=-=-=-
+    trace = Module.stage_timer("D4_EC")
+    trace.stage("dimension")
+    length =  len(input_ternary)
+    if length < 3:
+        raise ValueError("D4 codewords should hold at least 3 trits")
+    dimension = decide_dimension(length)
+
+    #=-=-=-=-=-=-=- Build R,I_1,I_2 (Cached Layout) =-=-=-=-=-=-=-
+    trace.stage("index")
+    layout = Module.get_code_layout("D4", dimension, length)
+    if not layout.complete:
+        raise ValueError(f"D4 codeword length {length} does not hold all redundant indices")
+
+    #=-=-=-=-=-=-=- Calculating P_all (Bit-Sliced) =-=-=-=-=-=-=-
+    trace.stage("syndrome")
+    packed_feature = Module.packed_ternary_xor_sum(zip(layout.packed_indices, map(int, input_ternary[:length-2])), dimension)
+
+    #=-=-=-=-=-=-=- Calculating P_2, P_1 =-=-=-=-=-=-=-
+    even_sum = (sum(int(input_ternary[pos]) for pos in layout.I_2_positions) + int(input_ternary[-1])) % 3
+    odd_sum = (sum(int(input_ternary[pos]) for pos in layout.I_1_positions) + int(input_ternary[-2])) % 3
+    if Module.TRACE_SUBSCRIBERS:
+        trace.note(P_all=packed_feature.to_ternary(), P_2=even_sum, P_1=odd_sum)
+
+    #=-=-=-=-=-=-=- Error Correction =-=-=-=-=-=-=-
+    trace.stage("correction")
+    error_loc = error_correction(dimension, packed_feature, odd_sum, even_sum, layout.packed_I_1, layout.packed_I_2)
+    status, position, change = Module.STATUS_CORRECTED, -1, 0
+    if isinstance(error_loc, Module.TritWord):
+        position, change = layout.packed_position[error_loc], (odd_sum + even_sum) % 3
+    elif error_loc == "O":
+        position, change = length - 2, odd_sum
+    elif error_loc == "E":
+        position, change = length - 1, even_sum
+    elif error_loc == "3" * dimension:
+        status = Module.STATUS_UNCORRECTABLE
+    else:
+        status = Module.STATUS_CLEAN
+    if Module.TRACE_SUBSCRIBERS:
+        trace.note(position=position)
+
+    #=-=-=-=-=-=-=- Trace Back the Wrong Trit =-=-=-=-=-=-=-
+    trace.stage("message")
+    corrected = input_ternary
+    if position >= 0:
+        corrected = input_ternary[:position] + str((int(input_ternary[position]) - change) % 3) + input_ternary[position+1:]
+    trace.done()
+    return D4DecodeResult(layout, input_ternary, corrected, status, position, change, packed_feature, odd_sum, even_sum)
+
 #=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-Main_Area=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 def main_function(input_ternary):
     """D4 Error Correction, and Report
@@ -188,107 +537,11 @@ def main_function(input_ternary):
         - "O"/"E": Parity bit errors
 
     Dependencies:
-        - Module functions: fr(), d4_build_redundant_list(), var_d4_generate_I_odd_or_even()
-        - Helper functions: error_correction(), pick_message(), ordinal()
-    """
-    original_input = input_ternary
+        - Module functions: fr(), get_code_layout()
+        - Helper functions: error_correction(), ordinal()
 
-    #=-=-=-=-=-=-=- Calculate Dimension(Number of Regular Redundant) =-=-=-=-=-=-=-
-    length =  len(input_ternary)
-    dimension = 3 # Initial Value
-    max_length_curr_dimension = 2*Module.fr(dimension)+2
-    while length > max_length_curr_dimension:
-        dimension+=1
-        max_length_curr_dimension = 2*Module.fr(dimension)+2
-
-
-    #=-=-=-=-=-=-=- Build R,I_1,I_2 =-=-=-=-=-=-=-
-    R = Module.d4_build_redundant_list(dimension)
-    I_1 = Module.var_d4_generate_I_odd_or_even(dimension,1)
-    I_2 = Module.var_d4_generate_I_odd_or_even(dimension,2)
-    first_cut = length-2
-    if(len(I_1)>first_cut):
-        I_1 = I_1[:first_cut]
-    second_cut_amount = (length-2)-(len(I_1))   #Module.fr(dimension)) # amount left after 1st set
-    I_2 = I_2[:second_cut_amount]
-    if(second_cut_amount<=0):
-        I_2 = []
-
-    #=-=-=-=-=-=-=- Mapping Picked Index with Value from Code =-=-=-=-=-=-=-
-    all_regular_digits = I_1+I_2
-    all_regular_digits_sorted_ternary = Module.sort_ternary(all_regular_digits)
-    order_mapping = {
-        key: index 
-        for index, key in zip(
-            range(1, len(all_regular_digits_sorted_ternary) + 1),
-            all_regular_digits_sorted_ternary
-        )
-    }
-    regular_mapping = {key: int(value) for key, value in zip(all_regular_digits_sorted_ternary, input_ternary[:length-2])}
-    #print(regular_mapping)
-    #=-=-=-=-=-=-=- Calculating P_all =-=-=-=-=-=-=-
-    error_feature = Module.ternary_xor_sum(regular_mapping)
-    print("P_all error_feature: " + error_feature)
-    P_all_case = -1
-    if(error_feature in all_regular_digits_sorted_ternary or Module.xor_multiply(2,error_feature) in all_regular_digits_sorted_ternary):
-        P_all_case = 1
-    else:
-        P_all_case = 2
-    if(error_feature == "0"*dimension):
-        P_all_case = 0
-    
-    #=-=-=-=-=-=-=- Calculating P_2 =-=-=-=-=-=-=-
-    even_sum = 0
-    for index in I_2:
-        even_sum+=regular_mapping[index]
-    even_sum += int(input_ternary[-1])
-    even_sum = even_sum %3
-    print("P_2 even_sum: " + str(even_sum))
-
-    #=-=-=-=-=-=-=- Calculating P_1 =-=-=-=-=-=-=-
-    odd_sum = 0
-    for index in I_1:
-        odd_sum+=regular_mapping[index]
-    odd_sum += int(input_ternary[-2])
-    odd_sum = odd_sum % 3
-    print("P_1 odd_sum: " + str(odd_sum))
+    Note:
+        - The tuple of decode(); bulk callers should use decode() and read only what they need.
+    """
 
-    #=-=-=-=-=-=-=- Error Correction =-=-=-=-=-=-=-
-    error_loc = error_correction(dimension, error_feature, odd_sum, even_sum, I_1, I_2)
-    change = 0
-    # "3" When there are two or more error 
-    # "4" When it is perfect 
-
-    announcement = ""
-    if(error_loc!='3'*dimension and error_loc!='4'*dimension):
-        if(error_loc != "O" and error_loc != "E"):
-            change = odd_sum+even_sum
-            regular_mapping[error_loc]-= (odd_sum+even_sum)
-            regular_mapping[error_loc] %= 3
-            error_num = all_regular_digits_sorted_ternary.index(error_loc)
-            input_ternary = input_ternary[:error_num]+ str(regular_mapping[error_loc]) + input_ternary[error_num+1:]
-
-        if(error_loc == "O"):
-            original_odd = (int(input_ternary[-2]) - odd_sum)%3
-            change = int(input_ternary[-2])-original_odd
-            input_ternary = input_ternary[:-2]+ str(original_odd) + input_ternary[-1]
-
-        if(error_loc == "E"):
-            original_even = (int(input_ternary[-1]) - even_sum)%3
-            change = int(input_ternary[-1])-original_even
-            input_ternary = input_ternary[:-1]+ str(original_even)
-
-        #print("raw_text:" + original_input)#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-        if(error_loc!="O" and error_loc!="E"):
-            announcement = f"The error is located at the {ordinal(order_mapping[error_loc])} position, with a change of +{change}  from original value."
-        else:
-            announcement = f"The error is located at the {error_loc} position, with a change of +{change}  from original value.(O as second last digit, E as last digit)"
-        pure_message = pick_message(input_ternary,R, order_mapping)
-        return input_ternary, pure_message, error_loc, announcement, error_feature, odd_sum, even_sum , P_all_case, all_regular_digits_sorted_ternary
-    elif(error_loc == '3'*dimension):
-        announcement = "Sorry, notice that there are two or more mistakes."
-        return input_ternary, "-1", error_loc, announcement, error_feature, odd_sum, even_sum , P_all_case, all_regular_digits_sorted_ternary
-    elif(error_loc == '4'*dimension):
-        announcement = "Congratulation! It is a perfect code with 0 error."
-        pure_message = pick_message(input_ternary,R, order_mapping)
-        return input_ternary, pure_message, error_loc, announcement, error_feature, odd_sum, even_sum , P_all_case, all_regular_digits_sorted_ternary
+    return decode(input_ternary).as_tuple()
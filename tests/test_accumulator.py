@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+import Module
+import Web_Final_D3
+import Web_Final_D3_EC
+import Web_Final_D4
+import Web_Final_D4_EC
+
+SCHEMES = [("D3", Web_Final_D3, Web_Final_D3_EC), ("D4", Web_Final_D4, Web_Final_D4_EC)]
+
+
+def recompute(scheme, trits):
+    # P_all, P_1, P_2 from scratch over the whole codeword
+    length = len(trits)
+    layout = Module.get_code_layout(scheme, Module.dimension_for_codeword(scheme, length), length)
+    regular = trits[:length - 2] if scheme == "D4" else trits
+    P_all = Module.ternary_xor_sum(dict(zip(layout.indices, regular)))
+    if scheme == "D3":
+        return P_all, 0, 0
+    P_1 = (sum(trits[pos] for pos in layout.I_1_positions) + trits[-2]) % 3
+    P_2 = (sum(trits[pos] for pos in layout.I_2_positions) + trits[-1]) % 3
+    return P_all, P_1, P_2
+
+
+@pytest.mark.parametrize("scheme, encoder, decoder", SCHEMES)
+def test_accumulator_matches_a_full_recompute_after_random_edits(scheme, encoder, decoder):
+    rng = random.Random(51)
+    for message_length in range(1, 130, 3):
+        try:
+            codeword = encoder.main_function(''.join(rng.choice('012') for _ in range(message_length)))[0]
+        except ValueError:
+            continue
+        acc = decoder.SyndromeAccumulator(len(codeword))
+        acc.extend(codeword)
+        trits = [int(trit) for trit in codeword]
+        for _ in range(12):
+            position, value = rng.randrange(len(trits)), rng.randrange(3)
+            trits[position] = value
+            acc.set(position, value)
+            assert (acc.P_all, acc.P_1, acc.P_2) == recompute(scheme, trits)
+            result = decoder.decode(''.join(map(str, trits)))
+            assert acc.decision() == (result.status, result.position, result.change)
+            corrected, message, status, position = acc.result()
+            assert (corrected, status, position) == (result.corrected, result.status, result.position)
+            if status != Module.STATUS_UNCORRECTABLE:
+                assert message == result.message
+
+
+@pytest.mark.parametrize("scheme, encoder, decoder", SCHEMES)
+def test_accumulator_fed_trit_by_trit(scheme, encoder, decoder):
+    codeword = encoder.main_function("2102011")[0]
+    acc = decoder.SyndromeAccumulator(len(codeword))
+    for trit in codeword:
+        acc.append(trit)
+    assert acc.decision() == (Module.STATUS_CLEAN, -1, 0)
+    assert acc.result()[1] == "2102011"
+    with pytest.raises(ValueError):
+        acc.append(0)
+    with pytest.raises(ValueError):
+        acc.set(len(codeword), 1)
+    with pytest.raises(ValueError):
+        acc.set(0, 3)
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+import Module
+import Web_Final_D3
+import Web_Final_D3_EC
+
+np = pytest.importorskip("numpy")
+
+LENGTHS = range(1, 130)
+
+
+def random_messages(rng, length, count=4):
+    return [''.join(rng.choice('012') for _ in range(length)) for _ in range(count)]
+
+
+def as_rows(texts):
+    return np.array([[int(trit) for trit in text] for text in texts], dtype=np.uint8)
+
+
+def as_text(row):
+    return ''.join(map(str, row))
+
+
+def test_encode_batch_matches_main_function():
+    rng = random.Random(11)
+    for length in LENGTHS:
+        messages = random_messages(rng, length)
+        codewords = Web_Final_D3.encode_batch(as_rows(messages))
+        for message, row in zip(messages, codewords):
+            assert as_text(row) == Web_Final_D3.main_function(message)[0]
+
+
+def test_encode_batch_rejects_empty_messages():
+    with pytest.raises(ValueError):
+        Web_Final_D3.encode_batch(np.zeros((2, 0), dtype=np.uint8))
+
+
+def with_errors(rng, codeword, count):
+    received = codeword.copy()
+    for position in rng.sample(range(len(codeword)), min(count, len(codeword))):
+        received[position] = (received[position] + rng.randrange(1, 3)) % 3
+    return received
+
+
+def test_decode_batch_corrects_single_errors():
+    rng = random.Random(12)
+    for length in LENGTHS:
+        messages = random_messages(rng, length)
+        codewords = Web_Final_D3.encode_batch(as_rows(messages))
+        received = np.array([with_errors(rng, row, 1) for row in codewords])
+        for batch, expected_status in ((codewords, Module.STATUS_CLEAN), (received, Module.STATUS_CORRECTED)):
+            corrected, decoded, status, _ = Web_Final_D3_EC.decode_batch(batch)
+            assert (corrected == codewords).all()
+            assert [as_text(row) for row in decoded] == messages
+            assert (status == expected_status).all()
+
+
+def test_decode_batch_matches_main_function():
+    rng = random.Random(13)
+    for length in LENGTHS:
+        codewords = Web_Final_D3.encode_batch(as_rows(random_messages(rng, length)))
+        received = np.array([with_errors(rng, row, rng.randrange(4)) for row in codewords])
+        corrected, decoded, status, _ = Web_Final_D3_EC.decode_batch(received)
+        dimension = Web_Final_D3_EC.decide_dimension(received.shape[1])
+        for i, row in enumerate(received):
+            _, location, after_correct_code, _, message = Web_Final_D3_EC.main_function(as_text(row))
+            if location == "4" * dimension:
+                assert status[i] == Module.STATUS_UNCORRECTABLE
+                continue
+            assert status[i] == (Module.STATUS_CLEAN if location == "3" * dimension else Module.STATUS_CORRECTED)
+            assert (as_text(corrected[i]), as_text(decoded[i])) == (after_correct_code, message)
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+import Module
+import Web_Final_D4
+import Web_Final_D4_EC
+
+np = pytest.importorskip("numpy")
+
+LENGTHS = range(1, 130)
+
+
+def random_messages(rng, length, count=4):
+    return [''.join(rng.choice('012') for _ in range(length)) for _ in range(count)]
+
+
+def as_rows(texts):
+    return np.array([[int(trit) for trit in text] for text in texts], dtype=np.uint8)
+
+
+def as_text(row):
+    return ''.join(map(str, row))
+
+
+def supported(length):
+    try:
+        Web_Final_D4.main_function('0' * length)
+    except ValueError:
+        return False
+    return True
+
+
+def test_encode_batch_matches_main_function():
+    rng = random.Random(21)
+    for length in LENGTHS:
+        messages = random_messages(rng, length)
+        if not supported(length):
+            with pytest.raises(ValueError):
+                Web_Final_D4.encode_batch(as_rows(messages))
+            continue
+        codewords = Web_Final_D4.encode_batch(as_rows(messages))
+        for message, row in zip(messages, codewords):
+            assert as_text(row) == Web_Final_D4.main_function(message)[0]
+
+
+def test_set_redundant_solves_every_target():
+    for dimension in range(3, 9):
+        redundant = Module.d4_build_redundant_list(dimension)
+        for value in range(0, 3 ** dimension, max(1, 3 ** dimension // 200)):
+            target = Module.int_to_ternary(value, dimension)
+            mapping = Web_Final_D4.set_redundant(target, redundant)
+            assert Module.ternary_xor_sum(mapping) == target
+
+
+def with_errors(rng, codeword, count):
+    received = codeword.copy()
+    for position in rng.sample(range(len(codeword)), min(count, len(codeword))):
+        received[position] = (received[position] + rng.randrange(1, 3)) % 3
+    return received
+
+
+def test_decode_batch_corrects_single_errors():
+    rng = random.Random(22)
+    for length in filter(supported, LENGTHS):
+        messages = random_messages(rng, length)
+        codewords = Web_Final_D4.encode_batch(as_rows(messages))
+        received = np.array([with_errors(rng, row, 1) for row in codewords])
+        for batch, expected_status in ((codewords, Module.STATUS_CLEAN), (received, Module.STATUS_CORRECTED)):
+            corrected, decoded, status, _ = Web_Final_D4_EC.decode_batch(batch)
+            assert (corrected == codewords).all()
+            assert [as_text(row) for row in decoded] == messages
+            assert (status == expected_status).all()
+
+
+def test_decode_batch_matches_main_function():
+    rng = random.Random(23)
+    for length in filter(supported, LENGTHS):
+        codewords = Web_Final_D4.encode_batch(as_rows(random_messages(rng, length)))
+        received = np.array([with_errors(rng, row, rng.randrange(4)) for row in codewords])
+        corrected, decoded, status, _ = Web_Final_D4_EC.decode_batch(received)
+        for i, row in enumerate(received):
+            report = Web_Final_D4_EC.main_function(as_text(row))
+            if report[1] == "-1":
+                assert status[i] == Module.STATUS_UNCORRECTABLE
+                continue
+            assert status[i] != Module.STATUS_UNCORRECTABLE
+            assert (as_text(corrected[i]), as_text(decoded[i])) == (report[0], report[1])
+
+
+def test_decode_batch_rejects_lengths_without_codewords():
+    for codeword_length in (1, 2, 5, 11, 85, 89):
+        with pytest.raises(ValueError):
+            Web_Final_D4_EC.decode_batch(np.zeros((1, codeword_length), dtype=np.uint8))
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Module
+import Stream_Codec
+import Web_Final_D3
+import Web_Final_D3_EC
+import Web_Final_D4
+import Web_Final_D4_EC
+
+
+def test_pack_unpack_trits_round_trip():
+    rng = random.Random(31)
+    for count in range(0, 40):
+        text = ''.join(rng.choice('012') for _ in range(count))
+        data = Module.pack_trits(text)
+        assert len(data) == Module.packed_size(count)
+        assert all(byte < 243 for byte in data)
+        assert ''.join(map(str, Module.unpack_trits(data, count))) == text
+        assert Module.pack_trits([int(trit) for trit in text]) == data
+
+
+def test_pack_unpack_rows_round_trip():
+    rng = np.random.default_rng(32)
+    for width in range(1, 23):
+        rows = rng.integers(0, 3, (9, width), dtype=np.uint8)
+        packed = Module.pack_rows(rows)
+        assert packed.shape == (9, Module.packed_size(width))
+        assert (Module.unpack_rows(packed.tobytes(), width) == rows).all()
+
+
+@pytest.mark.parametrize("encoder, decoder, length", [(Web_Final_D3, Web_Final_D3_EC, 10),
+                                                      (Web_Final_D3, Web_Final_D3_EC, 11),
+                                                      (Web_Final_D4, Web_Final_D4_EC, 16)])
+def test_packed_codecs_match_the_batch_codecs(encoder, decoder, length):
+    messages = np.random.default_rng(length).integers(0, 3, (7, length), dtype=np.uint8)
+    codewords = encoder.encode_batch(messages)
+    packed = encoder.encode_packed(Module.pack_rows(messages).tobytes(), length)
+    assert bytes(packed) == Module.pack_rows(codewords).tobytes()
+    corrected, decoded, status, _ = decoder.decode_packed(bytes(packed), codewords.shape[1])
+    assert bytes(corrected) == bytes(packed)
+    assert bytes(decoded) == Module.pack_rows(messages).tobytes()
+    assert (status == Module.STATUS_CLEAN).all()
+
+
+@pytest.mark.parametrize("bad", ["1é2", [0, 3], [-1, 1]])
+def test_bad_trits_raise_value_error(bad):
+    with pytest.raises(ValueError):
+        Module.pack_trits(bad)
+
+
+def test_non_ascii_stream_text_raises_value_error():
+    with pytest.raises(ValueError):
+        list(Stream_Codec.iter_trit_chunks(["10", "2é"]))
@@ -0,0 +1,51 @@
+import pytest
+
+import Module
+import Web_Final_D3
+import Web_Final_D4
+
+ENCODERS = {"D3": Web_Final_D3, "D4": Web_Final_D4}
+
+
+def planned(scheme, message_length):
+    try:
+        return Module.plan_code(scheme, message_length)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("scheme", ["D3", "D4"])
+def test_planned_lengths_are_accepted_by_the_codecs(scheme):
+    encoder = ENCODERS[scheme]
+    for message_length in range(1, 400):
+        plan = planned(scheme, message_length)
+        if plan is None:
+            with pytest.raises(ValueError):
+                encoder.main_function('0' * message_length)
+            continue
+        dimension, codeword_length, _ = plan
+        assert Module.get_code_layout(scheme, dimension, codeword_length).complete
+        assert Module.dimension_for_codeword(scheme, codeword_length) == dimension
+        code, length, _ = encoder.main_function('1' * message_length)
+        assert len(code) == length == codeword_length
+
+
+@pytest.mark.parametrize("scheme", ["D3", "D4"])
+def test_max_message_length_is_the_longest_planned_fit(scheme):
+    longest = {}
+    for message_length in range(0, 420):
+        plan = planned(scheme, message_length)
+        if plan is not None:
+            longest[plan[1]] = message_length
+    best = 0
+    for codeword_length in range(0, 400):
+        best = max(best, longest.get(codeword_length, 0))
+        assert Module.max_message_length(scheme, codeword_length) == best
+
+
+def test_d4_gap_lengths_are_rejected():
+    assert Module.message_range("D4", 7) == (81, 175)
+    assert Module.max_message_length("D4", 89) == 76
+    for message_length in range(77, 81):
+        with pytest.raises(ValueError):
+            Module.plan_code("D4", message_length)
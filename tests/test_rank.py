@@ -0,0 +1,67 @@
+import pytest
+
+import Module
+
+
+def test_half_rank_unrank_are_inverse():
+    for dimension in range(1, 8):
+        half = Module.generate_ternary_set_half(dimension)
+        assert len(half) == Module.ternary_half_size(dimension)
+        assert half == sorted(half)
+        for rank, index in enumerate(half):
+            assert Module.ternary_half_unrank(rank, dimension) == index
+            assert Module.ternary_half_rank(index) == rank
+            assert Module.ternary_half_rank(int(index, 3)) == rank
+
+
+def test_half_contains_matches_leading_digit():
+    for dimension in range(1, 7):
+        for value in range(3 ** dimension):
+            index = Module.int_to_ternary(value, dimension)
+            assert Module.ternary_half_contains(index) == (index.lstrip('0')[:1] == '1')
+
+
+def test_half_rank_rejects_other_indices():
+    for index in ('000', '021', '200'):
+        with pytest.raises(ValueError):
+            Module.ternary_half_rank(index)
+
+
+def test_d4_iter_I_is_sorted_and_matches_the_weight_rule():
+    for dimension in range(3, 11):
+        lowest, highest = Module.d4_weight_range(dimension)
+        for num in (1, 2):
+            indices = list(Module.d4_iter_I(dimension, num))
+            assert indices == sorted(indices)
+            assert len(indices) == Module.fr(dimension)
+            expected = [index for index in (Module.int_to_ternary(v, dimension) for v in range(3 ** dimension))
+                        if set(index) <= {'0', str(num)} and lowest <= index.count(str(num)) <= highest]
+            assert indices == expected
+            assert all(Module.d4_I_contains(index, num) for index in indices)
+
+
+def test_d4_rank_unrank_are_inverse():
+    for dimension in range(3, 13):
+        for num in (1, 2):
+            indices = list(Module.d4_iter_I(dimension, num))
+            for rank, index in enumerate(indices):
+                assert Module.d4_I_unrank(rank, dimension, num) == index
+                assert Module.d4_I_rank(index) == rank
+            with pytest.raises(ValueError):
+                Module.d4_I_unrank(len(indices), dimension, num)
+
+
+def test_d4_iter_I_seeks_with_start():
+    for dimension in range(3, 10):
+        for num in (1, 2):
+            indices = list(Module.d4_iter_I(dimension, num))
+            for start in range(len(indices) + 1):
+                assert list(Module.d4_iter_I(dimension, num, start)) == indices[start:]
+
+
+def test_d4_layout_is_the_merge_of_I_1_and_I_2():
+    for dimension in range(3, 8):
+        for length in range(3, 2 * Module.fr(dimension) + 3):
+            layout = Module.build_d4_layout(dimension, length)
+            assert list(layout.indices) == sorted(layout.I_1 + layout.I_2)
+            assert len(layout.indices) == length - 2
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+import Module
+import Web_Final_D3
+import Web_Final_D3_EC
+import Web_Final_D4
+import Web_Final_D4_EC
+
+SCHEMES = [(Web_Final_D3, Web_Final_D3_EC), (Web_Final_D4, Web_Final_D4_EC)]
+
+
+def with_errors(rng, codeword, count):
+    trits = list(codeword)
+    for position in rng.sample(range(len(trits)), count):
+        trits[position] = str((int(trits[position]) + rng.randrange(1, 3)) % 3)
+    return ''.join(trits)
+
+
+@pytest.mark.parametrize("encoder, decoder", SCHEMES)
+def test_results_match_main_function(encoder, decoder):
+    rng = random.Random(25)
+    for message_length in range(1, 130):
+        message = ''.join(rng.choice('012') for _ in range(message_length))
+        try:
+            expected = encoder.main_function(message)
+        except ValueError:
+            with pytest.raises(ValueError):
+                encoder.encode(message)
+            continue
+        result = encoder.encode(message)
+        assert result.as_tuple() == expected
+        assert result.message_length == message_length
+        codeword = result.codeword
+        for errors in range(min(len(codeword), 3)):
+            text = with_errors(rng, codeword, errors)
+            decoded = decoder.decode(text)
+            assert decoded.as_tuple() == decoder.main_function(text)
+            assert decoded.received == text
+            if errors < 2:
+                assert decoded.status == (Module.STATUS_CORRECTED if errors else Module.STATUS_CLEAN)
+                assert decoded.message == message
+
+
+def test_status_codes():
+    codeword = Web_Final_D3.encode("1021").codeword
+    clean = Web_Final_D3_EC.decode(codeword)
+    assert (clean.status, clean.position, clean.change) == (Module.STATUS_CLEAN, -1, 0)
+    corrected = Web_Final_D3_EC.decode("120102")
+    assert (corrected.status, corrected.position, corrected.corrected) == (Module.STATUS_CORRECTED, 5, "120100")
+    assert Web_Final_D4_EC.decode("12010212").status == Module.STATUS_UNCORRECTABLE
+    assert Web_Final_D4_EC.decode("12010212").message is None
+
+
+@pytest.mark.parametrize("codeword", ["", "1", "22", "120"])
+def test_d4_decode_rejects_lengths_without_a_codeword(codeword):
+    with pytest.raises(ValueError):
+        Web_Final_D4_EC.decode(codeword)
+
+
+def test_d3_decode_rejects_an_empty_codeword():
+    with pytest.raises(ValueError):
+        Web_Final_D3_EC.decode("")
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Module
+import Stream_Codec
+
+
+@pytest.mark.parametrize("scheme, block_length", [("D3", 4), ("D3", 13), ("D4", 6), ("D4", 81)])
+def test_stream_round_trip(scheme, block_length):
+    rng = random.Random(block_length)
+    payload = ''.join(rng.choice('012') for _ in range(5 * block_length + 3))
+    chunks = [payload[i:i + 7] for i in range(0, len(payload), 7)]
+    codewords = list(Stream_Codec.encode_stream(chunks, scheme, block_length=block_length, batch_blocks=2))
+    assert {len(codeword) for codeword in codewords} == {Module.plan_code(scheme, block_length)[1]}
+    messages = Stream_Codec.decode_stream(codewords, scheme, block_length=block_length, length=len(payload))
+    assert ''.join(messages) == payload
+
+
+def test_block_plan_by_dimension_uses_the_planner():
+    for scheme in ("D3", "D4"):
+        for dimension in Module.capacity_table(scheme)[0][:8]:
+            supported = Module.message_range(scheme, dimension)
+            if not supported:
+                with pytest.raises(ValueError):
+                    Stream_Codec.block_plan(scheme, dimension=dimension)
+                continue
+            if supported[1] < 1:
+                continue
+            assert Stream_Codec.block_plan(scheme, dimension=dimension) == (
+                dimension, supported[1], Module.plan_code(scheme, supported[1])[1])
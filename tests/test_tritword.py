@@ -0,0 +1,58 @@
+import random
+
+import Module
+import Web_Final_D3_EC
+from Module import TritWord
+
+
+def random_index(rng, width):
+    return ''.join(rng.choice('012') for _ in range(width))
+
+
+def test_string_and_int_round_trip():
+    rng = random.Random(3)
+    for width in range(1, 40):
+        for _ in range(20):
+            index = random_index(rng, width)
+            word = TritWord.from_ternary(index)
+            assert word.to_ternary() == index
+            assert word.to_int() == int(index, 3)
+            assert TritWord.from_int(int(index, 3), width) == word
+            assert TritWord.from_int(int(index, 3), width).to_ternary() == index
+
+
+def test_arithmetic_matches_string_ops():
+    rng = random.Random(4)
+    for width in (1, 3, 7, 16, 33):
+        for _ in range(50):
+            a, b = random_index(rng, width), random_index(rng, width)
+            A, B = TritWord.from_ternary(a), TritWord.from_ternary(b)
+            assert (A + B).to_ternary() == Module.ternary_xor(a, b)
+            assert A.double().to_ternary() == Module.xor_multiply(2, a)
+            assert (A - B + B) == A
+            assert not (A + (-A))
+            for coefficient in (0, 1, 2):
+                assert A.scale(coefficient).to_ternary() == Module.xor_multiply(coefficient, a)
+
+
+def test_packed_xor_sum_matches_string_sum():
+    rng = random.Random(5)
+    for width in (2, 5, 11):
+        mapping = {random_index(rng, width): rng.randrange(3) for _ in range(30)}
+        packed = Module.ternary_xor_sum({TritWord.from_ternary(k): v for k, v in mapping.items()})
+        assert packed.to_ternary() == Module.ternary_xor_sum(mapping)
+
+
+def test_check_error_half_packed_matches_strings():
+    dimension = 4
+    half = Module.generate_ternary_set_half(dimension)[:30]
+    packed_half = {TritWord.from_ternary(index) for index in half}
+    for value in range(3 ** dimension):
+        feature = Module.int_to_ternary(value, dimension)
+        location, change = Web_Final_D3_EC.check_error_half(set(half), feature, dimension)
+        packed_location, packed_change = Web_Final_D3_EC.check_error_half(packed_half, TritWord.from_ternary(feature), dimension)
+        assert packed_change == change
+        assert (packed_location.to_ternary() if isinstance(packed_location, TritWord) else packed_location) == location
+        if change in (1, 2):
+            assert location in half
+            assert Module.xor_multiply(change, location) == feature
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+import Web_Final_D3
+import Web_Final_D4
+
+
+@pytest.mark.parametrize("encoder", [Web_Final_D3, Web_Final_D4])
+def test_update_codeword_matches_a_full_encode(encoder):
+    rng = random.Random(41)
+    for length in range(1, 130, 4):
+        message = [rng.choice('012') for _ in range(length)]
+        try:
+            codeword = encoder.main_function(''.join(message))[0]
+        except ValueError:
+            continue
+        stored = bytearray(int(trit) for trit in codeword)
+        for _ in range(10):
+            position, value = rng.randrange(length), rng.randrange(3)
+            message[position] = str(value)
+            expected = encoder.main_function(''.join(message))[0]
+            codeword = encoder.update_codeword(codeword, position, value)
+            assert codeword == expected
+            encoder.update_codeword(stored, position, value)
+            assert ''.join(map(str, stored)) == expected
+
+
+@pytest.mark.parametrize("encoder", [Web_Final_D3, Web_Final_D4])
+def test_update_codeword_rejects_bad_arguments(encoder):
+    codeword = encoder.main_function("1021")[0]
+    for position, value in ((0, 3), (4, 1), (-1, 1)):
+        with pytest.raises(ValueError):
+            encoder.update_codeword(codeword, position, value)